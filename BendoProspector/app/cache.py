@@ -0,0 +1,153 @@
+# app/cache.py
+"""
+Shared response cache for the Bendigo Flask apps
+Memoizes serialized bodies of deterministic endpoints in a size-bounded LRU,
+tags them with strong ETags and answers If-None-Match revalidation with 304
+and Range requests with 206. Compressed forms of a payload are cached as
+payloads of their own, so each coding is paid for once per body.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, request
+
+from .compression import MAX_DYNAMIC_COMPRESS_BYTES, compress, content_codings, negotiate
+
+RESPONSE_CACHE_MAX_BYTES = 128 * 1024 * 1024
+
+class CachedPayload:
+    """Serialized response body plus the headers needed to replay it"""
+
+    __slots__ = ('body', 'content_type', 'etag', 'vary', 'encoding')
+
+    def __init__(self, body, content_type, vary=(), etag=None, encoding=None):
+        self.body = body
+        self.content_type = content_type
+        self.etag = etag or hashlib.blake2b(body, digest_size=16).hexdigest()
+        self.vary = vary
+        self.encoding = encoding
+
+    def encode(self, coding, cached=True):
+        """This payload compressed with coding, as a payload with the coding appended to its ETag
+
+        cached picks the slow, tight levels meant for bodies compressed once.
+        """
+        return CachedPayload(compress(self.body, coding, cached=cached), self.content_type, self.vary,
+                             f'{self.etag}-{coding}', coding)
+
+    def to_response(self):
+        """Build a conditional response: 304 when the client copy is current, 206 for a byte range"""
+        response = current_app.response_class(self.body, content_type=self.content_type)
+        response.set_etag(self.etag)
+        if self.encoding:
+            response.headers['Content-Encoding'] = self.encoding
+        response.cache_control.public = True
+        response.cache_control.no_cache = True  # always revalidate; a match costs one 304
+        for header in self.vary:
+            response.vary.add(header)
+        return response.make_conditional(request, accept_ranges=True, complete_length=len(self.body))
+
+class ResponseCache:
+    """Thread-safe LRU of CachedPayloads, evicted by total body size"""
+
+    def __init__(self, max_bytes=RESPONSE_CACHE_MAX_BYTES, max_entry_bytes=None):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes or max_bytes // 4
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return payload
+
+    def put(self, key, payload):
+        size = len(payload.body)
+        if size > self.max_entry_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= len(previous.body)
+            self._entries[key] = payload
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= len(evicted.body)
+
+    def encoded(self, key, payload, coding):
+        """payload compressed with coding, compressed on first use and cached under key + (coding,)
+
+        Bodies too large to store are compressed at the per-request levels,
+        or sent as they are beyond MAX_DYNAMIC_COMPRESS_BYTES.
+        """
+        if len(payload.body) > self.max_entry_bytes:
+            if len(payload.body) > MAX_DYNAMIC_COMPRESS_BYTES:
+                return payload
+            return payload.encode(coding, cached=False)
+        encoded_key = key + (coding,)
+        variant = self.get(encoded_key)
+        if variant is None or variant.etag != f'{payload.etag}-{coding}':
+            variant = payload.encode(coding)
+            self.put(encoded_key, variant)
+        return variant
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        return {
+            'entries': len(self._entries),
+            'bytes': self.current_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+    def cached(self, *vary):
+        """Decorate a deterministic view so its body is built once per route + parameters
+
+        Request headers named in vary (e.g. 'Accept' for content-negotiated
+        endpoints) become part of the cache key and the Vary response header.
+        Accept-Encoding selects among the compressed forms of the one body.
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                key = (
+                    request.path,
+                    tuple(sorted(request.args.items(multi=True))),
+                    tuple(request.headers.get(header, '') for header in vary)
+                )
+                payload = self.get(key)
+                if payload is None:
+                    response = current_app.make_response(view(*args, **kwargs))
+                    if response.status_code != 200 or response.direct_passthrough:
+                        return response
+                    vary_headers = tuple(vary) + tuple(response.vary) + compression_vary(response.content_type)
+                    payload = CachedPayload(response.get_data(), response.content_type, vary_headers)
+                    self.put(key, payload)
+                coding = negotiate(payload.content_type, len(payload.body))
+                if coding is not None:
+                    payload = self.encoded(key, payload, coding)
+                return payload.to_response()
+            return wrapper
+        return decorator
+
+def compression_vary(content_type):
+    """('Accept-Encoding',) when bodies of content_type are sent compressed to clients that accept it"""
+    return ('Accept-Encoding',) if content_codings(content_type) else ()
+
+response_cache = ResponseCache()
@@ -0,0 +1,89 @@
+# app/compression.py
+"""
+Response compression
+Picks a content coding from Accept-Encoding for each response body: brotli
+(when installed) or gzip for JSON and text, and zstd (when installed) ahead
+of those for binary buffers. Bodies of cached, deterministic payloads are
+compressed once per coding at a high level and kept beside the payload (see
+app.cache); everything else is compressed per request at a fast level by
+the after_request hook that configure_compression installs. Bodies too
+large to cache and to compress per request go out uncompressed.
+"""
+import gzip
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # optional: fall back to gzip for text
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional: fall back to brotli/gzip for binary buffers
+    zstandard = None
+
+# Bodies smaller than this go out as they are: the header overhead eats the saving
+MIN_COMPRESS_BYTES = 1024
+TEXT_TYPES = ('text/', 'application/json', 'application/geo+json', 'application/javascript', 'image/svg+xml')
+BINARY_TYPES = ('application/octet-stream',)
+# Bodies larger than this are only compressed when the compressed form is cached: gzip runs
+# at ~15 MB/s here, so a 64 MB elevation grid would cost seconds on every request
+MAX_DYNAMIC_COMPRESS_BYTES = 16 * 1024 * 1024
+# Levels for bodies compressed once and cached, and for bodies compressed on every request
+CACHED_LEVELS = {'zstd': 12, 'br': 9, 'gzip': 9}
+DYNAMIC_LEVELS = {'zstd': 3, 'br': 4, 'gzip': 6}
+
+CODECS = {'gzip': lambda body, level: gzip.compress(body, level, mtime=0)}
+if brotli is not None:
+    CODECS['br'] = lambda body, level: brotli.compress(body, quality=level)
+if zstandard is not None:
+    CODECS['zstd'] = lambda body, level: zstandard.ZstdCompressor(level=level).compress(body)
+
+def content_codings(content_type):
+    """Codings on offer for a content type, most preferred first; empty when not worth compressing"""
+    mimetype = (content_type or '').split(';')[0].strip().lower()
+    if mimetype in BINARY_TYPES:
+        codings = ('zstd', 'br', 'gzip')
+    elif mimetype.startswith(TEXT_TYPES):
+        codings = ('br', 'gzip')
+    else:
+        return ()
+    return tuple(coding for coding in codings if coding in CODECS)
+
+def negotiate(content_type, size):
+    """Coding to send a size-byte body of content_type in for this request, or None for identity"""
+    if size < MIN_COMPRESS_BYTES:
+        return None
+    best, best_quality = None, 0
+    for coding in content_codings(content_type):
+        quality = request.accept_encodings.quality(coding)
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+def compress(body, coding, cached=False):
+    """body compressed with coding, at the cached or the per-request level"""
+    return CODECS[coding](body, (CACHED_LEVELS if cached else DYNAMIC_LEVELS)[coding])
+
+def compress_response(response):
+    """after_request hook: compress a complete 200 body a view built for this request"""
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers or not content_codings(response.content_type)):
+        return response
+    response.vary.add('Accept-Encoding')
+    body = response.get_data()
+    coding = negotiate(response.content_type, len(body))
+    if coding is None or len(body) > MAX_DYNAMIC_COMPRESS_BYTES:
+        return response
+    response.set_data(compress(body, coding))
+    response.headers['Content-Encoding'] = coding
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(f'{etag}-{coding}', weak)
+    return response
+
+def configure_compression(app):
+    """Compress the responses of app's views that do not go through the response cache"""
+    app.after_request(compress_response)
+    return app
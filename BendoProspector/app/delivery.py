@@ -0,0 +1,140 @@
+# app/delivery.py
+"""
+Static and binary delivery
+Files are sent through Werkzeug's send_file, so every asset answers
+If-None-Match / If-Modified-Since with 304 and Range / If-Range with 206,
+letting field clients resume an interrupted download of a large texture
+or model. When the client accepts it, a precompressed .br or .gz sibling
+no older than the file is sent in its place. Whole-file bodies go out
+through the server's wsgi.file_wrapper (os.sendfile under gunicorn), or
+are handed to a fronting server when BENDIGO_X_SENDFILE=1. In-memory
+buffers get the same conditional and Range handling, and cached
+compression, via buffer_response.
+Write the siblings for a directory with:
+    python -m app.delivery DIRECTORY
+"""
+import mimetypes
+import os
+import sys
+from pathlib import Path
+
+from flask import abort, current_app, request, send_file
+from werkzeug.security import safe_join
+
+from .cache import CachedPayload, compression_vary, response_cache
+from .compression import CODECS, compress, negotiate
+
+# Sibling suffixes by content coding, in order of preference
+PRECOMPRESSED = (('br', '.br'), ('gzip', '.gz'))
+# Files smaller than this gain nothing worth a second request path from compression
+MIN_PRECOMPRESS_BYTES = 1024
+# Already-compressed formats (PNG, JPEG, zip, ...) are left alone
+COMPRESSIBLE_SUFFIXES = {'.js', '.mjs', '.css', '.html', '.json', '.geojson', '.svg', '.txt', '.csv',
+                         '.dxf', '.kml', '.obj', '.bin'}
+
+def configure_delivery(app):
+    """Hand file bodies to the fronting server (Apache mod_xsendfile, lighttpd) when BENDIGO_X_SENDFILE=1"""
+    app.config['USE_X_SENDFILE'] = os.environ.get('BENDIGO_X_SENDFILE') == '1'
+    return app
+
+def precompressed_variant(path):
+    """(path, content coding) of the best accepted sibling of path, or (path, None)"""
+    stat = path.stat()
+    for coding, suffix in PRECOMPRESSED:
+        if request.accept_encodings.quality(coding) <= 0:
+            continue
+        sibling = path.with_name(path.name + suffix)
+        try:
+            if sibling.stat().st_mtime >= stat.st_mtime:
+                return sibling, coding
+        except OSError:
+            continue
+    return path, None
+
+def send_asset(directory, filename, max_age=None):
+    """Send directory/filename, or its precompressed sibling, as a conditional, range-capable response"""
+    path = safe_join(os.fspath(directory), filename)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+    path = Path(path)
+    variant, coding = precompressed_variant(path)
+    mimetype = mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+    if max_age is None:
+        max_age = current_app.get_send_file_max_age(path.name)
+    response = send_file(variant, mimetype=mimetype, download_name=path.name, conditional=True, etag=True,
+                         max_age=max_age)
+    if coding:
+        response.headers['Content-Encoding'] = coding
+    # Sibling or not, the body depends on Accept-Encoding for any file that has siblings
+    if coding or path.suffix.lower() in COMPRESSIBLE_SUFFIXES:
+        response.vary.add('Accept-Encoding')
+    return response
+
+def not_modified(etag):
+    """304 response when the request's If-None-Match already holds etag (in any coding), else None
+
+    Lets a view skip building a body the client has; build the etag from
+    whatever versions the body (e.g. a source digest), not from the body.
+    """
+    for tag in (etag,) + tuple(f'{etag}-{coding}' for coding in CODECS):
+        if request.if_none_match.contains(tag):
+            response = current_app.response_class(status=304)
+            response.set_etag(tag)
+            return response
+    return None
+
+def buffer_response(body, mimetype, etag=None):
+    """Conditional, range-capable response for an in-memory binary buffer
+
+    Given an etag, compressed forms of the body are cached under it.
+    """
+    payload = CachedPayload(body, mimetype, compression_vary(mimetype), etag)
+    coding = negotiate(mimetype, len(body)) if etag else None
+    if coding is not None:
+        payload = response_cache.encoded(('buffer', etag), payload, coding)
+    return payload.to_response()
+
+def precompress(directory, min_bytes=MIN_PRECOMPRESS_BYTES):
+    """Write .gz (and .br with brotli installed) siblings for compressible files under directory
+
+    Siblings are rewritten only when older than their file, and kept only
+    when smaller than it. Returns (path, original bytes, {coding: bytes}) per file written.
+    """
+    written = []
+    for path in sorted(Path(directory).rglob('*')):
+        if not path.is_file() or path.suffix.lower() not in COMPRESSIBLE_SUFFIXES:
+            continue
+        stat = path.stat()
+        if stat.st_size < min_bytes:
+            continue
+        data = None
+        sizes = {}
+        for coding, suffix in PRECOMPRESSED:
+            if coding not in CODECS:
+                continue
+            sibling = path.with_name(path.name + suffix)
+            if sibling.exists() and sibling.stat().st_mtime >= stat.st_mtime:
+                continue
+            if data is None:
+                data = path.read_bytes()
+            packed = compress(data, coding, cached=True)
+            if len(packed) >= len(data):
+                continue
+            staging = sibling.with_name(sibling.name + '.tmp')
+            staging.write_bytes(packed)
+            os.replace(staging, sibling)
+            sizes[coding] = len(packed)
+        if sizes:
+            written.append((path, stat.st_size, sizes))
+    return written
+
+def main(argv):
+    if len(argv) != 1:
+        print(__doc__.strip().splitlines()[-1].strip())
+        return 2
+    for path, size, sizes in precompress(argv[0]):
+        print(path, size, ' '.join(f'{coding} {packed}' for coding, packed in sizes.items()))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
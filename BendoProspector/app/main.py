@@ -1,76 +1,401 @@
 # app/main.py
-from flask import Flask, send_from_directory
+from flask import Flask, Response, abort, jsonify, make_response, request
+import numpy as np
 import os
+import sys
 
-app = Flask(__name__, static_folder="../static", template_folder="../static")
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.cache import response_cache
+from app.compression import configure_compression
+from app.delivery import configure_delivery, send_asset
+from geology.encoding import BUNDLE_MIME_TYPE, encode_buffer_bundle, finite_or_none
+from terrain.analytics import DEFAULT_ALTITUDE, DEFAULT_AZIMUTH, PRODUCT_UNITS, PRODUCTS
+from terrain.contours import DEFAULT_CONTOUR_INTERVAL, contour_polylines
+from terrain.coordinates import FRAMES, SceneFrame, local_to_latlng, transform
+from terrain.encoding import ELEVATION_MIME_TYPE, encode_elevation_grid
+from terrain.generator import (
+    BASE_ELEVATION, DEFAULT_EXTENT_KM, DEFAULT_GRID_SIZE,
+    elevation_from_axes, elevation_grid, generate_bendigo_elevation_data
+)
+from terrain.mesh import DEFAULT_MAX_ERROR, rtin_mesh, rtin_size
+from terrain.sampling import (DEFAULT_PROFILE_SPACING, SAMPLE_GRID_SIZE, path_distances, sample_latlng,
+                              sample_profile)
+from terrain.tiles import elevation_pyramid
+
+# Static files go through send_asset (precompressed siblings, ranges) rather than Flask's own route
+app = configure_compression(configure_delivery(Flask(__name__, static_folder=None, template_folder="../static")))
+STATIC_DIR = os.path.join(app.root_path, "..", "static")
+
+# Largest elevation grid served on a single request (2k x 2k builds in a few ms)
+MAX_GRID_SIZE = 4096
+# Largest grid served as nested JSON: 1024^2 is ~20 MB of text; bigger grids need format=binary
+MAX_JSON_GRID_SIZE = 1024
+# Largest grid meshed on a single request: 1025^2 samples mesh in a few hundred ms
+MAX_MESH_GRID_SIZE = 1025
+# Most pyramid tiles contoured on a single request, and the finest interval (metres)
+MAX_CONTOUR_TILES = 64
+MIN_CONTOUR_INTERVAL = 0.5
+# Most lat/lng points accepted by one elevation sampling request
+MAX_SAMPLE_POINTS = 100000
+# Most coordinate pairs converted by one transform request
+MAX_TRANSFORM_POINTS = 1000000
+
+# The Three.js frame terrain.js draws the survey extent in
+scene_frame = SceneFrame(DEFAULT_EXTENT_KM, base_elevation=BASE_ELEVATION)
 
 @app.route("/")
 def index():
-    return app.send_static_file("index.html")
+    return send_asset(STATIC_DIR, "index.html")
 
 @app.route("/js/<path:filename>")
 def serve_js(filename):
-    return send_from_directory("../static/js", filename)
+    return send_asset(os.path.join(STATIC_DIR, "js"), filename)
 
 @app.route("/static/<path:filename>")
 def serve_static(filename):
-    return send_from_directory("../static", filename)
+    return send_asset(STATIC_DIR, filename)
 
 @app.route("/api/bendigo/elevation")
+@response_cache.cached('Accept')
 def bendigo_elevation():
-    """Provide authentic Bendigo elevation data"""
-    import sys
-    import os
-    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    from terrain.generator import generate_bendigo_elevation_data
-    return generate_bendigo_elevation_data()
+    """Provide authentic Bendigo elevation data
+
+    Send Accept: application/octet-stream (or ?format=binary) to receive the grid
+    as raw little-endian float32 behind a 36-byte header instead of nested JSON.
+    JSON grids are limited to MAX_JSON_GRID_SIZE samples a side.
+    """
+    grid_size = min(max(request.args.get('size', DEFAULT_GRID_SIZE, type=int), 2), MAX_GRID_SIZE)
+    extent_km = max(finite_arg('extent', DEFAULT_EXTENT_KM, 'km'), 0.1)
+
+    if wants_binary_elevation():
+        grid = elevation_grid(grid_size, extent_km)
+        response = Response(encode_elevation_grid(grid, extent_km, BASE_ELEVATION), mimetype=ELEVATION_MIME_TYPE)
+    elif grid_size > MAX_JSON_GRID_SIZE:
+        return jsonify({'status': 'error', 'message': f'JSON grids are at most {MAX_JSON_GRID_SIZE} samples a side; '
+                        f'use format=binary for size={grid_size}'}), 400
+    else:
+        response = app.make_response(generate_bendigo_elevation_data(grid_size, extent_km))
+    response.vary.add('Accept')
+    return response
+
+@app.route("/api/bendigo/elevation/tiles")
+@response_cache.cached()
+def bendigo_elevation_tileset():
+    """Describe the elevation tile pyramid"""
+    return jsonify(elevation_pyramid.metadata())
+
+@app.route("/api/bendigo/elevation/tiles/<int:z>/<int:x>/<int:y>")
+@response_cache.cached()
+def bendigo_elevation_tile(z, x, y):
+    """Serve one 256x256 float32 elevation tile, generated on first request"""
+    if not elevation_pyramid.is_valid_tile(z, x, y):
+        abort(404)
+    tile = elevation_pyramid.tile(z, x, y)
+    payload = encode_elevation_grid(tile, elevation_pyramid.tile_extent(z), BASE_ELEVATION)
+    return Response(payload, mimetype=ELEVATION_MIME_TYPE)
+
+@app.route("/api/bendigo/elevation/mesh")
+@response_cache.cached()
+def bendigo_elevation_mesh():
+    """Adaptive terrain mesh over the survey extent as indexed binary geometry
+
+    size is rounded up to 2**k + 1 samples per side; max_error is the
+    vertical tolerance in metres. Positions are float32 metres (east and
+    north of the CBD, elevation), indices uint32 triangles.
+    """
+    grid_size = rtin_size(min(max(request.args.get('size', 257, type=int), 3), MAX_MESH_GRID_SIZE))
+    extent_km = max(finite_arg('extent', DEFAULT_EXTENT_KM, 'km', positive=True), 0.1)
+    max_error = finite_arg('max_error', DEFAULT_MAX_ERROR, 'metres', positive=True)
+    half = extent_km / 2
+    axis = np.linspace(-half, half, grid_size)
+    grid = elevation_from_axes(axis, axis, dtype=np.float64)
+    return terrain_mesh_response(grid, max_error, (-half, -half), extent_km / (grid_size - 1),
+                                 {'extent_km': extent_km})
+
+@app.route("/api/bendigo/elevation/tiles/<int:z>/<int:x>/<int:y>/mesh")
+@response_cache.cached()
+def bendigo_elevation_tile_mesh(z, x, y):
+    """Adaptive mesh of one pyramid tile, sampled at tile_size + 1 points per side"""
+    if not elevation_pyramid.is_valid_tile(z, x, y):
+        abort(404)
+    max_error = finite_arg('max_error', DEFAULT_MAX_ERROR, 'metres', positive=True)
+    x_axis, y_axis = elevation_pyramid.tile_axes(z, x, y, rtin_size(elevation_pyramid.tile_size))
+    grid = elevation_from_axes(x_axis, y_axis, dtype=np.float64)
+    return terrain_mesh_response(grid, max_error, (x_axis[0], y_axis[0]), x_axis[1] - x_axis[0],
+                                 {'tile': [z, x, y], 'extent_km': elevation_pyramid.tile_extent(z)})
+
+@app.route("/api/bendigo/elevation/tiles/<int:z>/<int:x>/<int:y>/analytics")
+@response_cache.cached()
+def bendigo_elevation_tile_analytics(z, x, y):
+    """Slope, aspect, hillshade and curvature rasters for one tile as a binary bundle
+
+    products=slope,hillshade,... picks rasters (default all); azimuth and
+    altitude (degrees) place the hillshade light. Rasters are tile_size
+    square, indexed [x][y] like the elevation tile.
+    """
+    if not elevation_pyramid.is_valid_tile(z, x, y):
+        abort(404)
+    products = request.args.get('products')
+    products = products.split(',') if products else list(PRODUCTS)
+    unknown = [name for name in products if name not in PRODUCTS]
+    if unknown:
+        return jsonify({'status': 'error', 'message': f"unknown products: {', '.join(unknown)}",
+                        'products': list(PRODUCTS)}), 400
+    azimuth = finite_arg('azimuth', DEFAULT_AZIMUTH, 'degrees') % 360
+    altitude = min(max(finite_arg('altitude', DEFAULT_ALTITUDE, 'degrees'), 0.0), 90.0)
+
+    rasters = elevation_pyramid.analytics(z, x, y, azimuth, altitude)
+    manifest = {
+        'tile': [z, x, y],
+        'extent_km': elevation_pyramid.tile_extent(z),
+        'sample_spacing_m': elevation_pyramid.sample_spacing_m(z),
+        'azimuth': azimuth,
+        'altitude': altitude,
+        'units': {name: PRODUCT_UNITS[name] for name in products}
+    }
+    return Response(encode_buffer_bundle(manifest, {name: rasters[name] for name in products}),
+                    mimetype=BUNDLE_MIME_TYPE)
+
+@app.route("/api/bendigo/contours")
+@response_cache.cached('Accept')
+def bendigo_contours():
+    """Contour lines over pyramid tiles as GeoJSON or a binary bundle
+
+    interval is in metres; z picks the pyramid level (finer tiles follow the
+    relief more closely) and bbox=x_min,y_min,x_max,y_max in km from the CBD
+    the area, default the whole pyramid. Segments are cached per tile and
+    interval and joined into polylines across tile edges. format=binary
+    returns float32 east/north metre positions, uint32 polyline start
+    offsets and float32 elevations instead of a GeoJSON FeatureCollection.
+    """
+    interval = request.args.get('interval', DEFAULT_CONTOUR_INTERVAL, type=float)
+    if not np.isfinite(interval):
+        return jsonify({'status': 'error', 'message': 'interval must be a number of metres'}), 400
+    interval = max(interval, MIN_CONTOUR_INTERVAL)
+    z = min(max(request.args.get('z', 2, type=int), 0), elevation_pyramid.max_zoom)
+    half = elevation_pyramid.extent_km / 2
+    try:
+        bbox = [float(value) for value in request.args.get('bbox', f'{-half},{-half},{half},{half}').split(',')]
+        x_min, y_min, x_max, y_max = bbox
+        if not np.all(np.isfinite(bbox)):
+            raise ValueError(bbox)
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'bbox must be x_min,y_min,x_max,y_max in km'}), 400
+    tiles = elevation_pyramid.tiles_in_bounds(z, x_min, x_max, y_min, y_max)
+    if len(tiles) > MAX_CONTOUR_TILES:
+        return jsonify({'status': 'error', 'message': f'{len(tiles)} tiles requested at z={z}; '
+                        f'at most {MAX_CONTOUR_TILES}, use a lower z or a smaller bbox'}), 400
+
+    segments = np.concatenate([elevation_pyramid.contours(z, x, y, interval) for x, y in tiles])
+    polylines = contour_polylines(segments)
+    manifest = {
+        'interval': interval,
+        'z': z,
+        'tiles': [[z, x, y] for x, y in tiles],
+        'sample_spacing_m': elevation_pyramid.sample_spacing_m(z),
+        'line_count': len(polylines)
+    }
+
+    if request.args.get('format') == 'binary' or request.accept_mimetypes.best == BUNDLE_MIME_TYPE:
+        lengths = [len(line) for _, line in polylines]
+        positions = np.concatenate([line for _, line in polylines]) if polylines else np.empty((0, 2))
+        response = Response(encode_buffer_bundle(manifest, {
+            'positions': positions.astype(np.float32),
+            'starts': np.concatenate([[0], np.cumsum(lengths)]).astype(np.uint32),
+            'elevations': np.array([level for level, _ in polylines], dtype=np.float32)
+        }), mimetype=BUNDLE_MIME_TYPE)
+    else:
+        features = []
+        for level, line in polylines:
+            lat, lng = local_to_latlng(line[:, 0], line[:, 1])
+            features.append({
+                'type': 'Feature',
+                'geometry': {'type': 'LineString', 'coordinates': np.round(np.stack([lng, lat], axis=1), 6).tolist()},
+                'properties': {'elevation': level}
+            })
+        response = jsonify({'type': 'FeatureCollection', 'features': features, 'properties': manifest})
+    response.vary.add('Accept')
+    return response
+
+@app.route("/api/bendigo/elevation/sample", methods=['GET', 'POST'])
+def bendigo_elevation_sample():
+    """Ground elevation at a batch of lat/lng points, or along a densified polyline
+
+    POST {"points": [[lat, lng], ...]} or {"polyline": [[lat, lng], ...],
+    "spacing": metres}, or GET ?points=lat,lng,lat,lng,... (or polyline=).
+    Elevations are bilinear in the size x size grid (at most
+    MAX_MESH_GRID_SIZE, default the one the terrain mesh is built from) over
+    the survey extent, null outside it or for non-finite input; distance is
+    metres along the points in order. format=binary returns float32 arrays
+    in a bundle instead of JSON.
+    """
+    body = request.get_json(silent=True)
+    body = body if isinstance(body, dict) else {}
+    mode = 'polyline' if 'polyline' in body or 'polyline' in request.args else 'points'
+    try:
+        if mode in body:
+            coordinates = np.asarray(body[mode], dtype=np.float64).reshape(-1, 2)
+        else:
+            coordinates = np.array(request.args.get(mode, '').split(','), dtype=np.float64).reshape(-1, 2)
+        spacing = float(body.get('spacing', request.args.get('spacing', DEFAULT_PROFILE_SPACING)))
+        if not np.isfinite(spacing):
+            raise ValueError(spacing)
+    except (TypeError, ValueError):
+        return jsonify({'status': 'error', 'message': f'{mode} must be [lat, lng] pairs'}), 400
+    if not len(coordinates) or len(coordinates) > MAX_SAMPLE_POINTS or (mode == 'polyline' and len(coordinates) < 2):
+        return jsonify({'status': 'error', 'message': f'send 1 to {MAX_SAMPLE_POINTS} points '
+                        '(a polyline needs at least 2)'}), 400
+    # Sampling grids are cached per size, so size is held to what can be meshed and extent to the survey's
+    grid_size = min(max(request.args.get('size', SAMPLE_GRID_SIZE, type=int), 2), MAX_MESH_GRID_SIZE)
+    extent_km = request.args.get('extent', DEFAULT_EXTENT_KM, type=float)
+    if extent_km != DEFAULT_EXTENT_KM:
+        return jsonify({'status': 'error', 'message': f'extent must be the survey extent, {DEFAULT_EXTENT_KM} km'}), 400
+
+    lat, lng = coordinates[:, 0], coordinates[:, 1]
+    if mode == 'polyline':
+        east, north, distance, elevation = sample_profile(lat, lng, max(spacing, 0.1), grid_size, extent_km)
+    else:
+        east, north, elevation = sample_latlng(lat, lng, grid_size, extent_km)
+        distance = path_distances(east, north)
+    manifest = {'mode': mode, 'count': len(elevation), 'grid_size': grid_size, 'extent_km': extent_km,
+                'length': finite_or_none(distance[-1:], 2)[0]}
+
+    if request.args.get('format') == 'binary':
+        return Response(encode_buffer_bundle(manifest, {
+            name: values.astype(np.float32)
+            for name, values in (('east', east), ('north', north), ('distance', distance), ('elevation', elevation))
+        }), mimetype=BUNDLE_MIME_TYPE)
+    manifest.update({
+        'east': finite_or_none(east, 2),
+        'north': finite_or_none(north, 2),
+        'distance': finite_or_none(distance, 2),
+        'elevation': finite_or_none(elevation, 2)
+    })
+    return jsonify(manifest)
+
+@app.route("/api/bendigo/transform", methods=['GET', 'POST'])
+def bendigo_transform():
+    """Convert coordinate pairs between wgs84, mga54, mga55, local and scene frames
+
+    POST {"from": "wgs84", "to": "mga55", "coordinates": [[a, b], ...]} or
+    GET ?from=&to=&coordinates=a,b,a,b,... wgs84 pairs are [lat, lng], MGA
+    [easting, northing], local [east, north] metres from the CBD and scene
+    [x, z] units of the terrain scene.
+    """
+    body = request.get_json(silent=True)
+    body = body if isinstance(body, dict) else {}
+    source = body.get('from', request.args.get('from', 'wgs84'))
+    target = body.get('to', request.args.get('to', 'local'))
+    if source not in FRAMES or target not in FRAMES:
+        return jsonify({'status': 'error', 'message': f"frames must be one of {', '.join(FRAMES)}"}), 400
+    try:
+        if 'coordinates' in body:
+            coordinates = np.asarray(body['coordinates'], dtype=np.float64).reshape(-1, 2)
+        else:
+            coordinates = np.array(request.args.get('coordinates', '').split(','), dtype=np.float64).reshape(-1, 2)
+    except (TypeError, ValueError):
+        return jsonify({'status': 'error', 'message': 'coordinates must be pairs of numbers'}), 400
+    if not len(coordinates) or len(coordinates) > MAX_TRANSFORM_POINTS:
+        return jsonify({'status': 'error', 'message': f'send 1 to {MAX_TRANSFORM_POINTS} coordinate pairs'}), 400
+    if not np.isfinite(coordinates).all():
+        return jsonify({'status': 'error', 'message': 'coordinates must be finite numbers'}), 400
+
+    a, b = transform(coordinates[:, 0], coordinates[:, 1], source, target, scene_frame)
+    # Degrees to ~1 cm, metres and scene units to 1 mm; pairs outside a projection's domain come back null
+    decimals = 7 if target == 'wgs84' else 3
+    return jsonify({
+        'from': source,
+        'to': target,
+        'scene': scene_frame.describe(),
+        'coordinates': finite_or_none(np.stack([a, b], axis=1), decimals)
+    })
+
+def terrain_mesh_response(grid, max_error, origin_km, spacing_km, manifest):
+    positions, triangles = rtin_mesh(grid, max_error, np.multiply(origin_km, 1000.0),
+                                     (spacing_km * 1000.0, spacing_km * 1000.0))
+    manifest.update({
+        'grid_size': grid.shape[0],
+        'max_error': max_error,
+        'base_elevation': BASE_ELEVATION,
+        'vertex_count': len(positions),
+        'triangle_count': len(triangles)
+    })
+    return Response(encode_buffer_bundle(manifest, {'positions': positions, 'indices': triangles}),
+                    mimetype=BUNDLE_MIME_TYPE)
+
+def finite_arg(name, default, unit, positive=False):
+    """Float query parameter (default when absent or unparseable); NaN, infinities and,
+    when positive, values <= 0 answer 400"""
+    value = request.args.get(name, default, type=float)
+    if not np.isfinite(value) or (positive and value <= 0):
+        kind = 'a positive number' if positive else 'a number'
+        abort(make_response(jsonify({'status': 'error', 'message': f'{name} must be {kind} of {unit}'}), 400))
+    return value
+
+def wants_binary_elevation():
+    """Content negotiation between the JSON and binary elevation encodings"""
+    if 'format' in request.args:
+        return request.args['format'] == 'binary'
+    best = request.accept_mimetypes.best_match(['application/json', ELEVATION_MIME_TYPE])
+    return best == ELEVATION_MIME_TYPE
 
 @app.route("/api/bendigo/mining-sites")
+@response_cache.cached()
 def bendigo_mining_sites():
-    """Authentic Bendigo mining heritage sites"""
+    """Authentic Bendigo mining heritage sites, with ground elevation and east/north metres from the CBD"""
+    sites = [
+        {
+            'name': 'Central Deborah Gold Mine',
+            'coordinates': [-36.7586, 144.2851],
+            'depth': 412,
+            'established': 1854,
+            'production': '15,000 kg gold',
+            'status': 'Heritage site and museum'
+        },
+        {
+            'name': 'Fortuna Villa Mine',
+            'coordinates': [-36.7612, 144.2798],
+            'depth': 180,
+            'established': 1856,
+            'production': '8,200 kg gold',
+            'status': 'Heritage site'
+        },
+        {
+            'name': 'Red White & Blue Extended Shaft',
+            'coordinates': [-36.7606, 144.2831],
+            'depth': 350,
+            'established': 1858,
+            'production': '12,500 kg gold',
+            'status': 'Heritage site'
+        },
+        {
+            'name': 'Garden Gully Mine',
+            'coordinates': [-36.7640, 144.2780],
+            'depth': 290,
+            'established': 1859,
+            'production': '9,800 kg gold',
+            'status': 'Heritage site'
+        },
+        {
+            'name': 'Diamond Hill Mine',
+            'coordinates': [-36.7550, 144.2900],
+            'depth': 220,
+            'established': 1862,
+            'production': '6,400 kg gold',
+            'status': 'Heritage site'
+        }
+    ]
+    coordinates = np.array([site['coordinates'] for site in sites])
+    east, north, elevation = sample_latlng(coordinates[:, 0], coordinates[:, 1])
+    scene = np.stack(scene_frame.to_scene(east, north, np.nan_to_num(elevation, nan=BASE_ELEVATION)), axis=1)
+    for site, e, n, z, position in zip(sites, east.tolist(), north.tolist(), elevation.tolist(),
+                                       np.round(scene, 3).tolist()):
+        site['local'] = {'east': round(e, 2), 'north': round(n, 2)}
+        site['elevation'] = None if z != z else round(z, 2)
+        site['scene'] = position
     return {
-        'sites': [
-            {
-                'name': 'Central Deborah Gold Mine',
-                'coordinates': [-36.7586, 144.2851],
-                'depth': 412,
-                'established': 1854,
-                'production': '15,000 kg gold',
-                'status': 'Heritage site and museum'
-            },
-            {
-                'name': 'Fortuna Villa Mine',
-                'coordinates': [-36.7612, 144.2798],
-                'depth': 180,
-                'established': 1856,
-                'production': '8,200 kg gold',
-                'status': 'Heritage site'
-            },
-            {
-                'name': 'Red White & Blue Extended Shaft',
-                'coordinates': [-36.7606, 144.2831],
-                'depth': 350,
-                'established': 1858,
-                'production': '12,500 kg gold',
-                'status': 'Heritage site'
-            },
-            {
-                'name': 'Garden Gully Mine',
-                'coordinates': [-36.7640, 144.2780],
-                'depth': 290,
-                'established': 1859,
-                'production': '9,800 kg gold',
-                'status': 'Heritage site'
-            },
-            {
-                'name': 'Diamond Hill Mine',
-                'coordinates': [-36.7550, 144.2900],
-                'depth': 220,
-                'established': 1862,
-                'production': '6,400 kg gold',
-                'status': 'Heritage site'
-            }
-        ],
+        'sites': sites,
+        'scene': scene_frame.describe(),
         'region': 'Bendigo Goldfields',
         'geological_formation': 'Bendigo Formation (Ordovician)',
         'total_historical_production': '62,900 kg gold'
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Block-model estimation benchmark
+IDW and ordinary-kriging estimates of 2 m composites from a synthetic
+aircore database onto a multi-million block grid, repeated for 1, 2, 4 ...
+pool workers up to the CPU count
+Run from the BendoProspector directory: python benchmarks/bench_block_model.py [HOLES] [BLOCK_M]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from geology import blockmodel
+from geology.blockmodel import BlockGrid, composite_samples, estimate_block_model
+from geology.composites import fixed_length_composites
+from geology.drillholes import DrillHoleStore
+
+def synthetic_drilling(holes, seed=5):
+    """Vertical holes on a ~4 x 4 km patch, grades raised along a NE-trending reef"""
+    rng = np.random.default_rng(seed)
+    lat = -36.76 + rng.uniform(-0.018, 0.018, holes)
+    lng = 144.28 + rng.uniform(-0.022, 0.022, holes)
+    depth = rng.integers(60, 300, holes)
+    hole = np.repeat(np.arange(holes), depth)
+    depth_from = np.concatenate([np.arange(d) for d in depth]).astype(np.float32)
+    reef = np.exp(-((lng - 144.28) - (lat + 36.76)) ** 2 / 0.004 ** 2)
+    grade = rng.lognormal(-2.5, 1.2, hole.size) * (1 + 20 * reef[hole])
+    return DrillHoleStore([f'BAC{i:05d}' for i in range(holes)], lat, lng, depth, np.full(holes, 'NaT'),
+                          hole, depth_from, depth_from + 1, grade)
+
+def main():
+    holes = int(sys.argv[1]) if len(sys.argv) > 1 else 1500
+    block = float(sys.argv[2]) if len(sys.argv) > 2 else 20.0
+    store = synthetic_drilling(holes)
+    points, grades = composite_samples(store, fixed_length_composites(store, 2.0))
+    grid = BlockGrid.covering(points, (block, block, 10.0))
+    print(f'{holes:,} holes, {len(points):,} composites, grid {grid.shape} = {grid.block_count:,} blocks, '
+          f"neighbour search: {'scipy cKDTree' if blockmodel.cKDTree is not None else 'NumPy slabs'}")
+
+    cpus = os.cpu_count() or 1
+    counts = sorted({1 << i for i in range(cpus.bit_length()) if 1 << i <= cpus} | {cpus})
+    print(f"{'method':>8} {'workers':>8} {'seconds':>9} {'blocks/s':>10} {'estimated':>10}")
+    for method in ('idw', 'kriging'):
+        baseline = None
+        for workers in counts:
+            start = time.perf_counter()
+            estimates, _ = estimate_block_model(points, grades, grid, method=method, workers=workers)
+            seconds = time.perf_counter() - start
+            baseline = baseline or seconds
+            estimated = int(np.count_nonzero(~np.isnan(estimates)))
+            print(f'{method:>8} {workers:>8} {seconds:>9.1f} {estimated / seconds:>10,.0f} {estimated:>10,}'
+                  f'  ({baseline / seconds:.1f}x)')
+
+if __name__ == '__main__':
+    main()
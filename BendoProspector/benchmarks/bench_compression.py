@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Response compression benchmark
+Fetches JSON and binary API payloads from both apps through the Flask test
+client without and with each available content coding, and tabulates body
+size, server time for the first compressed request (the one that pays for
+compression) and for later ones (served from the compressed cache), and the
+transfer time of the body over a 10 Mbit/s field 4G link
+Run from the BendoProspector directory: python benchmarks/bench_compression.py [DXF_MB]
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from synthetic_dxf import write_synthetic_dxf
+
+LINK_BYTES_PER_SECOND = 10e6 / 8
+REPEATS = 5
+
+def timed(client, url, headers):
+    start = time.perf_counter()
+    response = client.get(url, headers=headers)
+    return response, (time.perf_counter() - start) * 1000
+
+def main():
+    dxf_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 10
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ.setdefault('BENDIGO_CACHE_DIR', os.path.join(directory, 'cache'))
+        import main as server
+        from app import main as terrain
+        from app.compression import CODECS
+
+        server.DXF_PATH = Path(directory) / 'model.dxf'
+        write_synthetic_dxf(server.DXF_PATH, dxf_mb)
+        monolith, viewer = server.app.test_client(), terrain.app.test_client()
+        endpoints = [
+            (viewer, '/api/bendigo/elevation?size=512', 'elevation grid, JSON'),
+            (viewer, '/api/bendigo/elevation?size=512&format=binary', 'elevation grid, binary'),
+            (viewer, '/api/bendigo/elevation/mesh?size=513', 'terrain mesh bundle'),
+            (monolith, '/api/geological-data', 'geological data, JSON'),
+            (monolith, '/api/dxf/layers', 'DXF layer metadata, JSON'),
+            (monolith, '/api/dxf/geometry', f'DXF geometry bundle ({dxf_mb:g} MB DXF)'),
+        ]
+        print(f'{"payload":38} {"coding":8} {"bytes":>10} {"ratio":>6} {"first ms":>9} {"later ms":>9} '
+              f'{"4G ms":>8}')
+        for client, url, label in endpoints:
+            client.get(url)  # build (and cache) the uncompressed body
+            for coding in ('identity',) + tuple(CODECS):
+                headers = {'Accept-Encoding': coding}
+                response, first = timed(client, url, headers)
+                later = min(timed(client, url, headers)[1] for _ in range(REPEATS))
+                size = len(response.data)
+                if coding == 'identity':
+                    identity = size
+                elif response.headers.get('Content-Encoding') != coding:
+                    continue  # not offered for this content type
+                print(f'{label:38} {coding:8} {size:10,} {identity / size:5.1f}x {first:9.1f} {later:9.1f} '
+                      f'{size / LINK_BYTES_PER_SECOND * 1000:8.0f}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Contour benchmark
+Vectorized marching squares over a 2k x 2k elevation grid at a few
+intervals, against one marching-squares pass per level (the usual loop,
+which rescans the whole grid for every level), plus segment stitching and
+contouring the pyramid tiles behind one /api/bendigo/contours request
+Run from the BendoProspector directory: python benchmarks/bench_contours.py [N]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from terrain.contours import contour_levels, contour_polylines, contour_segments
+from terrain.generator import elevation_from_axes
+from terrain.tiles import ElevationPyramid
+
+INTERVALS = (10.0, 5.0, 1.0, 0.5)
+
+def per_level(grid, interval):
+    """contour_segments run separately for each level, as a per-level loop would"""
+    low, high = float(grid.min()), float(grid.max())
+    levels = contour_levels(low, high, interval)
+    parts = []
+    for level in levels:
+        # With an interval wider than the relief, base is the only level that crosses
+        parts.append(contour_segments(grid, 2 * (high - low) + 1, base=level))
+    return np.concatenate(parts), len(levels)
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2048
+    axis = np.linspace(-12, 12, n)
+    grid = elevation_from_axes(axis, axis)
+    print(f'{n}x{n} grid, relief {grid.min():.1f}-{grid.max():.1f} m')
+    for interval in INTERVALS:
+        seconds, segments = timed(contour_segments, grid, interval)
+        stitch_seconds, lines = timed(contour_polylines, segments)
+        loop_seconds, (_, levels) = timed(per_level, grid, interval)
+        print(f'  {interval:4g} m: {levels:3d} levels {len(segments):>9,} segments {seconds * 1000:7.0f} ms '
+              f'(per-level passes {loop_seconds * 1000:7.0f} ms), {len(lines):5,} polylines stitched in '
+              f'{stitch_seconds * 1000:5.0f} ms')
+
+    # A fresh pyramid so no tile or contour is cached yet
+    pyramid = ElevationPyramid()
+    tiles = pyramid.tiles_in_bounds(4, -6, 6, -6, 6)
+    for label in ('cold', 'cached'):
+        start = time.perf_counter()
+        segments = np.concatenate([pyramid.contours(4, x, y, 2.0) for x, y in tiles])
+        lines = contour_polylines(segments)
+        print(f'  {len(tiles)} z=4 tiles at 2 m, {label}: {len(lines)} polylines in '
+              f'{(time.perf_counter() - start) * 1000:.0f} ms')
+
+if __name__ == '__main__':
+    main()
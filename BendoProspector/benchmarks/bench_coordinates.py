@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Coordinate transform benchmark
+WGS84 <-> MGA55, MGA54 -> MGA55 and WGS84 -> scene over a million points
+around the goldfield, against the same transforms called one point at a
+time, with round-trip error and a check against a published GDA94 control
+point
+Run from the BendoProspector directory: python benchmarks/bench_coordinates.py [N]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from terrain.coordinates import CBD_LATLNG, mga_to_wgs84, transform, wgs84_to_mga
+
+LOOP_POINTS = 2000
+# Flinders Peak (GDA94 technical manual worked example) and its MGA55 coordinates
+CONTROL_LATLNG = (-(37 + 57 / 60 + 3.7203 / 3600), 144 + 25 / 60 + 29.5244 / 3600)
+CONTROL_MGA55 = (273741.2966, 5796489.7769)
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    rng = np.random.default_rng(5)
+    lat = CBD_LATLNG[0] + rng.uniform(-0.5, 0.5, n)
+    lng = CBD_LATLNG[1] + rng.uniform(-0.5, 0.5, n)
+
+    easting, northing = wgs84_to_mga(*CONTROL_LATLNG, 55)
+    print(f'control point error {np.hypot(easting - CONTROL_MGA55[0], northing - CONTROL_MGA55[1]) * 1000:.3f} mm')
+
+    mga54 = transform(lat, lng, 'wgs84', 'mga54')
+    for label, args in (('wgs84 -> mga55', (lat, lng, 'wgs84', 'mga55')),
+                        ('mga55 -> wgs84', (*wgs84_to_mga(lat, lng, 55), 'mga55', 'wgs84')),
+                        ('mga54 -> mga55', (*mga54, 'mga54', 'mga55')),
+                        ('wgs84 -> scene', (lat, lng, 'wgs84', 'scene'))):
+        seconds, _ = timed(transform, *args)
+        a, b = args[0][:LOOP_POINTS].tolist(), args[1][:LOOP_POINTS].tolist()
+        start = time.perf_counter()
+        for x, y in zip(a, b):
+            transform(x, y, *args[2:])
+        loop_seconds = (time.perf_counter() - start) * n / LOOP_POINTS
+        print(f'  {label}: {n:,} points {seconds * 1000:7.0f} ms ({seconds / n * 1e9:4.0f} ns/point), '
+              f'per-point calls ~{loop_seconds:5.1f} s ({loop_seconds / seconds:.0f}x)')
+
+    back_lat, back_lng = mga_to_wgs84(*wgs84_to_mga(lat, lng, 55), 55)
+    error = np.hypot((back_lat - lat) * 111320, (back_lng - lng) * 111320 * np.cos(np.radians(lat)))
+    print(f'  round trip error: max {error.max() * 1000:.1e} mm')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Static and binary delivery benchmark
+Precompresses a copy of static/js and compares the bytes sent with and
+without Accept-Encoding, then times a full fetch, a 304 revalidation and a
+resumed (Range + If-Range) fetch of a synthetic N MB DXF geometry bundle
+through the Flask test client
+Run from the BendoProspector directory: python benchmarks/bench_delivery.py [N]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from synthetic_dxf import write_synthetic_dxf
+
+def timed(client, url, headers=None):
+    start = time.perf_counter()
+    response = client.get(url, headers=headers or {})
+    return response, (time.perf_counter() - start) * 1000
+
+def main():
+    size_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 20
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ.setdefault('BENDIGO_CACHE_DIR', os.path.join(directory, 'cache'))
+        import main as server
+        from app.delivery import precompress
+
+        static = Path(directory) / 'static'
+        shutil.copytree('static/js', static / 'js')
+        precompress(static)
+        server.STATIC_DIR = static
+        client = server.app.test_client()
+        plain = packed = 0
+        for path in sorted((static / 'js').rglob('*.js')):
+            url = f'/static/{path.relative_to(static).as_posix()}'
+            plain += len(client.get(url).data)
+            packed += len(client.get(url, headers={'Accept-Encoding': 'br, gzip'}).data)
+        print(f'static/js: {plain / 1e3:.0f} KB plain, {packed / 1e3:.0f} KB precompressed '
+              f'({plain / max(packed, 1):.1f}x less, no per-request compression)')
+
+        dxf = Path(directory) / 'model.dxf'
+        write_synthetic_dxf(dxf, size_mb)
+        server.DXF_PATH = dxf
+        client.get('/api/dxf/geometry')  # parse and cache the model
+        full, full_ms = timed(client, '/api/dxf/geometry')
+        etag = full.headers['ETag']
+        body = len(full.data)
+        print(f'{size_mb:g} MB DXF geometry bundle: {body / 1e6:.1f} MB in {full_ms:.0f} ms')
+        revalidated, revalidate_ms = timed(client, '/api/dxf/geometry', {'If-None-Match': etag})
+        print(f'  revalidation: {revalidated.status_code}, {revalidate_ms:.1f} ms, 0 bytes')
+        resume_at = int(body * 0.6)
+        resumed, resume_ms = timed(client, '/api/dxf/geometry', {'Range': f'bytes={resume_at}-', 'If-Range': etag})
+        assert resumed.data == full.data[resume_at:]
+        print(f'  resume after 60%: {resumed.status_code}, {len(resumed.data) / 1e6:.1f} MB in {resume_ms:.0f} ms '
+              f'({body / len(resumed.data):.1f}x less than restarting)')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Drill-hole store benchmark
+Interval query latency of the sorted-index store against a full column scan
+and against walking the nested-dict records /api/geological-data used, over
+a synthetic aircore database (1 m intervals down every hole)
+Run from the BendoProspector directory: python benchmarks/bench_drill_holes.py [HOLES]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from geology.drillholes import DrillHoleStore, parse_grade
+
+QUERIES = 50
+
+LITHOLOGIES = ('', 'Quaternary alluvium', 'Weathered Ordovician', 'Sandstone', 'Slate')
+
+def synthetic_store(holes, seed=11):
+    """Holes around Bendigo, 40-200 m deep, lognormal gold grades in 1 m intervals
+
+    Lithology changes every 10 m downhole.
+    """
+    rng = np.random.default_rng(seed)
+    depth = rng.integers(40, 200, holes)
+    hole = np.repeat(np.arange(holes), depth)
+    depth_from = np.concatenate([np.arange(d) for d in depth]).astype(np.float32)
+    grade = rng.lognormal(-2.5, 1.6, hole.size).astype(np.float32)
+    lithology = (depth_from.astype(np.int64) // 10 + hole) % (len(LITHOLOGIES) - 1) + 1
+    return DrillHoleStore(
+        [f'BAC{i:06d}' for i in range(holes)],
+        -36.76 + rng.uniform(-0.1, 0.1, holes), 144.28 + rng.uniform(-0.1, 0.1, holes),
+        depth, np.full(holes, 'NaT'), hole, depth_from, depth_from + 1, grade, lithology, LITHOLOGIES
+    )
+
+def nested_records(store):
+    """The same data as the original per-hole dicts with grade strings"""
+    records = []
+    for h in range(len(store)):
+        ids = range(store.interval_offsets[h], store.interval_offsets[h + 1])
+        records.append({'id': str(store.hole_ids[h]), 'significant_intervals': [
+            {'from': float(store.depth_from[i]), 'to': float(store.depth_to[i]),
+             'grade': f'{store.grade[i]:.2f} g/t Au'} for i in ids]})
+    return records
+
+def main():
+    holes = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    start = time.perf_counter()
+    store = synthetic_store(holes)
+    print(f'{len(store):,} holes, {store.interval_count:,} intervals; store built in '
+          f'{time.perf_counter() - start:.2f} s')
+    records = nested_records(store)
+
+    rng = np.random.default_rng(3)
+    timings = {'index': [], 'scan': [], 'nested': []}
+    matches = []
+    for query in range(QUERIES):
+        top = float(rng.uniform(0, 150))
+        bottom, min_grade = top + 10, float(rng.uniform(1, 5))
+
+        start = time.perf_counter()
+        found = store.query_intervals(top, bottom, min_grade)
+        timings['index'].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        expected = np.flatnonzero((store.depth_from <= np.float32(bottom)) & (store.depth_to >= np.float32(top))
+                                  & (store.grade >= np.float32(min_grade)))
+        timings['scan'].append(time.perf_counter() - start)
+        assert np.array_equal(found, expected)
+
+        if query < 3:
+            start = time.perf_counter()
+            count = sum(1 for record in records for interval in record['significant_intervals']
+                        if interval['from'] <= bottom and interval['to'] >= top
+                        and parse_grade(interval['grade']) >= min_grade)
+            timings['nested'].append(time.perf_counter() - start)
+        matches.append(found.size)
+
+    print(f'10 m depth window + grade threshold, median {int(np.median(matches)):,} matching intervals')
+    for name, values in timings.items():
+        print(f'{name:>7} {float(np.median(values)) * 1000:>10.2f} ms')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+DXF parse benchmark
+Peak RSS and throughput of the streaming parser against the original
+read-everything implementation on a synthetic multi-hundred-MB DXF
+Run from the BendoProspector directory: python benchmarks/bench_dxf_parse.py [SIZE_MB]
+"""
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def legacy_parse(filepath):
+    """Original BendigoDXFParser.parse_dxf_file: whole file and line list in memory"""
+    layers, entities = {}, []
+    with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
+        content = f.read()
+
+    lines = content.split('\n')
+    current_entity = None
+
+    for i, line in enumerate(lines):
+        line = line.strip()
+
+        if line == '0' and i + 1 < len(lines):
+            next_line = lines[i + 1].strip()
+
+            if next_line == '3DFACE':
+                if current_entity:
+                    entities.append(current_entity)
+                current_entity = {'type': '3DFACE', 'layer': '', 'coords': {}}
+
+        elif current_entity and line == '8' and i + 1 < len(lines):
+            layer_name = lines[i + 1].strip()
+            current_entity['layer'] = layer_name
+            layers.setdefault(layer_name, []).append(current_entity)
+
+    if current_entity:
+        entities.append(current_entity)
+    return len(entities)
+
+def streaming_parse(filepath):
+    from geology.dxf import BendigoDXFParser
+    return BendigoDXFParser().parse_dxf_file(filepath)['entities']
+
+def tokenize_only(filepath):
+    """Stream every entity without retaining it: the reader's own footprint"""
+    from geology.dxf import iter_entities, open_dxf
+    with open_dxf(filepath) as f:
+        return sum(1 for _ in iter_entities(f))
+
+IMPLEMENTATIONS = {'legacy': legacy_parse, 'streaming': streaming_parse, 'tokenizer': tokenize_only}
+
+def run_child(implementation, filepath):
+    """Parse in a fresh process so ru_maxrss reflects only that parser"""
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, __file__, '--child', implementation, filepath],
+        check=True, capture_output=True, text=True
+    ).stdout.split()
+    return int(output[0]), int(output[1]) / 1024, time.perf_counter() - start
+
+def main():
+    from synthetic_dxf import write_synthetic_dxf
+
+    size_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 300
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'synthetic_bendigo.dxf')
+        faces = write_synthetic_dxf(path, size_mb)
+        file_mb = os.path.getsize(path) / 1024 / 1024
+        print(f'{file_mb:.0f} MB synthetic DXF, {faces:,} 3DFACE entities')
+        print(f"{'parser':>10} {'entities':>10} {'peak RSS MB':>12} {'seconds':>8} {'MB/s':>7}")
+        for implementation in IMPLEMENTATIONS:
+            entities, peak_mb, seconds = run_child(implementation, path)
+            print(f'{implementation:>10} {entities:>10,} {peak_mb:>12.0f} {seconds:>8.1f} {file_mb / seconds:>7.1f}')
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        count = IMPLEMENTATIONS[sys.argv[2]](sys.argv[3])
+        print(count, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+    else:
+        main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+DXF spatial index benchmark
+Per-query latency of the face BVH against a brute-force scan for 500 m box
+queries and downward camera rays over a synthetic model
+Run from the BendoProspector directory: python benchmarks/bench_dxf_spatial.py [SIZE_MB]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from geology.dxf_cache import DXFModelCache
+from geology.spatial import ray_triangle_distances, triangles_overlapping_box
+from synthetic_dxf import write_synthetic_dxf
+
+QUERIES = 200
+
+def median_ms(timings):
+    return float(np.median(timings)) * 1000
+
+def main():
+    size_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 100
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'synthetic_bendigo.dxf')
+        write_synthetic_dxf(path, size_mb)
+        start = time.perf_counter()
+        DXFModelCache(os.path.join(tmp, 'cache')).load(path)
+        build_s = time.perf_counter() - start
+        model = DXFModelCache(os.path.join(tmp, 'cache')).load(path)
+
+        corners = model.face_corners(np.arange(len(model.triangles)))
+        low, high = corners.reshape(-1, 3).min(axis=0), corners.reshape(-1, 3).max(axis=0)
+        print(f'{len(corners):,} faces; parse + BVH build + store {build_s:.1f} s')
+
+        rng = np.random.default_rng(7)
+        timings = {'box bvh': [], 'box scan': [], 'ray bvh': [], 'ray scan': []}
+        hits = []
+        for query in range(QUERIES):
+            centre = rng.uniform(low, high)
+            box_low, box_high = centre - 250, centre + 250
+            start = time.perf_counter()
+            found = model.query_box(box_low, box_high)
+            timings['box bvh'].append(time.perf_counter() - start)
+            start = time.perf_counter()
+            expected = np.flatnonzero(triangles_overlapping_box(corners, box_low, box_high))
+            timings['box scan'].append(time.perf_counter() - start)
+            assert np.array_equal(np.sort(found), expected)
+            hits.append(found.size)
+
+            origin = rng.uniform(low, high)
+            origin[2] = high[2] + 100
+            direction = np.array([0.1, 0.05, -1.0]) / np.linalg.norm([0.1, 0.05, -1.0])
+            start = time.perf_counter()
+            hit = model.raycast(origin, direction)
+            timings['ray bvh'].append(time.perf_counter() - start)
+            start = time.perf_counter()
+            distances = ray_triangle_distances(origin, direction, corners)
+            timings['ray scan'].append(time.perf_counter() - start)
+            nearest = int(np.argmin(distances))
+            assert (hit is None) == (not np.isfinite(distances[nearest]))
+
+        print(f'median faces per 500 m box: {int(np.median(hits)):,}')
+        print(f"{'query':>6} {'bvh ms':>8} {'scan ms':>9} {'speedup':>8}")
+        for kind in ('box', 'ray'):
+            bvh, scan = median_ms(timings[f'{kind} bvh']), median_ms(timings[f'{kind} scan'])
+            print(f'{kind:>6} {bvh:>8.3f} {scan:>9.1f} {scan / bvh:>7.0f}x')
+
+if __name__ == '__main__':
+    main()
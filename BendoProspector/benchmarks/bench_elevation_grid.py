@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Elevation grid benchmark
+Compares the vectorized terrain engine against the original per-cell loop
+Run from the BendoProspector directory: python benchmarks/bench_elevation_grid.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from terrain.generator import elevation_grid
+
+def reference_loop_grid(grid_size):
+    """Original per-cell implementation of generate_elevation_grid"""
+    elevation_grid = np.full((grid_size, grid_size), 210.0)
+
+    for i in range(grid_size):
+        for j in range(grid_size):
+            x = (i - grid_size/2) * 0.1
+            y = (j - grid_size/2) * 0.1
+
+            ridge_elevation = 15 * np.sin(x * 0.3 + y * 0.2)
+            valley_depression = -8 * np.abs(np.sin(x * 0.2)) * np.abs(np.cos(y * 0.25))
+            local_variation = 5 * np.sin(x * 0.5) * np.cos(y * 0.4)
+            fault_influence = 3 * np.sin(x * 0.1 + np.pi/4)
+
+            elevation_grid[i, j] += ridge_elevation + valley_depression + local_variation + fault_influence
+
+    return elevation_grid
+
+def best_of(fn, repeat=5):
+    """Best wall-clock time of several runs, in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+def main():
+    print(f"{'grid':>11} {'loop ms':>10} {'vector ms':>10} {'speedup':>9} {'max |diff| m':>13}")
+    for size in (120, 250, 500):
+        # Spacing stays at 100 m so both implementations cover the same cells
+        extent = size * 0.1
+        start = time.perf_counter()
+        reference = reference_loop_grid(size)
+        loop_ms = (time.perf_counter() - start) * 1000
+        vector_ms = best_of(lambda: elevation_grid(size, extent))
+        diff = np.abs(elevation_grid(size, extent).astype(np.float64) - reference).max()
+        print(f"{size:>5}x{size:<5} {loop_ms:>10.1f} {vector_ms:>10.2f} {loop_ms / vector_ms:>8.0f}x {diff:>13.2e}")
+
+    for size in (1024, 2048, 4096):
+        vector_ms = best_of(lambda: elevation_grid(size))
+        print(f"{size:>5}x{size:<5} {'-':>10} {vector_ms:>10.2f} {'-':>9} {'-':>13}")
+
+if __name__ == '__main__':
+    main()
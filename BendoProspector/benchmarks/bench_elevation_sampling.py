@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Elevation sampling benchmark
+Batched bilinear lookups of random lat/lng points over the survey extent
+against a per-point Python loop (one call per point, as one request per
+marker would be), plus densified profile sampling
+Run from the BendoProspector directory: python benchmarks/bench_elevation_sampling.py [N]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from terrain.coordinates import CBD_LATLNG, latlng_to_local
+from terrain.sampling import sample_latlng, sample_profile, sampling_grid
+
+LOOP_POINTS = 5000
+
+def per_point(lat, lng):
+    """Bilinear lookups one point at a time"""
+    grid, origin, spacing = sampling_grid()
+    values = []
+    for a, b in zip(lat.tolist(), lng.tolist()):
+        east, north = latlng_to_local(a, b)
+        fi, fj = (east - origin[0]) / spacing[0], (north - origin[1]) / spacing[1]
+        i, j = min(int(fi), grid.shape[0] - 2), min(int(fj), grid.shape[1] - 2)
+        u, v = fi - i, fj - j
+        values.append(grid[i, j] * (1 - u) * (1 - v) + grid[i + 1, j] * u * (1 - v)
+                      + grid[i, j + 1] * (1 - u) * v + grid[i + 1, j + 1] * u * v)
+    return np.array(values)
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rng = np.random.default_rng(4)
+    # Inside the 12 km survey extent
+    lat = CBD_LATLNG[0] + rng.uniform(-0.05, 0.05, n)
+    lng = CBD_LATLNG[1] + rng.uniform(-0.06, 0.06, n)
+    sampling_grid()
+
+    start = time.perf_counter()
+    _, _, elevation = sample_latlng(lat, lng)
+    seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    looped = per_point(lat[:LOOP_POINTS], lng[:LOOP_POINTS])
+    loop_seconds = (time.perf_counter() - start) * n / LOOP_POINTS
+    print(f'{n:,} points: batched {seconds * 1000:.1f} ms, per-point loop ~{loop_seconds * 1000:.0f} ms '
+          f'({loop_seconds / seconds:.0f}x), max difference {np.abs(elevation[:LOOP_POINTS] - looped).max():.1e} m')
+
+    vertices = 50
+    path_lat = CBD_LATLNG[0] + rng.uniform(-0.05, 0.05, vertices)
+    path_lng = CBD_LATLNG[1] + rng.uniform(-0.06, 0.06, vertices)
+    for spacing in (10.0, 1.0):
+        start = time.perf_counter()
+        _, _, distance, _ = sample_profile(path_lat, path_lng, spacing)
+        print(f'  {vertices}-vertex profile at {spacing:g} m: {len(distance):,} samples over '
+              f'{distance[-1] / 1000:.1f} km in {(time.perf_counter() - start) * 1000:.1f} ms')
+
+if __name__ == '__main__':
+    main()
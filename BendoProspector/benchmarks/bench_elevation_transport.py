@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Elevation transport benchmark
+Encode time and bytes-on-the-wire for the JSON and binary elevation encodings
+Run from the BendoProspector directory: python benchmarks/bench_elevation_transport.py
+"""
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from terrain.encoding import decode_elevation_grid, encode_elevation_grid
+from terrain.generator import BASE_ELEVATION, DEFAULT_EXTENT_KM, elevation_grid
+
+def best_of(fn, repeat=3):
+    """Best wall-clock time of several runs, in milliseconds, plus the last result"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings), result
+
+def main():
+    print(f"{'grid':>11} {'json ms':>9} {'json bytes':>12} {'parse ms':>9} "
+          f"{'binary ms':>10} {'binary bytes':>13} {'decode ms':>10}")
+    for size in (120, 512, 1024, 2048):
+        grid = elevation_grid(size)
+        json_ms, body = best_of(lambda: json.dumps({'grid_data': grid.tolist()}))
+        parse_ms, _ = best_of(lambda: json.loads(body))
+        binary_ms, payload = best_of(lambda: encode_elevation_grid(grid, DEFAULT_EXTENT_KM, BASE_ELEVATION))
+        decode_ms, _ = best_of(lambda: decode_elevation_grid(payload))
+        print(f"{size:>5}x{size:<5} {json_ms:>9.1f} {len(body):>12,} {parse_ms:>9.1f} "
+              f"{binary_ms:>10.2f} {len(payload):>13,} {decode_ms:>10.3f}")
+
+if __name__ == '__main__':
+    main()
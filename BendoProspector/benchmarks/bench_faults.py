@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Fault shapefile benchmark
+Opens the GSV fault interpretation (memory-mapped record headers and
+attribute columns only), then times goldfield-sized bbox queries against
+reading, reprojecting and filtering every trace, as a full load would
+Run from the BendoProspector directory: python benchmarks/bench_faults.py [QUERIES]
+"""
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from geology.faults import FaultSet
+from geology.shapefile import Shapefile, extract_shapefile
+from terrain.coordinates import CBD_LATLNG
+
+FAULTS_PATH = 'attached_assets/G171947_GSV-TR2023-3_Att-A1_Central-and-Western-Victorian-Fault-Interpretation_1750722084442.zip'
+
+def main():
+    queries = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    shp = extract_shapefile(FAULTS_PATH)
+    start = time.perf_counter()
+    shapes = Shapefile(shp)
+    print(f'open {shp.name}: {(time.perf_counter() - start) * 1000:.1f} ms, {len(shapes):,} records, '
+          f'.shp {os.path.getsize(shp) / 1e3:.0f} KB, .dbf {os.path.getsize(shp.with_suffix(".dbf")) / 1e6:.1f} MB')
+    faults = FaultSet(shapes, 'mga54')
+
+    start = time.perf_counter()
+    records, lines = faults.query()
+    full = time.perf_counter() - start
+    payload = len(json.dumps(faults.features(records, lines)))
+    print(f'  every trace: {full * 1000:.1f} ms, {payload / 1e6:.1f} MB GeoJSON')
+
+    rng = np.random.default_rng(7)
+    for span in (0.05, 0.2, 0.5):
+        corners = CBD_LATLNG[1] + rng.uniform(-0.5, 0.5, queries), CBD_LATLNG[0] + rng.uniform(-0.5, 0.5, queries)
+        hits, size = 0, 0
+        start = time.perf_counter()
+        for west, south in zip(*corners):
+            records, lines = faults.query((west, south, west + span, south + span))
+            hits += len(records)
+        seconds = (time.perf_counter() - start) / queries
+        for west, south in zip(*corners):
+            size += len(json.dumps(faults.features(*faults.query((west, south, west + span, south + span)))))
+        print(f'  bbox {span:4.2f} deg: {hits / queries:5.1f} traces, {seconds * 1000:5.2f} ms '
+              f'({full / seconds:.0f}x faster than every trace), {size / queries / 1e3:.0f} KB GeoJSON')
+
+if __name__ == '__main__':
+    main()
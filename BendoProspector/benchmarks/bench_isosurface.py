@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Isosurface extraction benchmark
+Marching-tetrahedra grade shells over a smooth synthetic grade volume at a
+few cutoffs and slab sizes, plus the cached repeat through a saved block model
+Run from the BendoProspector directory: python benchmarks/bench_isosurface.py [N]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from geology.block_store import BlockModelStore
+from geology.blockmodel import BlockGrid
+from geology.isosurface import marching_tetrahedra
+
+CUTOFFS = (0.5, 1.0, 2.0)
+CHUNKS = (16, 32, 64)
+
+def synthetic_grades(n, seed=7):
+    """Lognormal-looking grades: a few NE-trending lodes over a low background"""
+    rng = np.random.default_rng(seed)
+    axis = np.linspace(0.0, 1.0, n, dtype=np.float32)
+    x, y, z = axis[:, None, None], axis[None, :, None], axis[None, None, :]
+    grades = np.zeros((n, n, n), dtype=np.float32)
+    for centre, width in zip(rng.uniform(0.2, 0.8, 4), rng.uniform(0.03, 0.08, 4)):
+        grades += 3 * np.exp(-((x - y) * 0.7 + z * 0.3 - centre + 0.15) ** 2 / width ** 2)
+    return grades + 0.2
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+    grades = synthetic_grades(n)
+    print(f'{n}^3 volume ({grades.size:,} samples)')
+    print(f"{'cutoff':>7} {'chunk':>6} {'seconds':>8} {'vertices':>10} {'triangles':>10}")
+    for cutoff in CUTOFFS:
+        for chunk in CHUNKS:
+            start = time.perf_counter()
+            positions, _, triangles = marching_tetrahedra(grades, cutoff, chunk_cells=chunk)
+            print(f'{cutoff:>7} {chunk:>6} {time.perf_counter() - start:>8.2f} '
+                  f'{len(positions):>10,} {len(triangles):>10,}')
+
+    with tempfile.TemporaryDirectory() as root:
+        model = BlockModelStore(root).save('bench', BlockGrid((0, 0, 0), (25, 25, 10), grades.shape),
+                                           {'grade': grades})
+        for attempt in ('first', 'cached'):
+            start = time.perf_counter()
+            model.isosurface('grade', 1.0)
+            print(f'block model, cutoff 1.0, {attempt}: {time.perf_counter() - start:.3f} s')
+
+if __name__ == '__main__':
+    main()
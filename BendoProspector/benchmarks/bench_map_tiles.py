@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Map tile benchmark
+Writes a synthetic N x N geological map sheet (flat-coloured units with
+linework, like the 7k goldfield sheets) over the goldfield bounds, cuts it
+into a tile pyramid, then compares what a client downloads and decodes for
+a first render of the whole sheet and for a zoomed-in viewport against
+fetching the full-size PNG
+Run from the BendoProspector directory: python benchmarks/bench_map_tiles.py [N]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from geology.map_tiles import MapTileStore
+from geology.png import encode_png, read_png
+
+BOUNDS = {'north': -36.7206, 'south': -36.8006, 'east': 144.3231, 'west': 144.2431}
+
+def synthetic_sheet(size, rng):
+    """Blocky colour units upsampled from a coarse grid, with dark contacts between them"""
+    units = rng.integers(0, 12, (size // 64 + 1, size // 64 + 1))
+    palette = rng.integers(60, 255, (12, 3), dtype=np.uint8)
+    index = np.repeat(np.repeat(units, 64, axis=0), 64, axis=1)[:size, :size]
+    pixels = np.empty((size, size, 4), dtype=np.uint8)
+    pixels[..., :3] = palette[index]
+    pixels[..., 3] = 255
+    edges = np.zeros((size, size), dtype=bool)
+    edges[1:] |= index[1:] != index[:-1]
+    edges[:, 1:] |= index[:, 1:] != index[:, :-1]
+    pixels[edges, :3] = 30
+    # Scanner noise, so the sheet compresses like a scan rather than flat fills
+    noise = rng.integers(-6, 7, (size, size, 3))
+    pixels[..., :3] = np.clip(pixels[..., :3] + noise, 0, 255)
+    return pixels
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 4096
+    rng = np.random.default_rng(8)
+    with tempfile.TemporaryDirectory() as directory:
+        sheet = os.path.join(directory, 'sheet.png')
+        with open(sheet, 'wb') as f:
+            f.write(encode_png(synthetic_sheet(size, rng)))
+        start = time.perf_counter()
+        read_png(sheet)
+        decode = time.perf_counter() - start
+        full_bytes = os.path.getsize(sheet)
+        print(f'{size} x {size} sheet: {full_bytes / 1e6:.1f} MB PNG, {size * size * 4 / 1e6:.0f} MB decoded, '
+              f'server decode {decode:.1f} s')
+
+        store = MapTileStore(os.path.join(directory, 'tiles'))
+        start = time.perf_counter()
+        pyramid = store.load('sheet', sheet, BOUNDS)
+        levels = {int(z): len(tiles) for z, tiles in pyramid.manifest['tiles'].items()}
+        print(f'  cut once: {time.perf_counter() - start:.1f} s, {sum(levels.values())} tiles over levels '
+              f'{min(levels)}-{max(levels)} ({levels})')
+
+        whole = (BOUNDS['west'], BOUNDS['south'], BOUNDS['east'], BOUNDS['north'])
+        centre_lng, centre_lat = (whole[0] + whole[2]) / 2, (whole[1] + whole[3]) / 2
+        zoomed = (centre_lng - 0.005, centre_lat - 0.004, centre_lng + 0.005, centre_lat + 0.004)
+        for label, bbox, max_tiles in (('first render, whole sheet', whole, 16),
+                                       ('zoomed viewport, ~900 m', zoomed, 16)):
+            start = time.perf_counter()
+            z, tiles = pyramid.viewport(bbox, max_tiles=max_tiles)
+            listing = (time.perf_counter() - start) * 1000
+            sent = sum(os.path.getsize(pyramid.tile_path(z, x, y)) for x, y in tiles)
+            decoded = len(tiles) * 256 * 256 * 4
+            print(f'  {label}: z{z}, {len(tiles)} tiles listed in {listing:.2f} ms, {sent / 1e6:.2f} MB sent '
+                  f'({full_bytes / max(sent, 1):.0f}x less), {decoded / 1e6:.1f} MB decoded '
+                  f'({size * size * 4 / max(decoded, 1):.0f}x less)')
+
+if __name__ == '__main__':
+    main()
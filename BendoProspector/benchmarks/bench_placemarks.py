@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Placemark ingest benchmark
+Writes a synthetic season of field points (N placemarks: mostly points,
+some traverse LineStrings and claim Polygons, in folders) as KML and KMZ,
+then times streaming them into a PlacemarkStore, the load's peak memory,
+and bbox queries through the grid index against a full bounds scan
+Run from the BendoProspector directory: python benchmarks/bench_placemarks.py [N]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from geology.placemarks import PlacemarkStore
+from terrain.coordinates import CBD_LATLNG
+
+QUERIES = 200
+
+def write_kml(path, n, rng):
+    """n placemarks around the goldfield, 100 per folder"""
+    with open(path, 'w') as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n<kml xmlns="http://www.opengis.net/kml/2.2"><Document>\n')
+        for i in range(n):
+            if i % 100 == 0:
+                f.write(f'{"</Folder>" if i else ""}<Folder><name>Day {i // 100}</name>\n')
+            lng, lat = CBD_LATLNG[1] + rng.uniform(-0.3, 0.3), CBD_LATLNG[0] + rng.uniform(-0.3, 0.3)
+            kind = i % 20
+            if kind == 0:
+                steps = np.cumsum(rng.normal(0, 0.0005, (20, 2)), axis=0) + (lng, lat)
+                geometry = '<LineString><coordinates>' + ' '.join(f'{x:.7f},{y:.7f},0' for x, y in steps) + \
+                    '</coordinates></LineString>'
+            elif kind == 1:
+                ring = [(lng, lat), (lng + 0.002, lat), (lng + 0.002, lat + 0.002), (lng, lat + 0.002), (lng, lat)]
+                geometry = '<Polygon><outerBoundaryIs><LinearRing><coordinates>' + \
+                    ' '.join(f'{x:.7f},{y:.7f},0' for x, y in ring) + '</coordinates></LinearRing></outerBoundaryIs></Polygon>'
+            else:
+                geometry = f'<Point><coordinates>{lng:.7f},{lat:.7f},{rng.uniform(150, 350):.2f}</coordinates></Point>'
+            f.write(f'<Placemark><name>Sample {i}</name><description>Field note {i}</description>'
+                    f'<styleUrl>#point</styleUrl>{geometry}</Placemark>\n')
+        f.write('</Folder></Document></kml>\n')
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rng = np.random.default_rng(6)
+    with tempfile.TemporaryDirectory() as directory:
+        kml = os.path.join(directory, 'season.kml')
+        kmz = os.path.join(directory, 'season.kmz')
+        write_kml(kml, n, rng)
+        with zipfile.ZipFile(kmz, 'w', zipfile.ZIP_DEFLATED) as archive:
+            archive.write(kml, 'doc.kml')
+        print(f'{n:,} placemarks: KML {os.path.getsize(kml) / 1e6:.1f} MB, KMZ {os.path.getsize(kmz) / 1e6:.1f} MB')
+
+        for path in (kml, kmz):
+            start = time.perf_counter()
+            store = PlacemarkStore.from_kml([path])
+            seconds = time.perf_counter() - start
+            # Traced separately: tracemalloc slows the parse several times over
+            tracemalloc.start()
+            PlacemarkStore.from_kml([path])
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f'  load {os.path.basename(path)}: {seconds:.2f} s, {len(store.coordinates):,} coordinates, '
+                  f'peak {peak / 1e6:.0f} MB')
+
+    for span in (0.005, 0.02, 0.1):
+        boxes = CBD_LATLNG[1] + rng.uniform(-0.3, 0.3, QUERIES), CBD_LATLNG[0] + rng.uniform(-0.3, 0.3, QUERIES)
+        start = time.perf_counter()
+        hits = sum(len(store.query((x, y, x + span, y + span))) for x, y in zip(*boxes))
+        seconds = (time.perf_counter() - start) / QUERIES
+        start = time.perf_counter()
+        for x, y in zip(*boxes):
+            np.flatnonzero((store.box_min[:, 0] <= x + span) & (store.box_max[:, 0] >= x)
+                           & (store.box_min[:, 1] <= y + span) & (store.box_max[:, 1] >= y))
+        scan = (time.perf_counter() - start) / QUERIES
+        print(f'  bbox {span:5.3f} deg: {hits / QUERIES:7.1f} hits, grid index {seconds * 1000:.3f} ms, '
+              f'full scan {scan * 1000:.3f} ms')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Terrain analytics benchmark
+Slope/aspect/hillshade/curvature rasters over a 2k x 2k elevation grid, per
+product set and strip height, against a per-pixel Python loop (timed on a
+small grid and scaled up) and checked against it
+Run from the BendoProspector directory: python benchmarks/bench_terrain_analytics.py [N]
+"""
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from terrain.analytics import PRODUCTS, terrain_analytics
+from terrain.generator import elevation_from_axes
+
+REPEATS = 5
+LOOP_SIZE = 200
+
+def reference_slope_hillshade(grid, spacing):
+    """Per-pixel Horn slope (degrees) and hillshade, light from 315 degrees at 45 degrees"""
+    rows, cols = grid.shape
+    slope = np.zeros((rows - 2, cols - 2))
+    shade = np.zeros((rows - 2, cols - 2))
+    azimuth, altitude = math.radians(315), math.radians(45)
+    east, north = math.sin(azimuth) * math.cos(altitude), math.cos(azimuth) * math.cos(altitude)
+    up = math.sin(altitude)
+    for i in range(1, rows - 1):
+        for j in range(1, cols - 1):
+            p = ((grid[i + 1, j - 1] + 2 * grid[i + 1, j] + grid[i + 1, j + 1])
+                 - (grid[i - 1, j - 1] + 2 * grid[i - 1, j] + grid[i - 1, j + 1])) / (8 * spacing)
+            q = ((grid[i - 1, j + 1] + 2 * grid[i, j + 1] + grid[i + 1, j + 1])
+                 - (grid[i - 1, j - 1] + 2 * grid[i, j - 1] + grid[i + 1, j - 1])) / (8 * spacing)
+            slope[i - 1, j - 1] = math.degrees(math.atan(math.hypot(p, q)))
+            shade[i - 1, j - 1] = min(max((up - p * east - q * north) / math.sqrt(1 + p * p + q * q) * 255, 0), 255)
+    return slope, shade
+
+def timed(function, *args, **kwargs):
+    times = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2048
+    spacing = 5.0
+    axis = np.arange(n) * spacing / 1000
+    # Goldfield relief plus metre-scale roughness, so no product is trivially flat
+    grid = elevation_from_axes(axis, axis) + np.random.default_rng(2).normal(0, 0.5, (n, n)).astype(np.float32)
+    print(f'{n}x{n} grid at {spacing:g} m')
+
+    for products in (PRODUCTS, ('slope', 'hillshade'), ('hillshade',)):
+        seconds, _ = timed(terrain_analytics, grid, spacing, products)
+        print(f"  {'+'.join(products):<58} {seconds * 1000:7.1f} ms")
+    for strip_rows in (8, 16, 32, 64, 128, n):
+        seconds, _ = timed(terrain_analytics, grid, spacing, strip_rows=strip_rows)
+        print(f'  all products, {strip_rows:>4}-row strips {seconds * 1000:>35.1f} ms')
+
+    small = grid[:LOOP_SIZE, :LOOP_SIZE].astype(np.float64)
+    start = time.perf_counter()
+    slope, shade = reference_slope_hillshade(small, spacing)
+    loop_seconds = time.perf_counter() - start
+    fast = terrain_analytics(small, spacing, ('slope', 'hillshade'))
+    print(f'  per-pixel loop, slope+hillshade: {loop_seconds:.2f} s at {LOOP_SIZE}^2, '
+          f'~{loop_seconds * n * n / LOOP_SIZE ** 2:.0f} s at {n}^2; '
+          f'max slope difference {np.abs(fast["slope"][1:-1, 1:-1] - slope).max():.1e} deg, '
+          f'hillshade {np.abs(fast["hillshade"][1:-1, 1:-1].astype(int) - np.floor(shade)).max():.0f}')
+
+if __name__ == '__main__':
+    main()
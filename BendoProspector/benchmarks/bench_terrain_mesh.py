@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Adaptive terrain mesh benchmark
+RTIN triangle counts and build times against the uniform grid mesh of the
+same samples, for the survey extent at a few grid sizes and error bounds,
+plus a pyramid tile. The worst vertical error is measured over every grid
+sample by interpolating the mesh at it.
+Run from the BendoProspector directory: python benchmarks/bench_terrain_mesh.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from terrain.generator import DEFAULT_EXTENT_KM, elevation_from_axes
+from terrain.mesh import rtin_errors, rtin_mesh
+from terrain.tiles import elevation_pyramid
+
+SIZES = (257, 513, 1025)
+MAX_ERRORS = (0.05, 0.25, 1.0)
+
+def worst_error(grid, positions, triangles):
+    """Largest |mesh - grid| over the grid samples, each located in its triangle by barycentric coordinates"""
+    worst = 0.0
+    corners = positions[triangles].astype(np.float64)
+    for (x0, y0, z0), (x1, y1, z1), (x2, y2, z2) in corners:
+        i, j = np.meshgrid(np.arange(min(x0, x1, x2), max(x0, x1, x2) + 1),
+                           np.arange(min(y0, y1, y2), max(y0, y1, y2) + 1), indexing='ij')
+        d = (y1 - y2) * (x0 - x2) + (x2 - x1) * (y0 - y2)
+        l0 = ((y1 - y2) * (i - x2) + (x2 - x1) * (j - y2)) / d
+        l1 = ((y2 - y0) * (i - x2) + (x0 - x2) * (j - y2)) / d
+        l2 = 1 - l0 - l1
+        inside = (l0 >= -1e-9) & (l1 >= -1e-9) & (l2 >= -1e-9)
+        error = np.abs(l0 * z0 + l1 * z1 + l2 * z2 - grid[i.astype(int), j.astype(int)])
+        worst = max(worst, float(error[inside].max(initial=0.0)))
+    return worst
+
+def report(label, grid, check_error):
+    start = time.perf_counter()
+    errors = rtin_errors(grid)
+    error_seconds = time.perf_counter() - start
+    n = grid.shape[0]
+    print(f'{label}: {n}x{n} grid, uniform mesh {n * n:,} vertices / {2 * (n - 1) ** 2:,} triangles; '
+          f'error pass {error_seconds * 1000:.0f} ms')
+    for max_error in MAX_ERRORS:
+        start = time.perf_counter()
+        positions, triangles = rtin_mesh(grid, max_error, errors=errors)
+        seconds = time.perf_counter() - start
+        # Mesh in grid-index units so samples can be looked up directly
+        worst = f'{worst_error(grid, positions, triangles):8.3f}' if check_error else '       -'
+        print(f'  max_error {max_error:5.2f} m: {len(positions):>8,} vertices {len(triangles):>9,} triangles '
+              f'({n * n / len(positions):7.1f}x fewer vertices) {seconds * 1000:6.1f} ms, worst error {worst} m')
+
+def main():
+    for size in SIZES:
+        half = DEFAULT_EXTENT_KM / 2
+        axis = np.linspace(-half, half, size)
+        report(f'survey {DEFAULT_EXTENT_KM:g} km', elevation_from_axes(axis, axis, dtype=np.float64), size <= 257)
+    tile_axes = elevation_pyramid.tile_axes(6, 31, 33, elevation_pyramid.tile_size + 1)
+    report('pyramid tile 6/31/33', elevation_from_axes(*tile_axes, dtype=np.float64), True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Synthetic Bendigo DXF generator for benchmarks
+Writes folded reef/fault surfaces as 3DFACE entities across the BZ_* layers
+Usage: python benchmarks/synthetic_dxf.py OUTPUT.dxf [SIZE_MB]
+"""
+import sys
+
+import numpy as np
+
+LAYERS = [
+    'BZ_fault_Break_O_Day', 'BZ_fault_Sheepwash', 'BZ_formation_Bendigo', 'BZ_formation_Ordovician',
+    'BZ_quartz_vein', 'BZ_shear_zone', 'BZ_gold_bearing', 'BZ_reef_system'
+]
+FACES_PER_CHUNK = 10000
+
+def face_chunk(rng, layer_index, count):
+    """Random quads on a dipping NE-SW surface, as (count, 4, 3) easting/northing/RL"""
+    origin = rng.uniform([254000, 5925000, -400], [262000, 5933000, 200], size=(count, 1, 3))
+    offsets = np.array([[0, 0, 0], [25, 0, -10], [25, 25, -20], [0, 25, -10]], dtype=np.float64)
+    tilt = 1 + 0.1 * layer_index
+    return origin + offsets * tilt
+
+def write_synthetic_dxf(path, size_mb=300, seed=1851):
+    """Write a DXF of roughly size_mb megabytes and return the number of faces"""
+    rng = np.random.default_rng(seed)
+    target = size_mb * 1024 * 1024
+    faces = 0
+    with open(path, 'w') as f:
+        f.write('0\nSECTION\n2\nHEADER\n9\n$ACADVER\n1\nAC1015\n0\nENDSEC\n0\nSECTION\n2\nENTITIES\n')
+        while f.tell() < target:
+            layer_index = faces // FACES_PER_CHUNK % len(LAYERS)
+            corners = face_chunk(rng, layer_index, FACES_PER_CHUNK)
+            records = []
+            for quad in corners:
+                records.append(f'0\n3DFACE\n5\n{faces:X}\n8\n{LAYERS[layer_index]}\n')
+                for corner, (x, y, z) in enumerate(quad):
+                    records.append(f'1{corner}\n{x:.3f}\n2{corner}\n{y:.3f}\n3{corner}\n{z:.3f}\n')
+                faces += 1
+            f.write(''.join(records))
+        f.write('0\nENDSEC\n0\nEOF\n')
+    return faces
+
+if __name__ == '__main__':
+    size = float(sys.argv[2]) if len(sys.argv) > 2 else 300
+    print(f'{write_synthetic_dxf(sys.argv[1], size):,} faces written to {sys.argv[1]}')
@@ -0,0 +1 @@
+# Geological data processing modules
\ No newline at end of file
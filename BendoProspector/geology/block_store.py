@@ -0,0 +1,238 @@
+# geology/block_store.py
+"""
+On-disk block models
+An estimated block model is a directory holding one C-ordered .npy array
+per variable (shaped like the grid, x then y then z) plus a JSON manifest of
+the grid's origin, block size and variables. Arrays are opened memory-mapped,
+so slices and sub-volumes are strided views that touch only the pages they
+cover, and every server process maps the same page-cache pages.
+Build one from the drill-hole files with:
+    python -m geology.block_store NAME COLLARS.csv ASSAYS.csv [idw|kriging]
+"""
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from .blockmodel import BlockGrid, composite_samples, estimate_block_model
+from .composites import fixed_length_composites
+from .dxf_cache import CACHE_ROOT
+from .isosurface import SurfaceTooLarge, marching_tetrahedra
+
+BLOCK_MODEL_DIR = CACHE_ROOT / 'block_models'
+BLOCK_MODEL_VERSION = 1
+BLOCK_MODEL_NAME = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+AXES = 'xyz'
+ISOSURFACE_ARRAYS = ('positions', 'normals', 'indices')
+MAX_ISOSURFACE_TRIANGLES = 8 * 1024 * 1024
+
+class BlockModelError(ValueError):
+    """A missing block model or a request outside the grid"""
+
+class BlockModel:
+    """Grid geometry from the manifest plus a (memory-mapped) array per variable"""
+
+    def __init__(self, manifest, variables, directory=None):
+        self.manifest = manifest
+        self.variables = variables
+        self.directory = directory
+        self.grid = BlockGrid(manifest['origin'], manifest['block_size'], manifest['shape'])
+
+    def describe(self):
+        return {key: value for key, value in self.manifest.items() if key != 'version'}
+
+    def _variables(self, names):
+        names = names or list(self.variables)
+        missing = [name for name in names if name not in self.variables]
+        if missing:
+            raise BlockModelError(f"unknown variables: {', '.join(missing)}")
+        return names
+
+    def _region(self, box, step, names):
+        """Manifest of the blocks selected by per-axis index slices, and views of each variable over them"""
+        views = {name: self.variables[name][box] for name in self._variables(names)}
+        start = np.array([s.start for s in box])
+        return {
+            'origin': (self.grid.origin + start * self.grid.block_size).tolist(),
+            'block_size': (self.grid.block_size * step).tolist(),
+            'shape': list(next(iter(views.values())).shape) if views else [],
+            'start': start.tolist(),
+            'step': list(step)
+        }, views
+
+    def subvolume(self, start, stop, step=(1, 1, 1), names=None):
+        """Blocks [start, stop) every step along each axis; stop is clipped to the grid"""
+        start = [int(v) for v in start]
+        stop = [min(int(v), n) for v, n in zip(stop, self.grid.shape)]
+        step = [int(v) for v in step]
+        if any(s < 0 or s >= e for s, e in zip(start, stop)) or any(s < 1 for s in step):
+            raise BlockModelError(f'empty or invalid sub-volume {start}..{stop} step {step} '
+                                  f'for grid {list(self.grid.shape)}')
+        return self._region(tuple(slice(s, e, k) for s, e, k in zip(start, stop, step)), step, names)
+
+    def slice(self, axis, index, names=None):
+        """The plane of blocks at one index along axis ('x', 'y' or 'z'), as 2D arrays over the other two axes"""
+        if axis not in AXES:
+            raise BlockModelError(f'axis must be one of x, y, z, not {axis!r}')
+        a = AXES.index(axis)
+        if not 0 <= index < self.grid.shape[a]:
+            raise BlockModelError(f'{axis} index {index} outside 0..{self.grid.shape[a] - 1}')
+        box = [slice(0, n) for n in self.grid.shape]
+        box[a] = slice(index, index + 1)
+        manifest, views = self._region(tuple(box), (1, 1, 1), names)
+        manifest.update(axis=axis, index=index, shape=manifest['shape'][:a] + manifest['shape'][a + 1:])
+        return manifest, {name: view.squeeze(a) for name, view in views.items()}
+
+    def isosurface(self, variable, cutoff, start=(0, 0, 0), stop=None, step=(1, 1, 1)):
+        """Grade shell mesh at cutoff over a sub-volume as (region manifest, {positions, normals, indices})
+
+        Vertices are metres east/north of the CBD and above sea level, like
+        the block centres they are interpolated between. Meshes are cached
+        beside the model's arrays, so they are built once per model, variable,
+        cutoff and region and vanish when the model is rewritten.
+        """
+        # NaN would key its own (empty) cached mesh and reach the manifest as invalid JSON
+        if not np.isfinite(cutoff):
+            raise BlockModelError(f'cutoff must be a finite {variable} value, not {cutoff}')
+        manifest, views = self.subvolume(start, self.grid.shape if stop is None else stop, step, [variable])
+        manifest.update(variable=variable, cutoff=cutoff)
+        key = json.dumps([variable, cutoff, manifest['start'], manifest['shape'], manifest['step']])
+        entry = None
+        if self.directory is not None:
+            entry = self.directory / 'isosurfaces' / hashlib.blake2b(key.encode(), digest_size=10).hexdigest()
+            if (entry / 'indices.npy').exists():
+                return manifest, {name: np.asarray(np.load(entry / f'{name}.npy', mmap_mode='r'))
+                                  for name in ISOSURFACE_ARRAYS}
+
+        try:
+            mesh = dict(zip(ISOSURFACE_ARRAYS, marching_tetrahedra(
+                views[variable], cutoff, manifest['origin'], manifest['block_size'],
+                max_triangles=MAX_ISOSURFACE_TRIANGLES)))
+        except SurfaceTooLarge as e:
+            raise BlockModelError(f'{e}; use a step or a sub-volume') from None
+        if entry is not None:
+            entry.parent.mkdir(exist_ok=True)
+            staging = Path(tempfile.mkdtemp(dir=entry.parent, prefix='.staging-'))
+            try:
+                for name, data in mesh.items():
+                    np.save(staging / f'{name}.npy', data)
+                os.replace(staging, entry)
+            except OSError:
+                pass   # another process stored it first
+            finally:
+                shutil.rmtree(staging, ignore_errors=True)
+        return manifest, mesh
+
+    def save(self, directory):
+        directory.mkdir(parents=True, exist_ok=True)
+        for name, data in self.variables.items():
+            np.save(directory / f'{name}.npy', np.ascontiguousarray(data))
+        (directory / 'manifest.json').write_text(json.dumps(self.manifest))
+
+    @classmethod
+    def load(cls, directory):
+        manifest = json.loads((directory / 'manifest.json').read_text())
+        return cls(manifest, {name: np.asarray(np.load(directory / f'{name}.npy', mmap_mode='r'))
+                              for name in manifest['variables']}, directory)
+
+class BlockModelStore:
+    """Named block models under one directory, mapped once per process and remapped when rewritten"""
+
+    def __init__(self, root=BLOCK_MODEL_DIR):
+        self.root = Path(root)
+        self._models = {}   # name -> (manifest mtime_ns, BlockModel)
+        self._lock = threading.Lock()
+
+    def _entry(self, name):
+        if not BLOCK_MODEL_NAME.match(name or ''):
+            raise BlockModelError(f'invalid block model name: {name!r}')
+        return self.root / name
+
+    def names(self):
+        if not self.root.is_dir():
+            return []
+        return sorted(entry.name for entry in self.root.iterdir()
+                      if BLOCK_MODEL_NAME.match(entry.name) and (entry / 'manifest.json').exists())
+
+    def load(self, name):
+        manifest_path = self._entry(name) / 'manifest.json'
+        try:
+            mtime = manifest_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            raise BlockModelError(f'no block model named {name!r}') from None
+        with self._lock:
+            cached = self._models.get(name)
+            if cached and cached[0] == mtime:
+                return cached[1]
+            model = BlockModel.load(manifest_path.parent)
+            self._models[name] = (mtime, model)
+            return model
+
+    def save(self, name, grid, variables, metadata=None):
+        """Write float32 variables shaped like grid as block model name, replacing any previous one"""
+        entry = self._entry(name)
+        variables = {key: np.asarray(data, dtype=np.float32) for key, data in variables.items()}
+        for key, data in variables.items():
+            if data.shape != grid.shape:
+                raise BlockModelError(f'{key} has shape {data.shape}, grid is {grid.shape}')
+        manifest = {
+            'version': BLOCK_MODEL_VERSION,
+            'name': name,
+            'origin': grid.origin.tolist(),
+            'block_size': grid.block_size.tolist(),
+            'shape': list(grid.shape),
+            'variables': {key: {'dtype': data.dtype.name,
+                                'min': float(np.nanmin(data)) if np.any(~np.isnan(data)) else None,
+                                'max': float(np.nanmax(data)) if np.any(~np.isnan(data)) else None}
+                          for key, data in variables.items()},
+            'metadata': metadata or {}
+        }
+
+        # Staged and renamed into place; processes still mapping the old arrays keep their pages
+        self.root.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(dir=self.root, prefix='.staging-'))
+        retired = None
+        try:
+            BlockModel(manifest, variables).save(staging)
+            if entry.exists():
+                retired = Path(tempfile.mkdtemp(dir=self.root, prefix='.retired-'))
+                os.replace(entry, retired / name)
+            os.replace(staging, entry)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+            if retired is not None:
+                shutil.rmtree(retired, ignore_errors=True)
+        return self.load(name)
+
+def build_block_model(store, drill_holes, name, method='idw', block_size=None, composite_length=2.0, **options):
+    """Composite, estimate and save a block model of drill_holes' grades"""
+    points, grades = composite_samples(drill_holes, fixed_length_composites(drill_holes, composite_length))
+    grid = BlockGrid.covering(points) if block_size is None else BlockGrid.covering(points, block_size)
+    estimates, variances = estimate_block_model(points, grades, grid, method=method, **options)
+    variables = {'grade': estimates}
+    if variances is not None:
+        variables['variance'] = variances
+    metadata = dict(options, method=method, composite_length=composite_length, samples=len(points))
+    return store.save(name, grid, variables, metadata)
+
+def main(argv):
+    from .drillholes import load_drill_holes
+
+    if len(argv) < 3:
+        print(__doc__.strip().splitlines()[-1].strip())
+        return 2
+    name, collars, assays = argv[:3]
+    method = argv[3] if len(argv) > 3 else 'idw'
+    model = build_block_model(BlockModelStore(), load_drill_holes(collars, assays), name, method)
+    print(json.dumps(model.describe(), indent=2))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,262 @@
+# geology/blockmodel.py
+"""
+Block-model grade estimation
+Interpolates composited drill-hole grades onto a regular 3D block grid
+through the Bendigo Formation, by inverse-distance weighting or ordinary
+kriging. The grid is cut into tiles that are estimated independently in a
+process pool; within a tile the neighbour search, weights and kriging
+systems are batched NumPy operations.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from terrain.coordinates import latlng_to_local
+from terrain.generator import GEOLOGICAL_FORMATIONS, elevation_at
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:  # optional: fall back to the NumPy neighbour search below
+    cKDTree = None
+
+DEFAULT_BLOCK_SIZE = (25.0, 25.0, 10.0)  # metres east, north, vertical
+DEFAULT_NEIGHBOURS = 16
+DEFAULT_SEARCH_RADIUS = 250.0  # metres
+DEFAULT_IDW_POWER = 2.0
+# Blocks are estimated in tiles of this many blocks per axis, one pool task each.
+# Small, cubic tiles keep the slab of samples within reach of a tile small too.
+TILE_SHAPE = (8, 8, 8)
+# Spherical variogram: nugget, partial sill, range (metres)
+DEFAULT_VARIOGRAM = (0.2, 1.0, 150.0)
+
+class BlockGrid:
+    """Regular grid of block centres: origin is the centre of block (0, 0, 0)
+
+    Coordinates are metres east and north of the Bendigo CBD and metres
+    above sea level, matching composite_samples.
+    """
+
+    def __init__(self, origin, block_size, shape):
+        self.origin = np.asarray(origin, dtype=np.float64)
+        self.block_size = np.asarray(block_size, dtype=np.float64)
+        self.shape = tuple(int(n) for n in shape)
+
+    @property
+    def block_count(self):
+        return int(np.prod(self.shape))
+
+    @classmethod
+    def covering(cls, points, block_size=DEFAULT_BLOCK_SIZE, padding=DEFAULT_SEARCH_RADIUS,
+                 formation='bendigo_formation'):
+        """Grid over the samples' footprint, from the highest ground down through a formation's depth range"""
+        block_size = np.asarray(block_size, dtype=np.float64)
+        low = points[:, :2].min(axis=0) - padding
+        high = points[:, :2].max(axis=0) + padding
+        shape_xy = np.maximum(1, np.ceil((high - low) / block_size[:2])).astype(int)
+        x = low[0] + (np.arange(shape_xy[0]) + 0.5) * block_size[0]
+        y = low[1] + (np.arange(shape_xy[1]) + 0.5) * block_size[1]
+        surface = elevation_at(x[:, None] / 1000.0, y[None, :] / 1000.0)
+
+        top_depth, bottom_depth = GEOLOGICAL_FORMATIONS[formation]['depth_range']
+        top, bottom = surface.max() - top_depth, surface.min() - bottom_depth
+        shape_z = max(1, int(np.ceil((top - bottom) / block_size[2])))
+        origin = (x[0], y[0], top - (shape_z - 0.5) * block_size[2])
+        return cls(origin, block_size, (*shape_xy, shape_z))
+
+    def axes(self, start=(0, 0, 0), stop=None):
+        """Block-centre coordinates along each axis for the index box [start, stop)"""
+        stop = self.shape if stop is None else stop
+        return [self.origin[a] + np.arange(start[a], stop[a]) * self.block_size[a] for a in range(3)]
+
+    def tiles(self, tile_shape=TILE_SHAPE):
+        """(start, stop) index boxes covering the grid"""
+        ranges = [range(0, n, t) for n, t in zip(self.shape, tile_shape)]
+        return [((i, j, k), (min(i + tile_shape[0], self.shape[0]), min(j + tile_shape[1], self.shape[1]),
+                             min(k + tile_shape[2], self.shape[2])))
+                for i in ranges[0] for j in ranges[1] for k in ranges[2]]
+
+def composite_samples(store, composites):
+    """(n, 3) composite mid-points and their grades, for assayed composites
+
+    Holes are treated as vertical from a collar on the terrain surface; the
+    store has no downhole surveys.
+    """
+    keep = ~np.isnan(composites.grade)
+    hole = composites.hole[keep]
+    east, north = latlng_to_local(store.lat[hole], store.lng[hole])
+    collar = elevation_at(east / 1000.0, north / 1000.0)
+    middle = (composites.depth_from[keep] + composites.depth_to[keep]) / 2
+    return np.column_stack([east, north, collar - middle]), composites.grade[keep].astype(np.float64)
+
+class NeighbourSearch:
+    """k-nearest samples within a radius, with cKDTree semantics
+
+    query returns (distances, indices) shaped (n, k); missing neighbours have
+    distance inf and index len(points). Uses scipy's KD-tree when installed;
+    otherwise samples are kept sorted by x, and each (spatially compact) batch
+    of queries is brute-forced against the slab of samples within reach of it.
+    """
+
+    def __init__(self, points):
+        self.points = np.asarray(points, dtype=np.float64)
+        if cKDTree is not None:
+            self._tree = cKDTree(self.points)
+        else:
+            self._tree = None
+            self._order = np.argsort(self.points[:, 0], kind='stable')
+            self._sorted_x = self.points[self._order, 0]
+
+    def query(self, queries, k, radius):
+        if self._tree is not None:
+            distances, indices = self._tree.query(queries, k=k, distance_upper_bound=radius)
+            return distances.reshape(len(queries), k), indices.reshape(len(queries), k)
+
+        low, high = queries.min(axis=0) - radius, queries.max(axis=0) + radius
+        span = self._order[np.searchsorted(self._sorted_x, low[0]):np.searchsorted(self._sorted_x, high[0], 'right')]
+        nearby = self.points[span]
+        inside = np.all((nearby >= low) & (nearby <= high), axis=1)
+        span, nearby = span[inside], nearby[inside]
+
+        distances = np.full((len(queries), k), np.inf)
+        indices = np.full((len(queries), k), len(self.points))
+        if not len(span):
+            return distances, indices
+        squared = (np.einsum('ij,ij->i', queries, queries)[:, None] - 2 * queries @ nearby.T
+                   + np.einsum('ij,ij->i', nearby, nearby)[None, :])
+        take = min(k, len(span))
+        nearest = np.argpartition(squared, take - 1, axis=1)[:, :take] if take < len(span) else \
+            np.broadcast_to(np.arange(take), (len(queries), take))
+        found = np.sqrt(np.maximum(np.take_along_axis(squared, nearest, axis=1), 0.0))
+        order = np.argsort(found, axis=1)
+        found = np.take_along_axis(found, order, axis=1)
+        nearest = np.take_along_axis(nearest, order, axis=1)
+        within = found <= radius
+        distances[:, :take] = np.where(within, found, np.inf)
+        indices[:, :take] = np.where(within, span[nearest], len(self.points))
+        return distances, indices
+
+def spherical_covariance(h, variogram=DEFAULT_VARIOGRAM):
+    """Structured part of the spherical covariance, sill - gamma(h); the nugget is added per sample"""
+    _, sill, range_ = variogram
+    r = np.minimum(h / range_, 1.0)
+    return sill * (1 - 1.5 * r + 0.5 * r ** 3)
+
+def idw_estimate(distances, values, power=DEFAULT_IDW_POWER):
+    """Inverse-distance weighted mean per row; a sample on the block wins outright"""
+    valid = np.isfinite(distances)
+    with np.errstate(divide='ignore'):
+        weights = np.where(valid, 1.0 / np.maximum(distances, 1e-9) ** power, 0.0)
+    total = weights.sum(axis=1)
+    with np.errstate(invalid='ignore'):
+        return np.where(total > 0, (weights * values).sum(axis=1) / total, np.nan)
+
+def ordinary_kriging_estimate(neighbours, distances, values, variogram=DEFAULT_VARIOGRAM):
+    """Ordinary kriging over per-block neighbour sets, as one batched linear solve
+
+    Each block's (k + 1) x (k + 1) system holds the neighbour covariances and
+    the unbiasedness constraint; missing neighbours get an identity row so
+    their weight solves to zero. The nugget sits on the diagonal only, which
+    keeps the system solvable when two samples coincide. Returns (estimates,
+    kriging variances).
+    """
+    n, k = distances.shape
+    valid = np.isfinite(distances)
+    count = valid.sum(axis=1)
+
+    separation = np.linalg.norm(neighbours[:, :, None, :] - neighbours[:, None, :, :], axis=-1)
+    pair_valid = valid[:, :, None] & valid[:, None, :]
+    system = np.zeros((n, k + 1, k + 1))
+    system[:, :k, :k] = np.where(pair_valid, spherical_covariance(separation, variogram), 0.0)
+    diagonal = np.arange(k)
+    system[:, diagonal, diagonal] = np.where(valid, system[:, diagonal, diagonal] + variogram[0], 1.0)
+    system[:, :k, k] = valid
+    system[:, k, :k] = valid
+    rhs = np.zeros((n, k + 1))
+    rhs[:, :k] = np.where(valid, spherical_covariance(np.where(valid, distances, 0.0), variogram), 0.0)
+    rhs[:, k] = 1.0
+
+    # Blocks with no neighbours get a trivially solvable system and a NaN estimate
+    empty = count == 0
+    system[empty, k, k] = 1.0
+    solution = np.linalg.solve(system, rhs[:, :, None])[:, :, 0]
+    weights = solution[:, :k]
+    estimate = np.where(empty, np.nan, (weights * np.where(valid, values, 0.0)).sum(axis=1))
+    variance = np.where(empty, np.nan, variogram[0] + variogram[1] - (solution * rhs).sum(axis=1))
+    return estimate, variance
+
+# Per-process state set by the pool initializer, so samples cross the process boundary once
+_worker = {}
+
+def _init_worker(points, grades, grid, options):
+    _worker.update(search=NeighbourSearch(points), points=points, grades=grades, grid=grid, options=options)
+
+def _estimate_tile(tile):
+    """(start, estimates, variances) for one tile, blocks above ground or below the formation left NaN"""
+    start, stop = tile
+    grid, options = _worker['grid'], _worker['options']
+    x, y, z = grid.axes(start, stop)
+    surface = elevation_at(x[:, None] / 1000.0, y[None, :] / 1000.0)[:, :, None]
+    depth = surface - z[None, None, :]
+    top_depth, bottom_depth = GEOLOGICAL_FORMATIONS[options['formation']]['depth_range']
+    inside = (depth >= top_depth) & (depth <= bottom_depth)
+
+    shape = tuple(b - a for a, b in zip(start, stop))
+    estimates = np.full(shape, np.nan, dtype=np.float32)
+    variances = np.full(shape, np.nan, dtype=np.float32) if options['method'] == 'kriging' else None
+    if not inside.any():
+        return start, estimates, variances
+
+    cells = np.nonzero(inside)
+    queries = np.column_stack([x[cells[0]], y[cells[1]], z[cells[2]]])
+    distances, indices = _worker['search'].query(queries, options['neighbours'], options['radius'])
+    found = indices < len(_worker['points'])
+    safe = np.where(found, indices, 0)
+    values = np.where(found, _worker['grades'][safe], 0.0)
+    if options['method'] == 'kriging':
+        estimate, variance = ordinary_kriging_estimate(_worker['points'][safe], distances, values,
+                                                       options['variogram'])
+        variances[cells] = variance
+    else:
+        estimate = idw_estimate(distances, values, options['power'])
+    estimates[cells] = estimate
+    return start, estimates, variances
+
+def estimate_block_model(points, grades, grid, method='idw', neighbours=DEFAULT_NEIGHBOURS,
+                         radius=DEFAULT_SEARCH_RADIUS, power=DEFAULT_IDW_POWER, variogram=DEFAULT_VARIOGRAM,
+                         formation='bendigo_formation', workers=None, tile_shape=TILE_SHAPE):
+    """Estimate grades for every block of grid within the formation's depth range
+
+    method is 'idw' or 'kriging'. workers=1 runs in-process; otherwise tiles
+    are spread over a process pool (default: one worker per CPU). Returns
+    float32 arrays shaped like the grid: (estimates, variances), variances
+    None for IDW. Blocks out of range of every sample are NaN.
+    """
+    if method not in ('idw', 'kriging'):
+        raise ValueError(f'unknown estimation method: {method}')
+    options = {'method': method, 'neighbours': neighbours, 'radius': radius, 'power': power,
+               'variogram': variogram, 'formation': formation}
+    points, grades = np.asarray(points, dtype=np.float64), np.asarray(grades, dtype=np.float64)
+    tiles = grid.tiles(tile_shape)
+    workers = workers or os.cpu_count() or 1
+
+    estimates = np.full(grid.shape, np.nan, dtype=np.float32)
+    variances = np.full(grid.shape, np.nan, dtype=np.float32) if method == 'kriging' else None
+
+    def place(result):
+        start, tile_estimates, tile_variances = result
+        box = tuple(slice(a, a + n) for a, n in zip(start, tile_estimates.shape))
+        estimates[box] = tile_estimates
+        if variances is not None:
+            variances[box] = tile_variances
+
+    if workers == 1:
+        _init_worker(points, grades, grid, options)
+        for tile in tiles:
+            place(_estimate_tile(tile))
+    else:
+        with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                 initargs=(points, grades, grid, options)) as pool:
+            for result in pool.map(_estimate_tile, tiles, chunksize=max(1, len(tiles) // (workers * 8))):
+                place(result)
+    return estimates, variances
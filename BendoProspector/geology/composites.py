@@ -0,0 +1,136 @@
+# geology/composites.py
+"""
+Downhole compositing and grade-tonnage curves
+Length-weighted composites over a DrillHoleStore's interval columns and
+cutoff sweeps over them. Intervals are split across composite boundaries,
+grouped and summed with whole-array NumPy operations, and all cutoffs of a
+curve are answered from one pass of binned sums.
+"""
+import numpy as np
+
+DEFAULT_COMPOSITE_LENGTH = 2.0  # metres
+# Composites with less assayed length than this fraction of their length are dropped
+MIN_COMPOSITE_COVERAGE = 0.5
+DEFAULT_DENSITY = 2.7  # t/m^3, Ordovician sandstone and slate
+# Horizontal area each hole's intervals stand for when converting length to tonnes
+DEFAULT_INFLUENCE_AREA = 25.0 * 25.0  # m^2
+GRAMS_PER_TROY_OUNCE = 31.1034768
+
+class Composites:
+    """Composite columns: hole position, from, to, length-weighted grade and assayed length"""
+
+    def __init__(self, hole, depth_from, depth_to, grade, sampled, lithology=None):
+        self.hole = hole
+        self.depth_from = depth_from
+        self.depth_to = depth_to
+        self.grade = grade
+        self.sampled = sampled
+        self.lithology = lithology
+
+    def __len__(self):
+        return len(self.hole)
+
+    def tonnes(self, density=DEFAULT_DENSITY, area=DEFAULT_INFLUENCE_AREA):
+        """Tonnes each composite stands for: assayed length x influence area x density"""
+        return self.sampled * (area * density)
+
+def _assayed(store):
+    """Interval lengths and grades, with unassayed (NaN) intervals weighted zero"""
+    lengths = (store.depth_to - store.depth_from).astype(np.float64)
+    grades = store.grade.astype(np.float64)
+    unassayed = np.isnan(grades)
+    return np.where(unassayed, 0.0, lengths), np.where(unassayed, 0.0, grades)
+
+def fixed_length_composites(store, length=DEFAULT_COMPOSITE_LENGTH, min_coverage=MIN_COMPOSITE_COVERAGE):
+    """Downhole composites over [k * length, (k + 1) * length) windows from each collar
+
+    An interval straddling window boundaries contributes its overlap to each
+    window; the grade is the overlap-weighted mean of the assayed intervals.
+    """
+    weights, grades = _assayed(store)
+    depth_from = store.depth_from.astype(np.float64)
+    depth_to = store.depth_to.astype(np.float64)
+    first = np.floor(depth_from / length).astype(np.int64)
+    last = np.maximum(first, np.ceil(depth_to / length).astype(np.int64) - 1)
+
+    # One piece per (interval, window) pair it overlaps
+    pieces = last - first + 1
+    source = np.repeat(np.arange(len(first)), pieces)
+    window = first[source] + np.arange(len(source)) - np.repeat(np.cumsum(pieces) - pieces, pieces)
+    overlap = np.minimum(depth_to[source], (window + 1) * length) - np.maximum(depth_from[source], window * length)
+    overlap = np.where(weights[source] > 0, np.maximum(overlap, 0.0), 0.0)
+
+    # Sum the pieces per (hole, window). Intervals are sorted by (hole, from), so
+    # unless some overlap the keys already ascend and runs can be reduced in place
+    windows = int(window.max(initial=0)) + 1
+    keys = store.hole[source].astype(np.int64) * windows + window
+    if np.all(keys[1:] >= keys[:-1]):
+        starts = np.flatnonzero(np.concatenate([keys[:1] == keys[:1], keys[1:] != keys[:-1]]))
+        unique_keys = keys[starts]
+        sampled = np.add.reduceat(overlap, starts) if starts.size else np.empty(0)
+        metal = np.add.reduceat(overlap * grades[source], starts) if starts.size else np.empty(0)
+    else:
+        unique_keys, group = np.unique(keys, return_inverse=True)
+        sampled = np.bincount(group, weights=overlap, minlength=len(unique_keys))
+        metal = np.bincount(group, weights=overlap * grades[source], minlength=len(unique_keys))
+
+    hole, window = unique_keys // windows, unique_keys % windows
+    keep = sampled >= min_coverage * length
+    with np.errstate(invalid='ignore', divide='ignore'):
+        grade = metal / sampled
+    return Composites(hole[keep], window[keep] * length, (window[keep] + 1) * length,
+                      grade[keep], sampled[keep])
+
+def lithology_composites(store):
+    """One composite per unbroken downhole run of intervals sharing a lithology
+
+    A gap between consecutive intervals also starts a new run.
+    """
+    weights, grades = _assayed(store)
+    changes = (store.hole[1:] != store.hole[:-1]) | (store.lithology[1:] != store.lithology[:-1]) \
+        | (store.depth_from[1:] > store.depth_to[:-1])
+    starts = np.flatnonzero(np.concatenate([[store.interval_count > 0], changes]))
+    if not starts.size:
+        empty = np.empty(0)
+        return Composites(empty.astype(np.int64), empty, empty, empty, empty, empty.astype(np.uint16))
+
+    sampled = np.add.reduceat(weights, starts)
+    metal = np.add.reduceat(weights * grades, starts)
+    ends = np.append(starts[1:], store.interval_count) - 1
+    with np.errstate(invalid='ignore', divide='ignore'):
+        grade = metal / sampled
+    return Composites(store.hole[starts].astype(np.int64), store.depth_from[starts].astype(np.float64),
+                      store.depth_to[ends].astype(np.float64), grade, sampled, store.lithology[starts])
+
+def grade_tonnage(grades, tonnes, cutoffs):
+    """Tonnes, mean grade and contained metal above each cutoff
+
+    Each grade is binned by how many cutoffs it reaches (a binary search over
+    the few cutoffs, not a sort of the many grades); per-bin sums accumulated
+    from the top bin down then give the material above every cutoff at once.
+    """
+    assayed = ~np.isnan(grades)
+    grades, tonnes = grades[assayed], tonnes[assayed]
+    cutoffs = np.asarray(cutoffs, dtype=np.float64)
+    order = np.argsort(cutoffs)
+
+    reached = np.searchsorted(cutoffs[order], grades, side='right')
+    bins = len(cutoffs) + 1
+    # above[j] sums bins j + 1 and up: everything reaching the (j + 1)th smallest cutoff
+    above = lambda per_bin: np.cumsum(per_bin[::-1])[::-1][1:]
+    curve_tonnes = np.empty(len(cutoffs))
+    metal = np.empty(len(cutoffs))
+    count = np.empty(len(cutoffs), dtype=np.int64)
+    curve_tonnes[order] = above(np.bincount(reached, weights=tonnes, minlength=bins))
+    metal[order] = above(np.bincount(reached, weights=tonnes * grades, minlength=bins))
+    count[order] = above(np.bincount(reached, minlength=bins))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_grade = np.where(curve_tonnes > 0, metal / curve_tonnes, 0.0)
+    return {
+        'cutoff': cutoffs,
+        'tonnes': curve_tonnes,
+        'grade': mean_grade,
+        'metal_grams': metal,
+        'metal_ounces': metal / GRAMS_PER_TROY_OUNCE,
+        'count': count
+    }
@@ -0,0 +1,310 @@
+# geology/drillholes.py
+"""
+Drill-hole and assay store
+Collars and assay intervals held as parallel NumPy columns, with intervals
+grouped by hole and argsort indexes over from/to depth and grade, so depth
+range and grade threshold queries are binary searches plus a mask over the
+smallest candidate set rather than scans of nested records
+"""
+import csv
+import re
+from array import array
+
+import numpy as np
+
+# Column names accepted from aircore drilling (collar) and assay exports, first match wins
+COLLAR_COLUMNS = {
+    'hole_id': ('HOLE_ID', 'HOLEID', 'HoleID', 'Hole_ID', 'hole_id'),
+    'lat': ('LAT', 'LATITUDE', 'Latitude', 'lat'),
+    'lng': ('LONG', 'LON', 'LNG', 'LONGITUDE', 'Longitude', 'lng'),
+    'depth': ('DEPTH', 'EOH', 'MAX_DEPTH', 'TOTAL_DEPTH', 'Depth', 'depth'),
+    'drilled': ('DATE', 'DATE_DRILLED', 'DRILL_DATE', 'date_drilled')
+}
+ASSAY_COLUMNS = {
+    'hole_id': COLLAR_COLUMNS['hole_id'],
+    'from': ('FROM', 'DEPTH_FROM', 'From', 'from'),
+    'to': ('TO', 'DEPTH_TO', 'To', 'to'),
+    'grade': ('AU', 'Au', 'AU_PPM', 'Au_ppm', 'AU_GPT', 'Au_gpt', 'grade'),
+    'lithology': ('LITH', 'LITHOLOGY', 'LITH_CODE', 'Lithology', 'lithology')
+}
+
+# Reference holes around the Bendigo goldfield, served until a drilling database is loaded
+SAMPLE_DRILL_HOLES = [
+    {
+        'id': 'BDH001',
+        'coordinates': {'lat': -36.7574, 'lng': 144.2755},
+        'depth': 412,
+        'date_drilled': '1987-03-15',
+        'significant_intervals': [
+            {'from': 45, 'to': 52, 'grade': '12.5 g/t Au', 'width': '7m'},
+            {'from': 118, 'to': 125, 'grade': '8.7 g/t Au', 'width': '7m'},
+            {'from': 234, 'to': 241, 'grade': '15.2 g/t Au', 'width': '7m'}
+        ]
+    },
+    {
+        'id': 'BDH002',
+        'coordinates': {'lat': -36.7623, 'lng': 144.2891},
+        'depth': 305,
+        'date_drilled': '1989-07-22',
+        'significant_intervals': [
+            {'from': 67, 'to': 74, 'grade': '9.8 g/t Au', 'width': '7m'},
+            {'from': 156, 'to': 163, 'grade': '11.3 g/t Au', 'width': '7m'}
+        ]
+    },
+    {
+        'id': 'BDH003',
+        'coordinates': {'lat': -36.7445, 'lng': 144.2634},
+        'depth': 518,
+        'date_drilled': '1985-11-08',
+        'significant_intervals': [
+            {'from': 89, 'to': 96, 'grade': '18.4 g/t Au', 'width': '7m'},
+            {'from': 201, 'to': 208, 'grade': '22.1 g/t Au', 'width': '7m'},
+            {'from': 345, 'to': 352, 'grade': '14.7 g/t Au', 'width': '7m'}
+        ]
+    }
+]
+
+_NUMBER = re.compile(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+
+def parse_grade(value):
+    """Grade in g/t from a number or a string like '12.5 g/t Au'; NaN when absent
+
+    Below-detection entries such as '<0.01' keep their detection limit.
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = _NUMBER.search(value or '')
+    return float(match.group()) if match else float('nan')
+
+def parse_number(value):
+    """Float from a CSV cell; NaN when the cell is blank or not a number"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float('nan')
+
+class DrillHoleStore:
+    """Collar columns (one row per hole) and interval columns (one row per assay)
+
+    Intervals are sorted by (hole, from), so hole h owns the contiguous run
+    interval_offsets[h]:interval_offsets[h + 1]. Lithology is a code column
+    into lithology_names, where code 0 ('') means not logged.
+    """
+
+    def __init__(self, hole_ids, lat, lng, depth, drilled, hole, depth_from, depth_to, grade,
+                 lithology=None, lithology_names=('',)):
+        self.hole_ids = np.asarray(hole_ids, dtype=str)
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.lng = np.asarray(lng, dtype=np.float64)
+        self.depth = np.asarray(depth, dtype=np.float32)
+        self.drilled = np.asarray(drilled, dtype='datetime64[D]')
+
+        hole = np.asarray(hole, dtype=np.uint32)
+        depth_from = np.asarray(depth_from, dtype=np.float32)
+        order = np.lexsort((depth_from, hole))
+        self.hole = hole[order]
+        self.depth_from = depth_from[order]
+        self.depth_to = np.asarray(depth_to, dtype=np.float32)[order]
+        self.grade = np.asarray(grade, dtype=np.float32)[order]
+        if lithology is None:
+            lithology = np.zeros(len(order), dtype=np.uint16)
+        self.lithology = np.asarray(lithology, dtype=np.uint16)[order]
+        self.lithology_names = list(lithology_names)
+        self.interval_offsets = np.searchsorted(self.hole, np.arange(len(self.hole_ids) + 1))
+
+        # Sorted indexes: argsort order plus the sorted values to binary-search
+        # (NaN grades sort last, so a threshold never matches an unassayed interval)
+        self.by_from = np.argsort(self.depth_from, kind='stable')
+        self.by_to = np.argsort(self.depth_to, kind='stable')
+        self.by_grade = np.argsort(self.grade, kind='stable')
+        self._from_sorted = self.depth_from[self.by_from]
+        self._to_sorted = self.depth_to[self.by_to]
+        self._grade_sorted = self.grade[self.by_grade]
+
+    def __len__(self):
+        return len(self.hole_ids)
+
+    @property
+    def interval_count(self):
+        return len(self.hole)
+
+    @classmethod
+    def from_records(cls, records):
+        """Build from SAMPLE_DRILL_HOLES-style nested dicts"""
+        hole, depth_from, depth_to, grade, lithology = [], [], [], [], []
+        codes = {'': 0}
+        for i, record in enumerate(records):
+            for interval in record.get('significant_intervals', []):
+                hole.append(i)
+                depth_from.append(interval['from'])
+                depth_to.append(interval['to'])
+                grade.append(parse_grade(interval['grade']))
+                lithology.append(codes.setdefault(interval.get('lithology', ''), len(codes)))
+        return cls(
+            [record['id'] for record in records],
+            [record['coordinates']['lat'] for record in records],
+            [record['coordinates']['lng'] for record in records],
+            [record['depth'] for record in records],
+            [record.get('date_drilled') or 'NaT' for record in records],
+            hole, depth_from, depth_to, grade, lithology, codes
+        )
+
+    @classmethod
+    def from_csv(cls, collar_path, assay_path):
+        """Build from a collar table and an assay table (CSV, column names per COLLAR/ASSAY_COLUMNS)
+
+        Assay rows stream straight into typed arrays. Blank or malformed cells
+        read as NaN: collars without a position are dropped, as are intervals
+        without finite from/to depths and assays for holes missing from the
+        collar table.
+        """
+        columns = {name: [] for name in COLLAR_COLUMNS}
+        with open(collar_path, newline='') as f:
+            reader = csv.DictReader(f)
+            fields = _resolve_columns(reader.fieldnames, COLLAR_COLUMNS, optional=('drilled',))
+            for row in reader:
+                values = {name: (row[field] or '').strip() if field else '' for name, field in fields.items()}
+                if not (np.isfinite(parse_number(values['lat'])) and np.isfinite(parse_number(values['lng']))):
+                    continue
+                for name, value in values.items():
+                    columns[name].append(value)
+        positions = {hole_id: i for i, hole_id in enumerate(columns['hole_id'])}
+
+        hole, depth_from, depth_to, grade, lithology = array('I'), array('f'), array('f'), array('f'), array('H')
+        codes = {'': 0}
+        with open(assay_path, newline='') as f:
+            reader = csv.DictReader(f)
+            fields = _resolve_columns(reader.fieldnames, ASSAY_COLUMNS, optional=('lithology',))
+            for row in reader:
+                position = positions.get((row[fields['hole_id']] or '').strip())
+                if position is None:
+                    continue
+                top, bottom = parse_number(row[fields['from']]), parse_number(row[fields['to']])
+                if not (np.isfinite(top) and np.isfinite(bottom)):
+                    continue
+                hole.append(position)
+                depth_from.append(top)
+                depth_to.append(bottom)
+                grade.append(parse_grade(row[fields['grade']]))
+                name = (row[fields['lithology']] or '').strip() if fields['lithology'] else ''
+                lithology.append(codes.setdefault(name, len(codes)))
+
+        return cls(columns['hole_id'],
+                   np.array(columns['lat'], dtype=np.float64),
+                   np.array(columns['lng'], dtype=np.float64),
+                   np.array([parse_number(d) for d in columns['depth']], dtype=np.float32),
+                   [d[:10] or 'NaT' for d in columns['drilled']],
+                   hole, depth_from, depth_to, grade, lithology, codes)
+
+    def query_intervals(self, top=None, bottom=None, min_grade=None, holes=None):
+        """Sorted ids of intervals overlapping [top, bottom] with grade >= min_grade
+
+        Each active bound selects a contiguous run of one sorted index; the
+        shortest run becomes the candidate set and the other bounds are
+        checked against it column by column. holes is an optional boolean
+        mask over collars.
+        """
+        # Compare in the columns' float32 so a threshold typed as 8.7 matches a stored 8.7
+        top, bottom, min_grade = (None if v is None else np.float32(v) for v in (top, bottom, min_grade))
+        runs = []
+        if min_grade is not None:
+            runs.append(self.by_grade[np.searchsorted(self._grade_sorted, min_grade, side='left'):])
+        if bottom is not None:
+            runs.append(self.by_from[:np.searchsorted(self._from_sorted, bottom, side='right')])
+        if top is not None:
+            runs.append(self.by_to[np.searchsorted(self._to_sorted, top, side='left'):])
+        if not runs:
+            candidates = np.arange(self.interval_count)
+        else:
+            candidates = np.sort(min(runs, key=len))
+
+        keep = np.ones(len(candidates), dtype=bool)
+        if min_grade is not None:
+            keep &= self.grade[candidates] >= min_grade
+        if bottom is not None:
+            keep &= self.depth_from[candidates] <= bottom
+        if top is not None:
+            keep &= self.depth_to[candidates] >= top
+        if holes is not None:
+            keep &= holes[self.hole[candidates]]
+        return candidates[keep]
+
+    def collars_in_bbox(self, west, south, east, north):
+        """Boolean mask of collars inside a lng/lat bounding box"""
+        return (self.lng >= west) & (self.lng <= east) & (self.lat >= south) & (self.lat <= north)
+
+    def query(self, top=None, bottom=None, min_grade=None, bbox=None):
+        """(hole positions, interval ids) for holes matching the filters
+
+        Without interval filters every hole in bbox matches with all of its
+        intervals; with them, only holes holding a matching interval do.
+        """
+        holes = self.collars_in_bbox(*bbox) if bbox is not None else None
+        if top is None and bottom is None and min_grade is None:
+            positions = np.flatnonzero(holes) if holes is not None else np.arange(len(self))
+            return positions, None
+        intervals = self.query_intervals(top, bottom, min_grade, holes)
+        return np.unique(self.hole[intervals]), intervals
+
+    def describe(self, positions, intervals=None):
+        """JSON-friendly records for hole positions, with their (matching) intervals"""
+        if intervals is not None:
+            # Matching ids are sorted, hence grouped by hole like the columns themselves
+            bounds = np.searchsorted(self.hole[intervals], np.stack([positions, positions + 1]))
+        records = []
+        for i, position in enumerate(positions.tolist()):
+            if intervals is None:
+                ids = np.arange(self.interval_offsets[position], self.interval_offsets[position + 1])
+            else:
+                ids = intervals[bounds[0, i]:bounds[1, i]]
+            drilled = self.drilled[position]
+            records.append({
+                'hole_id': str(self.hole_ids[position]),
+                'coordinates': {'lat': float(self.lat[position]), 'lng': float(self.lng[position])},
+                'depth': float(self.depth[position]),
+                'date_drilled': None if np.isnat(drilled) else str(drilled),
+                'intervals': [
+                    {'from': f, 'to': t, 'grade': None if g != g else g}
+                    for f, t, g in zip(_rounded(self.depth_from[ids], 2), _rounded(self.depth_to[ids], 2),
+                                       _rounded(self.grade[ids], 3))
+                ]
+            })
+        return records
+
+def _rounded(values, decimals):
+    """float32 column as Python floats without float32 noise (8.7, not 8.699999809)"""
+    return np.round(values.astype(np.float64), decimals).tolist()
+
+def _resolve_columns(fieldnames, aliases, optional=()):
+    """Map logical column names to the header names present in a CSV"""
+    present = set(fieldnames or ())
+    fields = {}
+    for name, candidates in aliases.items():
+        fields[name] = next((c for c in candidates if c in present), None)
+        if fields[name] is None and name not in optional:
+            raise ValueError(f"missing column for {name}: expected one of {', '.join(candidates)}")
+    return fields
+
+_loaded = {}
+
+def load_drill_holes(collar_path, assay_path):
+    """Store for a collar/assay table pair, rebuilt only when either file changes
+
+    Falls back to SAMPLE_DRILL_HOLES while the tables are missing or empty.
+    """
+    stats = []
+    for path in (collar_path, assay_path):
+        try:
+            stat = path.stat()
+            stats.append((stat.st_size, stat.st_mtime_ns))
+        except OSError:
+            stats.append(None)
+    key = (str(collar_path), str(assay_path), tuple(stats))
+    if key not in _loaded:
+        if all(stats) and all(size for size, _ in stats):
+            store = DrillHoleStore.from_csv(collar_path, assay_path)
+        else:
+            store = DrillHoleStore.from_records(SAMPLE_DRILL_HOLES)
+        _loaded.clear()
+        _loaded[key] = store
+    return _loaded[key]
@@ -0,0 +1,375 @@
+# geology/dxf.py
+"""
+Streaming DXF reader for Bendigo geological models
+Consumes group-code/value pairs incrementally so multi-hundred-MB GSV exports
+parse in constant memory, yielding each entity as soon as it completes
+"""
+from array import array
+
+import numpy as np
+
+DXF_ENCODING = 'utf-8'
+
+# POLYLINE (70) flags
+POLYLINE_CLOSED = 1
+POLYLINE_MESH_CLOSED_N = 32
+POLYLINE_POLYGON_MESH = 16
+POLYLINE_POLYFACE_MESH = 64
+# VERTEX (70) flags
+VERTEX_POLYFACE_FACE = 128
+VERTEX_POLYFACE_POINT = 64
+
+class DXFFormatError(ValueError):
+    """Raised when a DXF stream is not made of group-code/value line pairs"""
+
+def iter_group_pairs(stream):
+    """Yield (group_code, value) pairs from a text-mode DXF stream, one pair at a time"""
+    lines = iter(stream)
+    # zip over one iterator pairs consecutive lines without indexing or buffering
+    for pair_number, (code_line, value_line) in enumerate(zip(lines, lines)):
+        try:
+            code = int(code_line)
+        except ValueError:
+            raise DXFFormatError(f'Invalid group code {code_line.strip()!r} at line {2 * pair_number + 1}')
+        yield code, value_line.strip()
+
+def iter_entities(stream, sections=('ENTITIES',)):
+    """Yield (entity_type, tags) for every entity inside the requested sections
+
+    tags is the list of (group_code, value) pairs following the entity's
+    0/<type> marker, up to but excluding the next 0 group. Only one entity is
+    held in memory at a time.
+    """
+    section = None
+    expect_section_name = False
+    entity_type = None
+    tags = []
+
+    for code, value in iter_group_pairs(stream):
+        if code == 0:
+            if entity_type is not None:
+                yield entity_type, tags
+                entity_type, tags = None, []
+            if value == 'SECTION':
+                expect_section_name = True
+            elif value == 'ENDSEC':
+                section = None
+            elif value != 'EOF' and section in sections:
+                entity_type = value
+        elif expect_section_name and code == 2:
+            section = value
+            expect_section_name = False
+        elif entity_type is not None:
+            tags.append((code, value))
+
+    if entity_type is not None:
+        yield entity_type, tags
+
+def open_dxf(filepath):
+    """Open a DXF file for streaming; undecodable bytes are dropped as before"""
+    return open(filepath, 'r', encoding=DXF_ENCODING, errors='ignore')
+
+def _point(values, corner=0):
+    """(x, y, z) of the corner-th 10/20/30-style coordinate in a tag dict"""
+    return (float(values.get(10 + corner, 0.0)),
+            float(values.get(20 + corner, 0.0)),
+            float(values.get(30 + corner, 0.0)))
+
+class LayerGeometry:
+    """Packed, GPU-ready geometry for one DXF layer
+
+    positions: (n, 3) float32, metres relative to the model origin
+    triangles: (m, 3) uint32 indices into positions
+    lines:     (k, 2) uint32 indices into positions
+    """
+
+    __slots__ = ('positions', 'triangles', 'lines', 'entity_count')
+
+    def __init__(self, positions, triangles, lines, entity_count):
+        self.positions = positions
+        self.triangles = triangles
+        self.lines = lines
+        self.entity_count = entity_count
+
+    def bounds(self):
+        """(min_xyz, max_xyz) of the layer in origin-relative metres"""
+        if not len(self.positions):
+            return np.zeros(3, dtype=np.float32), np.zeros(3, dtype=np.float32)
+        return self.positions.min(axis=0), self.positions.max(axis=0)
+
+# One fixed-size record per layer: where its entities, vertices and indices sit
+# in the model's concatenated buffers, plus its origin-relative bounding box
+LAYER_INDEX_DTYPE = np.dtype([
+    ('entity_offset', '<u4'), ('entity_count', '<u4'),
+    ('vertex_offset', '<u4'), ('vertex_count', '<u4'),
+    ('triangle_offset', '<u4'), ('triangle_count', '<u4'),
+    ('line_offset', '<u4'), ('line_count', '<u4'),
+    ('bbox_min', '<f4', 3), ('bbox_max', '<f4', 3)
+])
+
+class LayerIndex:
+    """Compact per-layer index over a model's concatenated geometry buffers"""
+
+    def __init__(self, names, records):
+        self.names = list(names)
+        self.records = records
+        self._positions = {name: i for i, name in enumerate(self.names)}
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self._positions
+
+    @classmethod
+    def from_geometries(cls, geometries):
+        """Lay layers out back to back in insertion order"""
+        records = np.zeros(len(geometries), dtype=LAYER_INDEX_DTYPE)
+        for field, attribute in (('entity', 'entity_count'), ('vertex', 'positions'),
+                                 ('triangle', 'triangles'), ('line', 'lines')):
+            counts = np.array([
+                getattr(geometry, attribute) if field == 'entity' else len(getattr(geometry, attribute))
+                for geometry in geometries.values()
+            ], dtype=np.uint32)
+            records[f'{field}_count'] = counts
+            records[f'{field}_offset'] = np.cumsum(counts) - counts
+        for i, geometry in enumerate(geometries.values()):
+            records['bbox_min'][i], records['bbox_max'][i] = geometry.bounds()
+        return cls(geometries.keys(), records)
+
+    def record(self, name):
+        return self.records[self._positions[name]]
+
+    def intersecting(self, low, high):
+        """Names of layers whose bounding boxes overlap the box [low, high]"""
+        mask = np.all((self.records['bbox_min'] <= high) & (self.records['bbox_max'] >= low), axis=1)
+        return [self.names[i] for i in np.flatnonzero(mask)]
+
+    def describe(self, name):
+        """JSON-friendly summary of one layer"""
+        record = self.record(name)
+        return {
+            'name': name,
+            'entities': int(record['entity_count']),
+            'vertices': int(record['vertex_count']),
+            'triangles': int(record['triangle_count']),
+            'lines': int(record['line_count']),
+            'bounds': [record['bbox_min'].tolist(), record['bbox_max'].tolist()]
+        }
+
+class LayerGeometryBuilder:
+    """Growable per-layer vertex and index buffers filled while streaming"""
+
+    __slots__ = ('positions', 'triangles', 'lines', 'entity_count')
+
+    def __init__(self):
+        self.positions = array('d')
+        self.triangles = array('I')
+        self.lines = array('I')
+        self.entity_count = 0
+
+    @property
+    def vertex_count(self):
+        return len(self.positions) // 3
+
+    def add_vertices(self, points):
+        """Append points and return the index of the first one"""
+        base = self.vertex_count
+        for point in points:
+            self.positions.extend(point)
+        return base
+
+    def add_face(self, corners):
+        """Triangle or quad; a repeated fourth corner (the DXF triangle idiom) collapses it"""
+        if len(corners) == 4 and corners[3] == corners[2]:
+            corners = corners[:3]
+        base = self.add_vertices(corners)
+        self.triangles.extend((base, base + 1, base + 2))
+        if len(corners) == 4:
+            self.triangles.extend((base, base + 2, base + 3))
+
+    def add_polyline(self, points, closed=False):
+        if len(points) < 2:
+            return
+        base = self.add_vertices(points)
+        for i in range(len(points) - 1):
+            self.lines.extend((base + i, base + i + 1))
+        if closed and len(points) > 2:
+            self.lines.extend((base + len(points) - 1, base))
+
+    def add_indexed_faces(self, points, faces):
+        """Polyface mesh: shared vertices plus triangle/quad index tuples"""
+        base = self.add_vertices(points)
+        for face in faces:
+            self.triangles.extend((base + face[0], base + face[1], base + face[2]))
+            if len(face) == 4:
+                self.triangles.extend((base + face[0], base + face[2], base + face[3]))
+
+    def add_polygon_mesh(self, points, m_count, n_count, closed_m=False, closed_n=False):
+        """M x N polygon mesh: quads between neighbouring rows and columns of the vertex grid"""
+        if m_count * n_count != len(points) or m_count < 2 or n_count < 2:
+            return
+        base = self.add_vertices(points)
+        rows = np.arange(m_count if closed_m else m_count - 1)
+        cols = np.arange(n_count if closed_n else n_count - 1)
+        i, j = np.meshgrid(rows, cols, indexing='ij')
+        i_next, j_next = (i + 1) % m_count, (j + 1) % n_count
+        a = base + i * n_count + j
+        b = base + i_next * n_count + j
+        c = base + i_next * n_count + j_next
+        d = base + i * n_count + j_next
+        quads = np.stack([a, b, c, a, c, d], axis=-1).astype(np.uint32)
+        self.triangles.frombytes(quads.tobytes())
+
+    def build(self, origin):
+        """Freeze into a LayerGeometry with float32 positions relative to origin"""
+        positions = np.frombuffer(self.positions, dtype=np.float64).reshape(-1, 3)
+        return LayerGeometry(
+            (positions - origin).astype(np.float32),
+            np.frombuffer(self.triangles, dtype=np.uint32).reshape(-1, 3).copy(),
+            np.frombuffer(self.lines, dtype=np.uint32).reshape(-1, 2).copy(),
+            self.entity_count
+        )
+
+# Professional DXF Parser for Bendigo geological structures
+class BendigoDXFParser:
+    GEOMETRY_ENTITIES = ('3DFACE', 'LINE', 'LWPOLYLINE', 'POLYLINE', 'VERTEX', 'SEQEND')
+
+    def __init__(self):
+        self.layers = {}
+        self.entity_count = 0
+        self._polyline = None
+        self.layer_materials = {
+            'BZ_fault_Break_O_Day': {'color': '#8B0000', 'opacity': 0.7, 'roughness': 0.9, 'metalness': 0.1},
+            'BZ_fault_Sheepwash': {'color': '#4B0082', 'opacity': 0.6, 'roughness': 0.8, 'metalness': 0.2},
+            'BZ_formation_Bendigo': {'color': '#A0864A', 'opacity': 0.8, 'roughness': 0.7, 'metalness': 0.2},
+            'BZ_formation_Ordovician': {'color': '#8B7355', 'opacity': 0.7, 'roughness': 0.8, 'metalness': 0.1},
+            'BZ_quartz_vein': {'color': '#F0F0F0', 'opacity': 0.9, 'roughness': 0.3, 'metalness': 0.4},
+            'BZ_shear_zone': {'color': '#654321', 'opacity': 0.6, 'roughness': 0.9, 'metalness': 0.1},
+            'BZ_gold_bearing': {'color': '#FFD700', 'opacity': 0.8, 'roughness': 0.3, 'metalness': 0.8},
+            'BZ_reef_system': {'color': '#E6E6FA', 'opacity': 0.7, 'roughness': 0.4, 'metalness': 0.3}
+        }
+
+    def parse_dxf_file(self, filepath):
+        """Parse authentic Bendigo DXF geological data"""
+        try:
+            with open_dxf(filepath) as f:
+                for entity_type, tags in iter_entities(f):
+                    if entity_type in self.GEOMETRY_ENTITIES:
+                        self.add_entity(entity_type, tags)
+
+            return self.summary()
+
+        except Exception as e:
+            return {'status': 'error', 'message': str(e)}
+
+    def summary(self):
+        return {
+            'status': 'success',
+            'layers': len(self.layers),
+            'entities': self.entity_count,
+            'vertices': sum(layer.vertex_count for layer in self.layers.values()),
+            'triangles': sum(len(layer.triangles) // 3 for layer in self.layers.values()),
+            'layer_names': list(self.layers.keys())[:10]  # First 10 for display
+        }
+
+    def layer(self, name):
+        builder = self.layers.get(name)
+        if builder is None:
+            builder = self.layers[name] = LayerGeometryBuilder()
+        return builder
+
+    def add_entity(self, entity_type, tags):
+        """Decode one completed entity's vertices into its layer's buffers"""
+        if entity_type == 'VERTEX':
+            if self._polyline is not None:
+                self._polyline['vertices'].append(dict(tags))
+            return
+        if entity_type == 'SEQEND':
+            self.end_polyline()
+            return
+
+        values = dict(tags)
+        layer = self.layer(values.get(8, ''))
+        layer.entity_count += 1
+        self.entity_count += 1
+
+        if entity_type == '3DFACE':
+            layer.add_face([_point(values, corner) for corner in range(4)])
+        elif entity_type == 'LINE':
+            layer.add_polyline([_point(values, 0), _point(values, 1)])
+        elif entity_type == 'LWPOLYLINE':
+            self.add_lwpolyline(layer, tags, values)
+        elif entity_type == 'POLYLINE':
+            self._polyline = {'layer': layer, 'flags': int(values.get(70, 0)),
+                              'm': int(values.get(71, 0)), 'n': int(values.get(72, 0)),
+                              'vertices': []}
+
+    def add_lwpolyline(self, layer, tags, values):
+        # Vertices repeat 10/20 in order; the whole polyline sits at one elevation (38)
+        elevation = float(values.get(38, 0.0))
+        points = []
+        for code, value in tags:
+            if code == 10:
+                points.append([float(value), 0.0, elevation])
+            elif code == 20 and points:
+                points[-1][1] = float(value)
+        layer.add_polyline([tuple(point) for point in points], bool(int(values.get(70, 0)) & POLYLINE_CLOSED))
+
+    def end_polyline(self):
+        polyline, self._polyline = self._polyline, None
+        if polyline is None:
+            return
+        layer, flags, vertices = polyline['layer'], polyline['flags'], polyline['vertices']
+
+        if flags & POLYLINE_POLYFACE_MESH:
+            points, faces = [], []
+            for vertex in vertices:
+                vertex_flags = int(vertex.get(70, 0))
+                if vertex_flags & VERTEX_POLYFACE_POINT:
+                    points.append(_point(vertex))
+                elif vertex_flags & VERTEX_POLYFACE_FACE:
+                    # 1-based indices; negative marks an invisible edge, zero an unused slot
+                    face = [abs(int(vertex[code])) - 1 for code in (71, 72, 73, 74)
+                            if int(vertex.get(code, 0)) != 0]
+                    if len(face) >= 3 and max(face) < len(points):
+                        faces.append(face)
+            layer.add_indexed_faces(points, faces)
+        elif flags & POLYLINE_POLYGON_MESH:
+            layer.add_polygon_mesh([_point(vertex) for vertex in vertices], polyline['m'], polyline['n'],
+                                   bool(flags & POLYLINE_CLOSED), bool(flags & POLYLINE_MESH_CLOSED_N))
+        else:
+            layer.add_polyline([_point(vertex) for vertex in vertices], bool(flags & POLYLINE_CLOSED))
+
+    def geometry(self):
+        """(origin, {layer: LayerGeometry}) with every layer sharing one float64 origin
+
+        GSV models are in MGA metres (northings near 5.9e6), beyond float32's
+        sub-metre range, so positions are stored relative to a rounded origin.
+        """
+        lows = [np.frombuffer(layer.positions, dtype=np.float64).reshape(-1, 3).min(axis=0)
+                for layer in self.layers.values() if len(layer.positions)]
+        origin = np.floor(np.min(lows, axis=0) / 1000) * 1000 if lows else np.zeros(3)
+        return origin, {name: layer.build(origin) for name, layer in self.layers.items()}
+
+DEFAULT_LAYER_MATERIAL = {'color': '#A0A0A0', 'opacity': 0.7, 'roughness': 0.8, 'metalness': 0.1}
+
+def geometry_bundle(origin, layers, layer_materials):
+    """Manifest and named arrays for encode_buffer_bundle, one position/index set per layer"""
+    manifest = {'origin': [float(v) for v in origin], 'units': 'metres', 'layers': []}
+    arrays = {}
+    for name, geometry in layers.items():
+        low, high = geometry.bounds()
+        manifest['layers'].append({
+            'name': name,
+            'material': layer_materials.get(name, DEFAULT_LAYER_MATERIAL),
+            'entities': geometry.entity_count,
+            'bounds': [low.tolist(), high.tolist()],
+            'positions': f'{name}/positions',
+            'triangles': f'{name}/triangles',
+            'lines': f'{name}/lines'
+        })
+        arrays[f'{name}/positions'] = geometry.positions
+        arrays[f'{name}/triangles'] = geometry.triangles
+        arrays[f'{name}/lines'] = geometry.lines
+    return manifest, arrays
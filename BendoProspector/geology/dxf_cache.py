@@ -0,0 +1,244 @@
+# geology/dxf_cache.py
+"""
+Persistent parsed-DXF cache
+Parses a DXF once, then stores the packed geometry as memory-mappable .npy
+arrays plus a JSON manifest keyed by the file's content hash. Later requests
+and process restarts map the arrays back in milliseconds; a changed file
+(new size/mtime and a new hash) gets a fresh entry.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from .dxf import DEFAULT_LAYER_MATERIAL, BendigoDXFParser, DXFFormatError, LayerGeometry, LayerIndex
+from .spatial import FaceBVH, ray_triangle_distances
+
+CACHE_ROOT = Path(os.environ.get('BENDIGO_CACHE_DIR', Path(__file__).resolve().parent.parent / '.cache'))
+DXF_CACHE_DIR = CACHE_ROOT / 'dxf'
+# Bump when the parser's output changes so stale entries are ignored
+DXF_CACHE_VERSION = 3
+HASH_CHUNK_BYTES = 4 * 1024 * 1024
+
+def file_digest(filepath):
+    """blake2b content hash, streamed so large DXFs are never held in memory"""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class DXFModel:
+    """Parsed DXF geometry: every layer's buffers concatenated, plus a LayerIndex over them
+
+    Layer index buffers are local to the layer (they index from the layer's
+    first vertex), so a layer can be served as a standalone slice.
+    """
+
+    ARRAYS = ('positions', 'triangles', 'lines', 'layer_index',
+              'bvh_min', 'bvh_max', 'bvh_order', 'bvh_face_min', 'bvh_face_max')
+
+    def __init__(self, manifest, positions, triangles, lines, layer_index,
+                 bvh_min, bvh_max, bvh_order, bvh_face_min, bvh_face_max):
+        self.manifest = manifest
+        self.positions = positions
+        self.triangles = triangles
+        self.lines = lines
+        self.layer_index = LayerIndex(manifest['layer_names'], layer_index)
+        self.bvh = FaceBVH(bvh_min, bvh_max, bvh_order, bvh_face_min, bvh_face_max, manifest['bvh_leaf_size'])
+
+    @property
+    def origin(self):
+        return np.array(self.manifest['origin'])
+
+    @classmethod
+    def from_parser(cls, parser, source_digest):
+        origin, geometries = parser.geometry()
+        index = LayerIndex.from_geometries(geometries)
+
+        def concatenate(attribute, dtype, width):
+            parts = [getattr(geometry, attribute) for geometry in geometries.values()]
+            return np.concatenate(parts) if parts else np.empty((0, width), dtype=dtype)
+
+        positions = concatenate('positions', np.float32, 3)
+        triangles = concatenate('triangles', np.uint32, 3)
+        # Faces from every layer in one hierarchy; ids are positions in the concatenated triangles
+        vertex_offsets = np.repeat(index.records['vertex_offset'], index.records['triangle_count'])
+        bvh = FaceBVH.build(positions[triangles + vertex_offsets[:, None]])
+
+        manifest = {
+            'version': DXF_CACHE_VERSION,
+            'source_digest': source_digest,
+            'origin': origin.tolist(),
+            'summary': parser.summary(),
+            'layer_names': index.names,
+            'layer_materials': {name: parser.layer_materials[name]
+                                for name in index.names if name in parser.layer_materials},
+            'bvh_leaf_size': bvh.leaf_size
+        }
+        return cls(manifest, positions, triangles, concatenate('lines', np.uint32, 2),
+                   index.records, bvh.node_min, bvh.node_max, bvh.order, bvh.face_min, bvh.face_max)
+
+    def summary(self):
+        return dict(self.manifest['summary'])
+
+    def layer_geometry(self, name):
+        """Zero-copy LayerGeometry views for one layer"""
+        record = self.layer_index.record(name)
+        v, t, l = int(record['vertex_offset']), int(record['triangle_offset']), int(record['line_offset'])
+        return LayerGeometry(
+            self.positions[v:v + int(record['vertex_count'])],
+            self.triangles[t:t + int(record['triangle_count'])],
+            self.lines[l:l + int(record['line_count'])],
+            int(record['entity_count'])
+        )
+
+    def layer_geometries(self, names=None):
+        return {name: self.layer_geometry(name) for name in (names or self.layer_index.names)}
+
+    def layer_materials(self):
+        return self.manifest['layer_materials']
+
+    def describe_layers(self):
+        materials = self.layer_materials()
+        return [dict(self.layer_index.describe(name), material=materials.get(name, DEFAULT_LAYER_MATERIAL))
+                for name in self.layer_index.names]
+
+    def face_layers(self, face_ids):
+        """Position in the layer index of each global face id"""
+        return np.searchsorted(self.layer_index.records['triangle_offset'], face_ids, side='right') - 1
+
+    def face_corners(self, face_ids):
+        """(n, 3, 3) corner positions of global face ids"""
+        vertex_offsets = self.layer_index.records['vertex_offset'][self.face_layers(face_ids)]
+        return self.positions[self.triangles[face_ids] + vertex_offsets[:, None]]
+
+    def _restrict(self, face_ids, layers):
+        if layers is None:
+            return face_ids
+        wanted = np.array([self.layer_index.names.index(name) for name in layers if name in self.layer_index])
+        return face_ids[np.isin(self.face_layers(face_ids), wanted)]
+
+    def group_by_layer(self, face_ids):
+        """{layer name: layer-local face ids} for global face ids"""
+        face_ids = np.sort(face_ids)
+        positions = self.face_layers(face_ids)
+        local = face_ids - self.layer_index.records['triangle_offset'][positions]
+        return {self.layer_index.names[p]: local[positions == p] for p in np.unique(positions)}
+
+    def query_box(self, low, high, layers=None):
+        """Global ids of faces whose bounds overlap [low, high] (origin-relative metres)"""
+        return self._restrict(self.bvh.query_box(low, high), layers)
+
+    def query_plane(self, normal, offset, low, high, layers=None):
+        """Global ids of faces whose bounds cross the plane normal . p = offset within [low, high]"""
+        return self._restrict(self.bvh.query_plane(normal, offset, low, high), layers)
+
+    def raycast(self, origin, direction, layers=None):
+        """(face id, distance) of the nearest face hit by the ray, or None"""
+        candidates = self._restrict(self.bvh.ray_candidates(origin, direction), layers)
+        if not candidates.size:
+            return None
+        distances = ray_triangle_distances(origin, direction, self.face_corners(candidates))
+        nearest = int(np.argmin(distances))
+        if not np.isfinite(distances[nearest]):
+            return None
+        return int(candidates[nearest]), float(distances[nearest])
+
+    def save(self, directory):
+        directory.mkdir(parents=True, exist_ok=True)
+        arrays = {'positions': self.positions, 'triangles': self.triangles,
+                  'lines': self.lines, 'layer_index': self.layer_index.records,
+                  'bvh_min': self.bvh.node_min, 'bvh_max': self.bvh.node_max, 'bvh_order': self.bvh.order,
+                  'bvh_face_min': self.bvh.face_min, 'bvh_face_max': self.bvh.face_max}
+        for name in self.ARRAYS:
+            np.save(directory / f'{name}.npy', arrays[name])
+        (directory / 'manifest.json').write_text(json.dumps(self.manifest))
+
+    @classmethod
+    def load(cls, directory):
+        manifest = json.loads((directory / 'manifest.json').read_text())
+        # Plain ndarray views over the maps: same pages, without np.memmap's per-index overhead
+        arrays = [np.asarray(np.load(directory / f'{name}.npy', mmap_mode='r')) for name in cls.ARRAYS]
+        return cls(manifest, *arrays)
+
+class DXFModelCache:
+    """Parse-once cache: in-process models backed by on-disk entries keyed by content hash"""
+
+    def __init__(self, cache_dir=DXF_CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+        self._models = {}   # resolved path -> (size, mtime_ns, DXFModel)
+        self._lock = threading.Lock()
+
+    def entry_dir(self, digest):
+        return self.cache_dir / f'{digest}-v{DXF_CACHE_VERSION}'
+
+    def load(self, filepath):
+        """DXFModel for filepath, parsing only when no cache entry matches its content"""
+        path = Path(filepath).resolve()
+        stat = path.stat()
+        with self._lock:
+            cached = self._models.get(path)
+            if cached and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+                return cached[2]
+
+            digest = self._stat_digest(path, stat)
+            entry = self.entry_dir(digest)
+            if (entry / 'manifest.json').exists():
+                model = DXFModel.load(entry)
+            else:
+                model = self._parse(path, digest)
+                self._store(model, entry)
+                model = DXFModel.load(entry)
+
+            self._models[path] = (stat.st_size, stat.st_mtime_ns, model)
+            return model
+
+    def _parse(self, path, digest):
+        parser = BendigoDXFParser()
+        result = parser.parse_dxf_file(str(path))
+        if result['status'] != 'success':
+            raise DXFFormatError(result['message'])
+        return DXFModel.from_parser(parser, digest)
+
+    def _store(self, model, entry):
+        # Write into a sibling temp dir and rename, so readers never see a partial entry
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(dir=self.cache_dir, prefix='.staging-'))
+        try:
+            model.save(staging)
+            os.replace(staging, entry)
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+            if not (entry / 'manifest.json').exists():
+                raise
+
+    def _stat_digest(self, path, stat):
+        """Content hash of path, reusing the recorded hash while size and mtime are unchanged"""
+        index_path = self.cache_dir / 'index.json'
+        try:
+            index = json.loads(index_path.read_text())
+        except (OSError, ValueError):
+            index = {}
+
+        record = index.get(str(path))
+        if record and (record['size'], record['mtime_ns']) == (stat.st_size, stat.st_mtime_ns):
+            return record['digest']
+
+        digest = file_digest(path)
+        index[str(path)] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'digest': digest}
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        staging = index_path.with_suffix('.tmp')
+        staging.write_text(json.dumps(index))
+        os.replace(staging, index_path)
+
+        # Drop the superseded entry once no other indexed file shares its content
+        if record and record['digest'] != digest and \
+                all(other['digest'] != record['digest'] for other in index.values()):
+            shutil.rmtree(self.entry_dir(record['digest']), ignore_errors=True)
+        return digest
@@ -0,0 +1,86 @@
+# geology/encoding.py
+"""
+Packed binary buffer bundles
+A JSON manifest followed by 8-byte aligned little-endian arrays, so clients can
+wrap each buffer in a typed array (Float32Array, Uint32Array) without copying,
+and finite_or_none for the same arrays sent as JSON
+"""
+import json
+import struct
+
+import numpy as np
+
+BUNDLE_MIME_TYPE = 'application/octet-stream'
+BUNDLE_MAGIC = b'BGDX'
+BUNDLE_FORMAT_VERSION = 1
+BUNDLE_ALIGNMENT = 8
+STREAM_CHUNK_BYTES = 1024 * 1024
+
+# magic, version, reserved, manifest byte length (padded so the data section is aligned)
+BUNDLE_HEADER = struct.Struct('<4sHHI')
+BUNDLE_DTYPES = {'float32': '<f4', 'float64': '<f8', 'uint32': '<u4', 'uint16': '<u2', 'uint8': 'u1'}
+
+def _align(offset):
+    return (offset + BUNDLE_ALIGNMENT - 1) // BUNDLE_ALIGNMENT * BUNDLE_ALIGNMENT
+
+def stream_buffer_bundle(manifest, arrays, chunk_bytes=STREAM_CHUNK_BYTES):
+    """(total byte length, iterator of byte chunks) for a bundle of named arrays
+
+    manifest gains a 'buffers' entry mapping every array name to its dtype,
+    shape and byte offset from the start of the data section, which begins
+    right after the header and manifest (12 + manifest length bytes).
+    Arrays may be strided views, e.g. into a memory map: each is copied out
+    a run of leading-axis rows at a time, never materialized whole.
+    """
+    arrays = {name: np.asarray(data) for name, data in arrays.items()}
+    targets = {name: np.dtype(BUNDLE_DTYPES[data.dtype.name]) for name, data in arrays.items()}
+
+    buffers = {}
+    offset = 0
+    for name, data in arrays.items():
+        buffers[name] = {'offset': offset, 'dtype': data.dtype.name, 'shape': list(data.shape)}
+        offset = _align(offset + data.size * targets[name].itemsize)
+
+    manifest_bytes = json.dumps(dict(manifest, buffers=buffers), separators=(',', ':')).encode('utf-8')
+    manifest_bytes = manifest_bytes.ljust(_align(BUNDLE_HEADER.size + len(manifest_bytes)) - BUNDLE_HEADER.size)
+    head = BUNDLE_HEADER.pack(BUNDLE_MAGIC, BUNDLE_FORMAT_VERSION, 0, len(manifest_bytes)) + manifest_bytes
+
+    def chunks():
+        yield head
+        for name, data in arrays.items():
+            nbytes = data.size * targets[name].itemsize
+            rows = data.reshape(1) if data.ndim == 0 else data
+            rows_per_chunk = max(1, chunk_bytes // max(1, nbytes // max(1, len(rows))))
+            for start in range(0, len(rows), rows_per_chunk):
+                yield rows[start:start + rows_per_chunk].astype(targets[name], copy=False).tobytes()
+            yield b'\0' * (_align(nbytes) - nbytes)
+
+    return len(head) + offset, chunks()
+
+def encode_buffer_bundle(manifest, arrays):
+    """Serialize named arrays behind a JSON manifest describing where each one lives (see stream_buffer_bundle)"""
+    return b''.join(stream_buffer_bundle(manifest, arrays)[1])
+
+def decode_buffer_bundle(payload):
+    """Read a bundle back into (manifest, {name: array}) as zero-copy views"""
+    magic, version, _, manifest_length = BUNDLE_HEADER.unpack_from(payload)
+    if magic != BUNDLE_MAGIC:
+        raise ValueError('Not a Bendigo buffer bundle')
+    data_start = BUNDLE_HEADER.size + manifest_length
+    manifest = json.loads(bytes(payload[BUNDLE_HEADER.size:data_start]))
+    arrays = {}
+    for name, spec in manifest['buffers'].items():
+        count = int(np.prod(spec['shape'], dtype=np.int64))
+        arrays[name] = np.frombuffer(payload, dtype=BUNDLE_DTYPES[spec['dtype']], count=count,
+                                     offset=data_start + spec['offset']).reshape(spec['shape'])
+    return manifest, arrays
+
+def finite_or_none(values, decimals):
+    """Rounded values as (nested) lists, with NaN and infinities as None (JSON has no NaN)"""
+    rounded = np.round(np.asarray(values, dtype=np.float64), decimals)
+    finite = np.isfinite(rounded)
+    if finite.all():
+        return rounded.tolist()
+    rounded = rounded.astype(object)
+    rounded[~finite] = None
+    return rounded.tolist()
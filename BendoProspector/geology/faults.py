@@ -0,0 +1,83 @@
+# geology/faults.py
+"""
+Fault traces
+Serves the polylines of a fault-interpretation shapefile by lat/lng box.
+The box is projected into the shapefile's MGA zone to pick candidate
+records off its grid index, only those records' vertices are read and
+reprojected (in one call), and a segment test keeps the traces that
+actually cross the box.
+"""
+import numpy as np
+
+from terrain.coordinates import bounds_in_frame, transform
+from .shapefile import load_shapefile
+from .spatial import segments_overlap_box
+
+class FaultSet:
+    """Fault polylines of a shapefile in a projected frame ('mga54' or 'mga55'), served as lng/lat"""
+
+    def __init__(self, shapes, frame):
+        self.shapes = shapes
+        self.frame = frame
+
+    def query(self, bbox=None):
+        """(record ids, lines) of traces crossing bbox=(west, south, east, north), every trace when None
+
+        lines holds, per record, a list of (k, 2) lng/lat arrays, one per part.
+        """
+        records = self.shapes.query() if bbox is None else self.shapes.query(*bounds_in_frame(bbox, self.frame))
+        parts = [self.shapes.parts(record) for record in records]
+        flat = [part for record_parts in parts for part in record_parts]
+        if not flat:
+            return records[:0], []
+        points = np.concatenate(flat)
+        lat, lng = transform(points[:, 0], points[:, 1], self.frame, 'wgs84')
+        lnglat = np.column_stack([lng, lat])
+        part_lengths = np.array([len(part) for part in flat])
+        part_ends = np.cumsum(part_lengths)
+
+        keep = np.ones(len(records), dtype=bool)
+        if bbox is not None:
+            low, high = np.array(bbox[:2], dtype=np.float64), np.array(bbox[2:], dtype=np.float64)
+            owner = np.repeat(np.repeat(np.arange(len(records)), [len(p) for p in parts]), part_lengths)
+            # Consecutive vertices form a segment unless the second one starts a new part
+            joined = np.ones(len(lnglat) - 1, dtype=bool)
+            joined[part_ends[:-1] - 1] = False
+            crossing = joined & segments_overlap_box(lnglat[:-1], lnglat[1:], low, high)
+            vertex_inside = np.all((lnglat >= low) & (lnglat <= high), axis=1)
+            keep[:] = False
+            keep[owner[:-1][crossing]] = True
+            keep[owner[vertex_inside]] = True
+
+        split = np.split(lnglat, part_ends[:-1])
+        lines, position = [], 0
+        for record_parts, kept in zip(parts, keep):
+            if kept:
+                lines.append(split[position:position + len(record_parts)])
+            position += len(record_parts)
+        return records[keep], lines
+
+    def features(self, records, lines, decimals=6):
+        """GeoJSON LineString/MultiLineString Features with the records' attributes as properties"""
+        features = []
+        for record, attributes, parts in zip(np.asarray(records).tolist(),
+                                             self.shapes.attributes(records), lines):
+            coordinates = [np.round(part, decimals).tolist() for part in parts]
+            features.append({
+                'type': 'Feature',
+                'id': record,
+                'geometry': {'type': 'LineString', 'coordinates': coordinates[0]} if len(coordinates) == 1 else
+                {'type': 'MultiLineString', 'coordinates': coordinates},
+                'properties': attributes
+            })
+        return features
+
+def strike(parts):
+    """Trace strike in degrees east of north (0-180), from its end-to-end bearing on lng/lat parts"""
+    first, last = parts[0][0], parts[-1][-1]
+    east = (last[0] - first[0]) * np.cos(np.radians((first[1] + last[1]) / 2))
+    return float(np.degrees(np.arctan2(east, last[1] - first[1])) % 180)
+
+def load_faults(path, frame):
+    """FaultSet over a .shp, or a zip holding one, in the given MGA frame"""
+    return FaultSet(load_shapefile(path), frame)
@@ -0,0 +1,310 @@
+# geology/map_tiles.py
+"""
+Geological map tile pyramids
+Cuts a georeferenced map image (a PNG with declared lat/lng bounds) once
+into RGBA PNG tiles on the elevation pyramid's z/x/y grid, so a map tile
+drapes exactly over the terrain tile with the same address. The deepest
+level is resampled from the image through the local frame; each coarser
+tile averages its four children, built depth-first so only a handful of
+tiles are in memory at once. Tiles are written beside a manifest in the
+cache under a version derived from the image file, so tile URLs carrying
+the version can be cached by clients indefinitely. Servers cut sheets on a
+background thread (MapTileStore.prepare) rather than on a request.
+"""
+import hashlib
+import json
+import math
+import os
+import queue
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from terrain.coordinates import bounds_in_frame, transform
+from terrain.tiles import elevation_pyramid
+from .dxf_cache import CACHE_ROOT
+from .png import encode_png, png_size, read_png
+
+MAP_TILE_DIR = CACHE_ROOT / 'map_tiles'
+MAP_TILE_VERSION = 1
+# Tile pixel positions are converted to lat/lng on this many points per axis and interpolated between
+WARP_GRID_POINTS = 17
+# Most tiles listed for one viewport when the client leaves the level to the server
+MAX_VIEWPORT_TILES = 64
+METRES_PER_DEGREE = 111320.0
+
+def image_version(path, bounds):
+    """Short id of an image file's contents (by size and mtime) and georeference"""
+    stat = Path(path).stat()
+    key = json.dumps([MAP_TILE_VERSION, stat.st_size, stat.st_mtime_ns, bounds], sort_keys=True)
+    return hashlib.blake2b(key.encode(), digest_size=6).hexdigest()
+
+def zoom_range(width, height, bounds, pyramid=elevation_pyramid):
+    """(min, max) pyramid levels for an image: from the level where it fits one tile
+    to the first level whose tile pixels are no larger than the image's"""
+    lat = math.radians((bounds['north'] + bounds['south']) / 2)
+    span_m = max((bounds['east'] - bounds['west']) * METRES_PER_DEGREE * math.cos(lat),
+                 (bounds['north'] - bounds['south']) * METRES_PER_DEGREE)
+    pixel_m = min((bounds['east'] - bounds['west']) * METRES_PER_DEGREE * math.cos(lat) / width,
+                  (bounds['north'] - bounds['south']) * METRES_PER_DEGREE / height)
+    extent_m = pyramid.extent_km * 1000
+    deepest = math.ceil(math.log2(extent_m / (pyramid.tile_size * pixel_m)))
+    coarsest = math.floor(math.log2(extent_m / span_m))
+    deepest = min(max(deepest, 0), pyramid.max_zoom)
+    return min(max(coarsest, 0), deepest), deepest
+
+class MapTileError(RuntimeError):
+    """A map image that could not be cut into tiles"""
+
+class MapPyramid:
+    """A built tile pyramid: its manifest and the directory of z/x/y.png files"""
+
+    def __init__(self, manifest, directory):
+        self.manifest = manifest
+        self.directory = Path(directory)
+        self.present = {int(z): {tuple(tile) for tile in tiles} for z, tiles in manifest['tiles'].items()}
+
+    def tile_path(self, z, x, y):
+        """Path of a stored tile, or None where the image leaves it empty"""
+        if (x, y) not in self.present.get(z, ()):
+            return None
+        return self.directory / str(z) / str(x) / f'{y}.png'
+
+    def viewport(self, bbox, z=None, max_tiles=MAX_VIEWPORT_TILES, pyramid=elevation_pyramid):
+        """(z, [(x, y), ...]) of stored tiles under a (west, south, east, north) degree box
+
+        Without z, the finest level covering the box in at most max_tiles tiles.
+        """
+        low, high = bounds_in_frame(bbox, 'local')
+        x_min, y_min = low / 1000
+        x_max, y_max = high / 1000
+        min_zoom, max_zoom = self.manifest['min_zoom'], self.manifest['max_zoom']
+        if z is None:
+            z = min_zoom
+            for level in range(max_zoom, min_zoom - 1, -1):
+                size = pyramid.tile_extent(level)
+                columns = math.floor(x_max / size) - math.floor(x_min / size) + 1
+                rows = math.floor(y_max / size) - math.floor(y_min / size) + 1
+                if columns * rows <= max_tiles:
+                    z = level
+                    break
+        z = min(max(z, min_zoom), max_zoom)
+        present = self.present.get(z, set())
+        return z, [tile for tile in pyramid.tiles_in_bounds(z, x_min, x_max, y_min, y_max) if tile in present]
+
+def _interpolation_matrix(positions, points):
+    """(len(positions), points) weights interpolating linearly between samples 0..points-1"""
+    low = np.minimum(np.floor(positions).astype(np.intp), points - 2)
+    t = positions - low
+    weights = np.zeros((len(positions), points))
+    weights[np.arange(len(positions)), low] = 1 - t
+    weights[np.arange(len(positions)), low + 1] = t
+    return weights
+
+def _warp_tile(image, bounds, z, x, y, pyramid):
+    """RGBA tile resampled bilinearly from the image, transparent where the image does not reach"""
+    size = pyramid.tile_size
+    x_min, x_max, y_min, y_max = (value * 1000 for value in pyramid.tile_bounds(z, x, y))
+    # Lat/lng on a coarse grid over the tile, interpolated to pixel centres (row 0 at the north edge);
+    # bilinear interpolation on a regular grid is separable, so it is two small matrix products
+    east_axis = np.linspace(x_min, x_max, WARP_GRID_POINTS)
+    north_axis = np.linspace(y_min, y_max, WARP_GRID_POINTS)
+    lat, lng = transform(*np.meshgrid(east_axis, north_axis, indexing='ij'), 'local', 'wgs84')
+    centres = (np.arange(size) + 0.5) / size * (WARP_GRID_POINTS - 1)
+    to_columns = _interpolation_matrix(centres, WARP_GRID_POINTS)
+    to_rows = _interpolation_matrix(WARP_GRID_POINTS - 1 - centres, WARP_GRID_POINTS)
+    pixel_lat = to_rows @ lat.T @ to_columns.T
+    pixel_lng = to_rows @ lng.T @ to_columns.T
+
+    height, width = image.shape[:2]
+    row = (bounds['north'] - pixel_lat) / (bounds['north'] - bounds['south']) * height - 0.5
+    col = (pixel_lng - bounds['west']) / (bounds['east'] - bounds['west']) * width - 0.5
+    row0, col0 = np.floor(row).astype(np.intp), np.floor(col).astype(np.intp)
+    u, v = (row - row0).astype(np.float32), (col - col0).astype(np.float32)
+    # RGBA pixels gathered as single uint32 words by flat index
+    packed = image.view(np.uint32).reshape(height, width).ravel()
+    colour = np.zeros((size, size, 3), dtype=np.float32)
+    alpha = np.zeros((size, size), dtype=np.float32)
+    for dr, dc, weight in ((0, 0, (1 - u) * (1 - v)), (0, 1, (1 - u) * v), (1, 0, u * (1 - v)), (1, 1, u * v)):
+        r, c = row0 + dr, col0 + dc
+        # Neighbours off the image count as transparent, so the map edge fades over half a pixel
+        weight = np.where((r >= 0) & (r < height) & (c >= 0) & (c < width), weight, 0)
+        pixels = packed[np.clip(r, 0, height - 1) * width + np.clip(c, 0, width - 1)].view(np.uint8)
+        pixels = pixels.reshape(size, size, 4)
+        a = weight * pixels[..., 3]
+        colour += a[..., None] * pixels[..., :3]
+        alpha += a
+    return _unpremultiply(colour, alpha)
+
+def _unpremultiply(colour, alpha):
+    """uint8 RGBA from premultiplied colour sums and alpha (0-255)"""
+    rgba = np.empty(alpha.shape + (4,), dtype=np.uint8)
+    # Colour sums are zero wherever alpha is, so the floor on alpha only avoids dividing by zero
+    rgba[..., :3] = np.clip(np.rint(colour / np.maximum(alpha, 1e-6)[..., None]), 0, 255)
+    rgba[..., 3] = np.clip(np.rint(alpha), 0, 255)
+    return rgba
+
+def _downsample(children, size):
+    """Parent tile averaging 2x2 pixel blocks of its four children ({(dx, dy): tile or None})"""
+    if all(tile is None for tile in children.values()):
+        return None
+    premultiplied = np.zeros((2 * size, 2 * size, 4), dtype=np.float32)
+    for (dx, dy), tile in children.items():
+        if tile is not None:
+            # x runs east (columns); y runs north, so the dy = 1 child is the upper half
+            rows = slice(0, size) if dy else slice(size, 2 * size)
+            cols = slice(dx * size, (dx + 1) * size)
+            alpha = tile[..., 3:].astype(np.float32)
+            premultiplied[rows, cols, :3] = tile[..., :3] * alpha
+            premultiplied[rows, cols, 3:] = alpha
+    blocks = (premultiplied[0::2, 0::2] + premultiplied[1::2, 0::2]
+              + premultiplied[0::2, 1::2] + premultiplied[1::2, 1::2]) / 4
+    return _unpremultiply(blocks[..., :3], blocks[..., 3])
+
+def build_pyramid(image, bounds, directory, min_zoom, max_zoom, pyramid=elevation_pyramid):
+    """Write every non-empty tile of an RGBA image between two levels; returns {z: [[x, y], ...]}"""
+    low, high = bounds_in_frame((bounds['west'], bounds['south'], bounds['east'], bounds['north']), 'local')
+    extent = (low[0] / 1000, high[0] / 1000, low[1] / 1000, high[1] / 1000)
+    covered = set(pyramid.tiles_in_bounds(max_zoom, *extent))
+    tiles = {z: [] for z in range(min_zoom, max_zoom + 1)}
+
+    def build(z, x, y):
+        if z == max_zoom:
+            tile = _warp_tile(image, bounds, z, x, y, pyramid) if (x, y) in covered else None
+        else:
+            tile = _downsample({(dx, dy): build(z + 1, 2 * x + dx, 2 * y + dy)
+                                for dx in (0, 1) for dy in (0, 1)}, pyramid.tile_size)
+        if tile is None or not tile[..., 3].any():
+            return None
+        path = directory / str(z) / str(x) / f'{y}.png'
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(encode_png(tile))
+        tiles[z].append([x, y])
+        return tile
+
+    for x, y in pyramid.tiles_in_bounds(min_zoom, *extent):
+        build(min_zoom, x, y)
+    return tiles
+
+class MapTileStore:
+    """Tile pyramids of map images under one cache directory
+
+    Cutting a sheet takes seconds to minutes, so servers queue sheets with
+    prepare() and a background worker cuts them one at a time; ready()
+    answers None until a sheet's current version is on disk.
+    """
+
+    def __init__(self, root=MAP_TILE_DIR):
+        self.root = Path(root)
+        self.errors = {}           # name -> (version, message) of the last failed cut
+        self._pyramids = {}
+        self._locks = {}           # one per sheet, so cutting one never blocks serving another
+        self._pending = set()
+        self._queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+
+    def _name_lock(self, name):
+        with self._lock:
+            return self._locks.setdefault(name, threading.Lock())
+
+    def describe(self, name, path, bounds):
+        """Tileset metadata for an image without building it: version, levels and URL template"""
+        width, height = png_size(path)
+        version = image_version(path, bounds)
+        min_zoom, max_zoom = zoom_range(width, height, bounds)
+        return {
+            'version': version,
+            'min_zoom': min_zoom,
+            'max_zoom': max_zoom,
+            'tile_size': elevation_pyramid.tile_size,
+            'scheme': 'elevation pyramid z/x/y: x east, y north; tile rows run north to south',
+            'url_template': f'/api/textures/geological/{name}/{version}/{{z}}/{{x}}/{{y}}.png',
+            'viewport_url': f'/api/textures/geological/{name}/tiles'
+        }
+
+    def load(self, name, path, bounds):
+        """MapPyramid of an image, cut into the cache on this thread when this version is not there yet"""
+        version = image_version(path, bounds)
+        entry = self.root / name / version
+        with self._name_lock(name):
+            cached = self._pyramids.get(name)
+            if cached and cached.manifest['version'] == version:
+                return cached
+            if not (entry / 'manifest.json').exists():
+                self._build(name, path, bounds, version, entry)
+            pyramid = MapPyramid(json.loads((entry / 'manifest.json').read_text()), entry)
+            self._pyramids[name] = pyramid
+            return pyramid
+
+    def ready(self, name, path, bounds):
+        """MapPyramid of an image once its current version is cut, else None with the cut queued
+
+        Raises MapTileError when cutting this version already failed.
+        """
+        version = image_version(path, bounds)
+        cached = self._pyramids.get(name)
+        if cached and cached.manifest['version'] == version:
+            return cached
+        if (self.root / name / version / 'manifest.json').exists():
+            return self.load(name, path, bounds)
+        failed = self.errors.get(name)
+        if failed and failed[0] == version:
+            raise MapTileError(failed[1])
+        self.prepare(name, path, bounds)
+        return None
+
+    def prepare(self, name, path, bounds):
+        """Queue an image for the background worker, which starts on first use"""
+        version = image_version(path, bounds)
+        with self._lock:
+            if name in self._pending:
+                return
+            self._pending.add(name)
+            self._queue.put((name, path, bounds, version))
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._work, name='map-tiles', daemon=True)
+                self._worker.start()
+
+    def _work(self):
+        while True:
+            name, path, bounds, version = self._queue.get()
+            try:
+                self.load(name, path, bounds)
+            except Exception as e:
+                self.errors[name] = (version, str(e))
+            finally:
+                with self._lock:
+                    self._pending.discard(name)
+
+    def _build(self, name, path, bounds, version, entry):
+        image = read_png(path)
+        height, width = image.shape[:2]
+        min_zoom, max_zoom = zoom_range(width, height, bounds)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        # Staged and renamed into place; superseded versions of the image are removed afterwards
+        staging = Path(tempfile.mkdtemp(dir=entry.parent, prefix='.staging-'))
+        try:
+            tiles = build_pyramid(image, bounds, staging, min_zoom, max_zoom)
+            manifest = {
+                'version': version,
+                'name': name,
+                'bounds': bounds,
+                'image': {'width': width, 'height': height},
+                'min_zoom': min_zoom,
+                'max_zoom': max_zoom,
+                'tiles': tiles
+            }
+            (staging / 'manifest.json').write_text(json.dumps(manifest))
+            try:
+                os.replace(staging, entry)
+            except OSError:
+                pass   # another process stored it first
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        for stale in entry.parent.iterdir():
+            if stale.name != version and not stale.name.startswith('.'):
+                shutil.rmtree(stale, ignore_errors=True)
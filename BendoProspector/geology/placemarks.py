@@ -0,0 +1,274 @@
+# geology/placemarks.py
+"""
+KML/KMZ placemark store
+Streams Placemarks out of KML files (or the .kml inside a KMZ) with
+iterparse, dropping each element once read so memory follows the
+coordinates rather than the document tree. Points, LineStrings and Polygon
+rings (MultiGeometry included) are packed into one coordinate array with
+part and placemark offsets, and a GridIndex over the placemarks' bounding
+boxes answers bbox queries.
+"""
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+from .spatial import GridIndex
+
+# Part kinds: polygons are stored as rings, each outer ring starting a new polygon
+POINT, LINE, OUTER_RING, INNER_RING = range(4)
+
+# Whitespace around a comma belongs to the tuple, not between tuples
+_COMMA = re.compile(r'\s*,\s*')
+_local_names = {}
+
+def _local_name(tag):
+    """Tag without its namespace, memoized: a KML stream repeats a few dozen tags"""
+    name = _local_names.get(tag)
+    if name is None:
+        name = _local_names[tag] = tag.rsplit('}', 1)[-1]
+    return name
+
+def _open_kml(path):
+    """Binary stream of a .kml file, or of the main document inside a .kmz"""
+    if str(path).lower().endswith('.kmz'):
+        archive = zipfile.ZipFile(path)
+        names = [name for name in archive.namelist() if name.lower().endswith('.kml')]
+        if not names:
+            raise ValueError(f'{path} holds no .kml document')
+        # doc.kml by convention, otherwise the first document in the archive
+        return archive.open('doc.kml' if 'doc.kml' in names else names[0])
+    return open(path, 'rb')
+
+def _parse_coordinates(text):
+    """(k, 3) lng/lat/altitude from a KML coordinates string; altitude 0 where omitted
+
+    Tuples are separated by whitespace that does not touch a comma, so
+    hand-edited '144.1, -36.7' tuples hold together. Raises ValueError for
+    tuples that are not 2 or 3 numbers.
+    """
+    tuples = _COMMA.sub(',', text).split()
+    if not tuples:
+        return np.empty((0, 3))
+    width = tuples[0].count(',') + 1
+    if width in (2, 3) and all(t.count(',') == width - 1 for t in tuples):
+        # Every tuple the same width (the usual case): parse them all in one call
+        values = np.fromstring(' '.join(tuples).replace(',', ' '), sep=' ')
+        if values.size != len(tuples) * width:
+            raise ValueError('malformed KML coordinates')
+        values = values.reshape(-1, width)
+    else:
+        rows = [t.split(',') for t in tuples]
+        if any(len(row) not in (2, 3) for row in rows):
+            raise ValueError('KML coordinates must be lng,lat or lng,lat,altitude tuples')
+        values = np.array([[float(v) for v in row] + [0.0] * (3 - len(row)) for row in rows])
+    if values.shape[1] == 2:
+        values = np.column_stack([values, np.zeros(len(values))])
+    return values
+
+def _geometry_parts(node, parts):
+    """Append (part kind, coordinates) for a geometry element, descending into MultiGeometry"""
+    tag = _local_name(node.tag)
+    if tag in ('Point', 'LineString'):
+        for child in node:
+            if _local_name(child.tag) == 'coordinates':
+                coordinates = _parse_coordinates(child.text or '')
+                if len(coordinates):
+                    parts.append((POINT if tag == 'Point' else LINE, coordinates))
+    elif tag == 'Polygon':
+        for boundary in node:
+            kind = {'outerBoundaryIs': OUTER_RING, 'innerBoundaryIs': INNER_RING}.get(_local_name(boundary.tag))
+            for ring in boundary if kind is not None else ():
+                for child in ring:
+                    if _local_name(child.tag) == 'coordinates':
+                        coordinates = _parse_coordinates(child.text or '')
+                        if len(coordinates):
+                            parts.append((kind, coordinates))
+    elif tag == 'MultiGeometry':
+        for child in node:
+            _geometry_parts(child, parts)
+
+def _read_placemark(element, folder):
+    fields = {'name': '', 'description': '', 'styleUrl': ''}
+    parts = []
+    for child in element:
+        tag = _local_name(child.tag)
+        if tag in fields:
+            fields[tag] = (child.text or '').strip()
+        else:
+            _geometry_parts(child, parts)
+    return fields['name'], fields['description'], folder, fields['styleUrl'], parts
+
+def iter_placemarks(path):
+    """Yield (name, description, folder, style_url, [(part kind, (k, 3) coordinates)]) per Placemark
+
+    folder is the name of the innermost enclosing Folder, '' at the top level.
+    Each Placemark is read from its finished element, which is then cleared
+    and detached, so only the open Document/Folder elements stay in memory.
+    Placemarks whose coordinates cannot be read yield None.
+    """
+    with _open_kml(path) as stream:
+        containers = []      # open Document/Folder elements, to detach finished placemarks from
+        folders = []
+        in_placemark = False
+        for event, element in ET.iterparse(stream, events=('start', 'end')):
+            tag = _local_name(element.tag)
+            if event == 'start':
+                if tag == 'Placemark':
+                    in_placemark = True
+                elif tag in ('Folder', 'Document'):
+                    containers.append(element)
+                    if tag == 'Folder':
+                        folders.append('')
+            elif tag == 'Placemark':
+                in_placemark = False
+                try:
+                    placemark = _read_placemark(element, folders[-1] if folders else '')
+                except ValueError:
+                    placemark = None
+                yield placemark
+                element.clear()
+                if containers:
+                    containers[-1].remove(element)
+            elif in_placemark:
+                continue
+            elif tag == 'name' and folders and _local_name(containers[-1].tag) == 'Folder' and not folders[-1]:
+                folders[-1] = (element.text or '').strip()
+            elif tag in ('Folder', 'Document'):
+                containers.pop()
+                if tag == 'Folder':
+                    folders.pop()
+                element.clear()
+
+class PlacemarkStore:
+    """Placemark columns over packed geometry
+
+    Placemark p owns parts part_offsets[p]:part_offsets[p + 1]; part q owns
+    coordinates coordinate_offsets[q]:coordinate_offsets[q + 1], as
+    (lng, lat, altitude) rows. Placemarks without geometry are left out;
+    skipped counts those whose coordinates could not be read.
+    """
+
+    def __init__(self, names, descriptions, folders, styles, part_offsets, part_kinds,
+                 coordinate_offsets, coordinates, skipped=0):
+        self.names = names
+        self.descriptions = descriptions
+        self.folders = folders
+        self.styles = styles
+        self.part_offsets = part_offsets
+        self.part_kinds = part_kinds
+        self.coordinate_offsets = coordinate_offsets
+        self.coordinates = coordinates
+        self.skipped = skipped
+
+        # Per-placemark lng/lat bounds over each one's contiguous coordinate run
+        starts = coordinate_offsets[part_offsets[:-1]]
+        if len(starts):
+            self.box_min = np.minimum.reduceat(coordinates[:, :2], starts)
+            self.box_max = np.maximum.reduceat(coordinates[:, :2], starts)
+        else:
+            self.box_min = self.box_max = np.empty((0, 2))
+        self.index = GridIndex.build(self.box_min, self.box_max)
+
+    def __len__(self):
+        return len(self.names)
+
+    @classmethod
+    def from_kml(cls, paths):
+        """Stream every placemark of the given KML/KMZ files into one store"""
+        names, descriptions, folders, styles = [], [], [], []
+        part_counts, part_kinds, coordinate_counts, coordinates = [], [], [], []
+        skipped = 0
+        for path in paths:
+            for placemark in iter_placemarks(path):
+                if placemark is None:
+                    skipped += 1
+                    continue
+                name, description, folder, style, parts = placemark
+                if not parts:
+                    continue
+                names.append(name)
+                descriptions.append(description)
+                folders.append(folder)
+                styles.append(style)
+                part_counts.append(len(parts))
+                for kind, points in parts:
+                    part_kinds.append(kind)
+                    coordinate_counts.append(len(points))
+                    coordinates.append(points)
+        return cls(names, descriptions, folders, styles,
+                   np.concatenate([[0], np.cumsum(part_counts, dtype=np.int64)]),
+                   np.array(part_kinds, dtype=np.uint8),
+                   np.concatenate([[0], np.cumsum(coordinate_counts, dtype=np.int64)]),
+                   np.concatenate(coordinates) if coordinates else np.empty((0, 3)), skipped)
+
+    def query(self, bbox=None):
+        """Ids of placemarks whose bounds overlap bbox=(west, south, east, north), all when None"""
+        if bbox is None:
+            return np.arange(len(self))
+        west, south, east, north = bbox
+        return self.index.query((west, south), (east, north))
+
+    def geometry(self, placemark, decimals=7):
+        """GeoJSON geometry of one placemark: single parts stay simple, several become Multi*"""
+        parts = range(self.part_offsets[placemark], self.part_offsets[placemark + 1])
+        kinds = self.part_kinds[parts.start:parts.stop].tolist()
+        rings = [np.round(self.coordinates[self.coordinate_offsets[q]:self.coordinate_offsets[q + 1]],
+                          decimals).tolist() for q in parts]
+        if all(kind == POINT for kind in kinds):
+            points = [ring[0] for ring in rings]
+            return {'type': 'Point', 'coordinates': points[0]} if len(points) == 1 else \
+                {'type': 'MultiPoint', 'coordinates': points}
+        if all(kind == LINE for kind in kinds):
+            return {'type': 'LineString', 'coordinates': rings[0]} if len(rings) == 1 else \
+                {'type': 'MultiLineString', 'coordinates': rings}
+        if all(kind in (OUTER_RING, INNER_RING) for kind in kinds):
+            polygons = []
+            for kind, ring in zip(kinds, rings):
+                if kind == OUTER_RING or not polygons:
+                    polygons.append([])
+                polygons[-1].append(ring)
+            return {'type': 'Polygon', 'coordinates': polygons[0]} if len(polygons) == 1 else \
+                {'type': 'MultiPolygon', 'coordinates': polygons}
+        # Mixed MultiGeometry
+        collection = []
+        for kind, ring in zip(kinds, rings):
+            if kind == POINT:
+                collection.append({'type': 'Point', 'coordinates': ring[0]})
+            elif kind == LINE:
+                collection.append({'type': 'LineString', 'coordinates': ring})
+            else:
+                collection.append({'type': 'Polygon', 'coordinates': [ring]})
+        return {'type': 'GeometryCollection', 'geometries': collection}
+
+    def features(self, placemarks):
+        """GeoJSON Features for placemark ids"""
+        return [{
+            'type': 'Feature',
+            'geometry': self.geometry(p),
+            'properties': {
+                'name': self.names[p],
+                'description': self.descriptions[p],
+                'folder': self.folders[p],
+                'style': self.styles[p]
+            }
+        } for p in np.asarray(placemarks).tolist()]
+
+_loaded = {}
+
+def load_placemarks(paths):
+    """Store for a set of KML/KMZ files, rebuilt only when one of them changes"""
+    stats = []
+    for path in paths:
+        try:
+            stat = path.stat()
+            stats.append((str(path), stat.st_size, stat.st_mtime_ns))
+        except OSError:
+            continue
+    key = tuple(stats)
+    if key not in _loaded:
+        store = PlacemarkStore.from_kml([path for path, size, _ in stats if size])
+        _loaded.clear()
+        _loaded[key] = store
+    return _loaded[key]
@@ -0,0 +1,180 @@
+# geology/png.py
+"""
+PNG codec
+Reads non-interlaced PNGs (any colour type, 1-16 bit) into RGBA arrays and
+writes RGBA arrays as adaptively filtered PNG, with NumPy and zlib only.
+Rows filtered with Sub or Up are undone a whole row at a time; Average and
+Paeth need each pixel's reconstructed left neighbour, so images using them
+are unfiltered along anti-diagonals, every row at once, in width + height
+vector steps. Pillow is used to read when it is installed.
+"""
+import struct
+import zlib
+
+import numpy as np
+
+try:
+    from PIL import Image
+except ImportError:  # optional: fall back to the NumPy decoder below
+    Image = None
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+PNG_MIME_TYPE = 'image/png'
+# Channels per colour type: grey, RGB, palette index, grey + alpha, RGBA
+COLOUR_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+class PNGError(ValueError):
+    """A PNG this decoder cannot read"""
+
+def _chunks(data):
+    if data[:8] != PNG_SIGNATURE:
+        raise PNGError('not a PNG file')
+    position = 8
+    while position + 8 <= len(data):
+        length, kind = struct.unpack('>I4s', data[position:position + 8])
+        yield kind, data[position + 8:position + 8 + length]
+        position += 12 + length
+        if kind == b'IEND':
+            break
+
+def png_size(path):
+    """(width, height) from a PNG's header, without decoding it"""
+    with open(path, 'rb') as f:
+        header = f.read(24)
+    if header[:8] != PNG_SIGNATURE or header[12:16] != b'IHDR':
+        raise PNGError(f'{path} is not a PNG file')
+    return struct.unpack('>II', header[16:24])
+
+def _paeth(a, b, c):
+    pa, pb, pc = np.abs(b - c), np.abs(a - c), np.abs(a + b - 2 * c)
+    return np.where((pa <= pb) & (pa <= pc), a, np.where(pb <= pc, b, c))
+
+def _unfilter(rows, bpp):
+    """Reconstructed scanline bytes from (height, 1 + row bytes) filtered rows"""
+    filters = rows[:, 0]
+    raw = rows[:, 1:]
+    if filters.size and filters.max() > 4:
+        raise PNGError(f'unknown scanline filter {filters.max()}')
+    height, row_bytes = raw.shape
+    if not np.isin(filters, (3, 4)).any():
+        out = np.empty_like(raw)
+        previous = np.zeros(row_bytes, dtype=np.uint8)
+        for row, kind in enumerate(filters.tolist()):
+            line = raw[row]
+            if kind == 1:
+                line = line.reshape(-1, bpp).cumsum(axis=0, dtype=np.uint8).ravel()
+            elif kind == 2:
+                line = line + previous
+            out[row] = previous = line
+        return out
+
+    # Wavefront over pixels (row, column) with row + column = step: each step only needs the last two
+    width = row_bytes // bpp
+    raw = raw.reshape(height, width, bpp).astype(np.int32)
+    padded = np.zeros((height + 1, width + 1, bpp), dtype=np.int32)
+    kinds = filters.astype(np.int32)[:, None]
+    for step in range(height + width - 1):
+        rows_at = np.arange(max(0, step - width + 1), min(height, step + 1))
+        cols_at = step - rows_at
+        left = padded[rows_at + 1, cols_at]
+        up = padded[rows_at, cols_at + 1]
+        up_left = padded[rows_at, cols_at]
+        kind = kinds[rows_at]
+        prediction = np.select([kind == 1, kind == 2, kind == 3, kind == 4],
+                               [left, up, (left + up) >> 1, _paeth(left, up, up_left)], 0)
+        padded[rows_at + 1, cols_at + 1] = (raw[rows_at, cols_at] + prediction) & 0xFF
+    return padded[1:, 1:].reshape(height, row_bytes).astype(np.uint8)
+
+def _decode(data):
+    header, palette, transparency, compressed = None, None, None, []
+    for kind, body in _chunks(data):
+        if kind == b'IHDR':
+            header = struct.unpack('>IIBBBBB', body)
+        elif kind == b'PLTE':
+            palette = np.frombuffer(body, dtype=np.uint8).reshape(-1, 3)
+        elif kind == b'tRNS':
+            transparency = body
+        elif kind == b'IDAT':
+            compressed.append(body)
+    if header is None:
+        raise PNGError('missing IHDR')
+    width, height, depth, colour, _, _, interlace = header
+    if colour not in COLOUR_CHANNELS or depth not in (1, 2, 4, 8, 16):
+        raise PNGError(f'unsupported colour type {colour} at bit depth {depth}')
+    if interlace:
+        raise PNGError('interlaced PNGs need Pillow')
+    channels = COLOUR_CHANNELS[colour]
+    bits = channels * depth
+    row_bytes = (width * bits + 7) // 8
+    rows = np.frombuffer(zlib.decompress(b''.join(compressed)), dtype=np.uint8)
+    lines = _unfilter(rows[:height * (row_bytes + 1)].reshape(height, row_bytes + 1), max(1, bits // 8))
+
+    if depth < 8:
+        # Sub-byte samples: unpack each row's bits and regroup them depth at a time
+        weights = 1 << np.arange(depth - 1, -1, -1)
+        samples = np.unpackbits(lines, axis=1).reshape(height, -1, depth) @ weights
+        samples = samples[:, :width * channels].astype(np.uint8)
+        if colour == 0:
+            samples = (samples.astype(np.uint16) * 255 // (2 ** depth - 1)).astype(np.uint8)
+    elif depth == 16:
+        samples = lines[:, ::2]
+    else:
+        samples = lines
+    pixels = samples.reshape(height, width, channels)
+
+    if colour == 3:
+        if palette is None:
+            raise PNGError('palette image without PLTE')
+        alpha = np.full(len(palette), 255, dtype=np.uint8)
+        if transparency is not None:
+            alpha[:len(transparency)] = np.frombuffer(transparency, dtype=np.uint8)[:len(palette)]
+        return np.concatenate([palette, alpha[:, None]], axis=1)[pixels[..., 0]]
+    rgb = np.repeat(pixels[..., :1], 3, axis=2) if colour in (0, 4) else pixels[..., :3]
+    if colour in (4, 6):
+        alpha = pixels[..., -1:]
+    else:
+        alpha = np.full((height, width, 1), 255, dtype=np.uint8)
+        if transparency is not None and depth == 8:
+            key = np.frombuffer(transparency, dtype='>u2').astype(np.uint8)
+            alpha[np.all(pixels == key[:channels], axis=2)] = 0
+    return np.concatenate([rgb, alpha], axis=2)
+
+def read_png(path):
+    """(height, width, 4) uint8 RGBA pixels of a PNG, first row at the top"""
+    if Image is not None:
+        with Image.open(path) as image:
+            return np.asarray(image.convert('RGBA'))
+    with open(path, 'rb') as f:
+        return _decode(f.read())
+
+def _chunk(kind, body):
+    return struct.pack('>I', len(body)) + kind + body + struct.pack('>I', zlib.crc32(kind + body))
+
+def encode_png(pixels, level=6):
+    """PNG bytes of (height, width, 4) uint8 RGBA pixels
+
+    Encoding predicts from the original pixels, so all five filters are
+    applied to the whole image at once; each row keeps the one with the
+    smallest sum of absolute (signed) residuals, as libpng chooses.
+    """
+    pixels = np.ascontiguousarray(pixels, dtype=np.uint8)
+    height, width, channels = pixels.shape
+    if channels != 4:
+        raise PNGError('encode_png expects RGBA pixels')
+    lines = pixels.reshape(height, width * 4).astype(np.int16)
+    left = np.zeros_like(lines)
+    left[:, 4:] = lines[:, :-4]
+    up = np.zeros_like(lines)
+    up[1:] = lines[:-1]
+    up_left = np.zeros_like(lines)
+    up_left[1:, 4:] = lines[:-1, :-4]
+    candidates = np.stack([lines, lines - left, lines - up, lines - ((left + up) >> 1),
+                           lines - _paeth(left, up, up_left)]).astype(np.uint8)
+    kinds = np.abs(candidates.view(np.int8).astype(np.int32)).sum(axis=2).argmin(axis=0)
+    filtered = np.empty((height, width * 4 + 1), dtype=np.uint8)
+    filtered[:, 0] = kinds
+    filtered[:, 1:] = candidates[kinds, np.arange(height)]
+    return (PNG_SIGNATURE
+            + _chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0))
+            + _chunk(b'IDAT', zlib.compress(filtered.tobytes(), level))
+            + _chunk(b'IEND', b''))
@@ -0,0 +1,128 @@
+# geology/section.py
+"""
+Vertical cross sections
+Cuts the parsed DXF model and the terrain surface with the vertical plane
+through a section line. The face BVH narrows the model to faces whose bounds
+cross the plane, those are intersected as whole arrays, and the resulting
+segments are stitched into per-layer polylines in section coordinates
+(distance along the line, elevation).
+"""
+import numpy as np
+
+from terrain.generator import elevation_at_mga
+from terrain.polylines import stitch_segments
+
+PROFILE_SPACING = 10.0  # metres between terrain profile samples
+MAX_PROFILE_SAMPLES = 2048
+# Section points are rounded to this many decimals (centimetres) before stitching and output
+SECTION_DECIMALS = 2
+
+def _crossing_points(a, b, distance_a, distance_b):
+    """Points where edges a->b, with endpoints on opposite sides, meet the plane"""
+    return a + (b - a) * (distance_a / (distance_a - distance_b))[:, None]
+
+def _triangle_segments(corners, distances):
+    """(k, 2, 3) segments where triangles (k, 3, 3) cross the plane, from per-corner signed distances"""
+    # Corners on the plane count as the positive side, so a triangle touching it
+    # at a single corner is skipped instead of producing a zero-length segment
+    side = distances >= 0
+    s0, s1, s2 = side[:, 0], side[:, 1], side[:, 2]
+    crossing = (s0 != s1) | (s1 != s2)
+    corners, distances = corners[crossing], distances[crossing]
+    s0, s1, s2 = s0[crossing], s1[crossing], s2[crossing]
+
+    # The corner alone on its side of the plane; both crossing edges start from it
+    lone = np.where(s0 == s1, 2, np.where(s0 == s2, 1, 0))
+    rows = np.arange(len(corners))
+    a, b, c = ((lone + k) % 3 for k in range(3))
+    return np.stack([
+        _crossing_points(corners[rows, a], corners[rows, b], distances[rows, a], distances[rows, b]),
+        _crossing_points(corners[rows, a], corners[rows, c], distances[rows, a], distances[rows, c])
+    ], axis=1)
+
+def _line_points(ends, distances):
+    """(k, 3) points where line segments (m, 2, 3) cross the plane"""
+    crossing = (distances[:, 0] >= 0) != (distances[:, 1] >= 0)
+    ends, distances = ends[crossing], distances[crossing]
+    return _crossing_points(ends[:, 0], ends[:, 1], distances[:, 0], distances[:, 1])
+
+def _clip_segments(segments, length):
+    """Clip (k, 2, 2) section segments to 0 <= u <= length, dropping those wholly outside"""
+    u = segments[:, :, 0]
+    segments = segments[(u.max(axis=1) >= 0) & (u.min(axis=1) <= length)]
+    u0, du = segments[:, 0, 0], segments[:, 1, 0] - segments[:, 0, 0]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_start, t_end = -u0 / du, (length - u0) / du
+    # Segments running straight down the section (du == 0) are already inside
+    flat = du == 0
+    lo = np.where(flat, 0.0, np.clip(np.minimum(t_start, t_end), 0.0, 1.0))
+    hi = np.where(flat, 1.0, np.clip(np.maximum(t_start, t_end), 0.0, 1.0))
+    step = segments[:, 1] - segments[:, 0]
+    return np.stack([segments[:, 0] + step * lo[:, None], segments[:, 0] + step * hi[:, None]], axis=1)
+
+def section_line(start, end):
+    """Unit direction, plane normal and length of a section line between (easting, northing) points"""
+    start = np.asarray(start, dtype=np.float64)
+    delta = np.asarray(end, dtype=np.float64) - start
+    length = float(np.hypot(*delta))
+    if not length:
+        raise ValueError('section line has zero length')
+    direction = delta / length
+    return direction, np.array([-direction[1], direction[0]]), length
+
+def model_section(model, start, end, layers=None):
+    """Cut a DXFModel with the vertical plane through start -> end (absolute MGA metres)
+
+    Returns {layer name: {'polylines': [[[u, z], ...], ...], 'points': [[u, z], ...]}}
+    for layers the plane crosses, where u is the distance along the section line.
+    """
+    direction, normal, length = section_line(start, end)
+    origin = model.origin
+    local_start = np.asarray(start, dtype=np.float64) - origin[:2]
+    local_end = local_start + direction * length
+    offset = float(local_start @ normal)
+    # float32 is ample here: positions are origin-relative, so within a few km
+    plane_normal = np.append(normal, 0.0).astype(np.float32)
+    low = np.append(np.minimum(local_start, local_end), -np.inf)
+    high = np.append(np.maximum(local_start, local_end), np.inf)
+
+    def to_section(points):
+        u = (points[..., :2] - local_start) @ direction
+        return np.stack([u, points[..., 2] + origin[2]], axis=-1)
+
+    faces = model.query_plane(plane_normal, offset, low, high, layers)
+    layer_faces = model.group_by_layer(faces)
+    # Lines are not in the BVH; any layer whose bounds reach the footprint may hold crossing ones
+    names = [name for name in model.layer_index.intersecting(low, high)
+             if name in layer_faces or (model.layer_index.record(name)['line_count']
+                                        and (layers is None or name in layers))]
+
+    sections = {}
+    for name in names:
+        geometry = model.layer_geometry(name)
+        segments = np.empty((0, 2, 2))
+        if name in layer_faces:
+            corners = geometry.positions[geometry.triangles[layer_faces[name]]]
+            distances = corners[..., :2] @ plane_normal[:2] - np.float32(offset)
+            segments = _clip_segments(to_section(_triangle_segments(corners, distances)), length)
+
+        ends = geometry.positions[geometry.lines]
+        distances = ends[..., :2] @ plane_normal[:2] - np.float32(offset)
+        points = to_section(_line_points(ends, distances))
+        points = points[(points[:, 0] >= 0) & (points[:, 0] <= length)]
+
+        if not len(segments) and not len(points):
+            continue
+        sections[name] = {
+            'polylines': [line.tolist() for line in stitch_segments(np.round(segments, SECTION_DECIMALS))],
+            'points': np.round(points, SECTION_DECIMALS).tolist()
+        }
+    return sections
+
+def terrain_profile(start, end, spacing=PROFILE_SPACING):
+    """Terrain surface along the section line as (distances, elevations) arrays"""
+    direction, _, length = section_line(start, end)
+    samples = int(min(MAX_PROFILE_SAMPLES, max(2, np.ceil(length / spacing) + 1)))
+    distances = np.linspace(0.0, length, samples)
+    points = np.asarray(start, dtype=np.float64) + distances[:, None] * direction
+    return distances, elevation_at_mga(points[:, 0], points[:, 1])
@@ -0,0 +1,219 @@
+# geology/shapefile.py
+"""
+ESRI Shapefile reader
+Memory-maps a shapefile's .shp, .shx and .dbf and reads them with NumPy
+alone. The .shx gives every record's byte offset, so record bounds are
+gathered from the .shp record headers in one fancy-indexing pass and a
+record's geometry is read from its own bytes only. .dbf attributes are
+decoded a column at a time from a structured view over the fixed-width
+rows. Zipped shapefiles are unpacked once into the cache so they can be
+mapped.
+"""
+import codecs
+import os
+import shutil
+import tempfile
+import zipfile
+from pathlib import Path
+
+import numpy as np
+
+from .dxf_cache import CACHE_ROOT
+from .spatial import GridIndex
+
+SHAPEFILE_DIR = CACHE_ROOT / 'shapefiles'
+SHAPEFILE_SUFFIXES = ('.shp', '.shx', '.dbf', '.prj', '.cpg')
+SHAPEFILE_HEADER_SIZE = 100
+# Shape types, plain then Z then M: points, and polylines/polygons made of parts
+POINT_TYPES = (1, 11, 21)
+PART_TYPES = (3, 5, 13, 15, 23, 25)
+DBF_TERMINATOR = 0x0D
+
+class ShapefileError(ValueError):
+    """A shapefile that is missing a component or is not laid out as the spec says"""
+
+def _map(path):
+    """Read-only uint8 view of a file's pages; empty for an empty file"""
+    if not os.path.getsize(path):
+        return np.empty(0, dtype=np.uint8)
+    return np.asarray(np.memmap(path, dtype=np.uint8, mode='r'))
+
+def _gather(raw, offsets, size, dtype):
+    """size bytes at each byte offset, as one row of dtype per offset"""
+    return raw[np.asarray(offsets, dtype=np.int64)[:, None] + np.arange(size)].view(dtype)
+
+class DBFTable:
+    """Fixed-width dBASE rows viewed as a structured array, one bytes field per column"""
+
+    def __init__(self, path, encoding='latin-1'):
+        raw = _map(path)
+        if len(raw) < 32:
+            raise ShapefileError(f'{path} is not a dBASE table')
+        count = int(raw[4:8].view('<u4')[0])
+        header_size, record_size = (int(v) for v in raw[8:12].view('<u2'))
+
+        names, formats, offsets = ['_deleted'], ['S1'], [0]
+        self.types = {}
+        position = 1
+        for descriptor in range(32, header_size - 1, 32):
+            if raw[descriptor] == DBF_TERMINATOR:
+                break
+            name = bytes(raw[descriptor:descriptor + 11]).split(b'\0', 1)[0].decode('ascii', 'replace')
+            width = int(raw[descriptor + 16])
+            names.append(name)
+            formats.append(f'S{width}')
+            offsets.append(position)
+            self.types[name] = chr(raw[descriptor + 11])
+            position += width
+        if position != record_size:
+            raise ShapefileError(f'{path}: field widths add up to {position}, not the record size {record_size}')
+
+        dtype = np.dtype({'names': names, 'formats': formats, 'offsets': offsets, 'itemsize': record_size})
+        self.records = np.frombuffer(raw, dtype=dtype, count=count, offset=header_size)
+        self.encoding = encoding
+
+    @property
+    def fields(self):
+        return list(self.types)
+
+    def __len__(self):
+        return len(self.records)
+
+    def column(self, name, rows=None):
+        """Decoded values of one field: floats (NaN when blank) for N/F, bools for L, strings otherwise"""
+        if name not in self.types:
+            raise KeyError(name)
+        raw = self.records[name] if rows is None else self.records[name][rows]
+        kind = self.types[name]
+        if kind in 'NF':
+            stripped = np.char.strip(raw)
+            try:
+                return np.where(stripped == b'', b'nan', stripped).astype(np.float64)
+            except ValueError:
+                # Overflow markers ('*****') and other junk: fall back value by value
+                return np.array([_float(value) for value in stripped.tolist()])
+        if kind == 'L':
+            return np.isin(np.char.upper(np.char.strip(raw)), [b'T', b'Y'])
+        return [value.decode(self.encoding, 'replace').strip() for value in raw.tolist()]
+
+def _float(text):
+    try:
+        return float(text)
+    except ValueError:
+        return np.nan
+
+class Shapefile:
+    """Record bounds, geometry and attributes of a shapefile, opened by its .shp path
+
+    Only 2D geometry is read: Z and M values of the Z/M shape types are
+    ignored. Null records are never returned by query().
+    """
+
+    def __init__(self, path):
+        path = Path(path)
+        self.path = path
+        self.shp = _map(path)
+        shx = _map(path.with_suffix('.shx'))
+        if len(self.shp) < SHAPEFILE_HEADER_SIZE or len(shx) < SHAPEFILE_HEADER_SIZE:
+            raise ShapefileError(f'{path} is not a shapefile')
+        self.shape_type = int(self.shp[32:36].view('<i4')[0])
+        self.bounds = self.shp[36:68].view('<f8').reshape(2, 2)
+
+        # .shx rows are big-endian (offset, content length) in 16-bit words; geometry follows the 8-byte record header
+        index = shx[SHAPEFILE_HEADER_SIZE:].view('>i4').reshape(-1, 2)
+        self.offsets = index[:, 0].astype(np.int64) * 2 + 8
+        types = _gather(self.shp, self.offsets, 4, '<i4')[:, 0]
+        self.box_min = np.zeros((len(types), 2))
+        self.box_max = np.zeros((len(types), 2))
+        points = np.isin(types, POINT_TYPES)
+        parts = np.isin(types, PART_TYPES)
+        self.box_min[points] = self.box_max[points] = _gather(self.shp, self.offsets[points] + 4, 16, '<f8')
+        boxes = _gather(self.shp, self.offsets[parts] + 4, 32, '<f8')
+        self.box_min[parts], self.box_max[parts] = boxes[:, :2], boxes[:, 2:]
+        self.types = types
+
+        self.records = np.flatnonzero(points | parts)
+        self.index = GridIndex.build(self.box_min[self.records], self.box_max[self.records])
+
+        cpg = path.with_suffix('.cpg')
+        encoding = cpg.read_text().strip() if cpg.exists() else 'latin-1'
+        try:
+            codecs.lookup(encoding)
+        except LookupError:
+            encoding = 'latin-1'
+        self.table = DBFTable(path.with_suffix('.dbf'), encoding)
+        if len(self.table) != len(types):
+            raise ShapefileError(f'{path}: {len(types)} shapes but {len(self.table)} attribute rows')
+        prj = path.with_suffix('.prj')
+        self.projection = prj.read_text().strip() if prj.exists() else None
+
+    def __len__(self):
+        return len(self.types)
+
+    def query(self, low=None, high=None):
+        """Ids of non-null records whose bounds overlap the box [low, high], all of them when no box is given"""
+        if low is None:
+            return self.records
+        return self.records[self.index.query(low, high)]
+
+    def parts(self, record):
+        """A record's geometry as a list of (k, 2) arrays: one per part, or a single point"""
+        start = self.offsets[record]
+        kind = self.types[record]
+        if kind in POINT_TYPES:
+            return [self.shp[start + 4:start + 20].view('<f8').reshape(1, 2)]
+        if kind not in PART_TYPES:
+            return []
+        part_count, point_count = (int(v) for v in self.shp[start + 36:start + 44].view('<i4'))
+        points_start = start + 44 + 4 * part_count
+        firsts = self.shp[start + 44:points_start].view('<i4')
+        points = self.shp[points_start:points_start + 16 * point_count].view('<f8').reshape(-1, 2)
+        return np.split(points, firsts[1:])
+
+    def attributes(self, records, fields=None):
+        """One dict of attribute values per record id, over all fields unless given"""
+        fields = self.table.fields if fields is None else fields
+        columns = []
+        for name in fields:
+            values = self.table.column(name, records)
+            if isinstance(values, np.ndarray):
+                values = [None if v != v else v for v in values.tolist()]
+            columns.append(values)
+        return [dict(zip(fields, row)) for row in zip(*columns)]
+
+def extract_shapefile(archive, cache_dir=SHAPEFILE_DIR):
+    """.shp path of the first shapefile in a zip archive, unpacked into the cache once per archive version"""
+    archive = Path(archive)
+    stat = archive.stat()
+    entry = Path(cache_dir) / f'{archive.stem}-{stat.st_size}-{stat.st_mtime_ns}'
+    if not entry.exists():
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(dir=entry.parent, prefix='.staging-'))
+        try:
+            with zipfile.ZipFile(archive) as bundle:
+                for name in bundle.namelist():
+                    if Path(name).suffix.lower() in SHAPEFILE_SUFFIXES:
+                        with bundle.open(name) as source, open(staging / Path(name).name, 'wb') as target:
+                            shutil.copyfileobj(source, target)
+            os.replace(staging, entry)
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+            if not entry.exists():
+                raise
+    shapes = sorted(entry.glob('*.shp'))
+    if not shapes:
+        raise ShapefileError(f'{archive} holds no shapefile')
+    return shapes[0]
+
+_loaded = {}
+
+def load_shapefile(path):
+    """Shapefile for a .shp path or a zip holding one, reopened only when the file changes"""
+    path = Path(path)
+    stat = path.stat()
+    key = (str(path), stat.st_size, stat.st_mtime_ns)
+    if key not in _loaded:
+        shapes = Shapefile(extract_shapefile(path) if path.suffix.lower() == '.zip' else path)
+        _loaded.clear()
+        _loaded[key] = shapes
+    return _loaded[key]
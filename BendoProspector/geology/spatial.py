@@ -0,0 +1,255 @@
+# geology/spatial.py
+"""
+Spatial indexes
+Linear BVH over DXF faces: faces are sorted along a Morton curve, grouped
+into fixed-size leaves and bounded by an implicit binary tree, so both the
+build and the level-by-level query traversal are whole-array NumPy
+operations. A uniform 2D grid indexes map items (placemarks, fault traces)
+by their bounding boxes.
+"""
+import numpy as np
+
+BVH_LEAF_SIZE = 8
+# Queries test this whole level at once instead of descending to it node by node
+BVH_START_LEVEL = 8
+MORTON_BITS = 10  # per axis, 30-bit codes
+
+def _spread_bits(values):
+    """Insert two zero bits between each of the low 10 bits (x -> x..x..x)"""
+    values = values.astype(np.uint32) & 0x3FF
+    values = (values | (values << 16)) & 0x030000FF
+    values = (values | (values << 8)) & 0x0300F00F
+    values = (values | (values << 4)) & 0x030C30C3
+    values = (values | (values << 2)) & 0x09249249
+    return values
+
+def morton_codes(points):
+    """30-bit Morton codes of points quantized to their own bounding box"""
+    low = points.min(axis=0)
+    span = np.maximum(points.max(axis=0) - low, np.finfo(np.float32).tiny)
+    cells = ((points - low) / span * (2 ** MORTON_BITS - 1)).astype(np.uint32)
+    return (_spread_bits(cells[:, 0]) << 2) | (_spread_bits(cells[:, 1]) << 1) | _spread_bits(cells[:, 2])
+
+def boxes_overlap(box_min, box_max, low, high):
+    """Mask of boxes (n, 3) overlapping [low, high]; per-axis columns beat axis=1 reductions over 3"""
+    hit = (box_min[:, 0] <= high[0]) & (box_max[:, 0] >= low[0])
+    for axis in (1, 2):
+        hit &= (box_min[:, axis] <= high[axis]) & (box_max[:, axis] >= low[axis])
+    return hit
+
+def boxes_straddle_plane(box_min, box_max, normal, offset):
+    """Mask of boxes (n, 3) reaching both sides of the plane normal . p = offset"""
+    lowest = highest = -offset
+    for axis in range(3):
+        if normal[axis]:
+            a, b = box_min[:, axis] * normal[axis], box_max[:, axis] * normal[axis]
+            lowest = lowest + np.minimum(a, b)
+            highest = highest + np.maximum(a, b)
+    return (lowest <= 0) & (highest >= 0)
+
+def triangles_overlapping_box(corners, low, high):
+    """Mask of triangles (n, 3, 3) whose bounding boxes overlap the box [low, high]"""
+    a, b, c = corners[:, 0], corners[:, 1], corners[:, 2]
+    return boxes_overlap(np.minimum(np.minimum(a, b), c), np.maximum(np.maximum(a, b), c), low, high)
+
+def ray_triangle_distances(origin, direction, corners, epsilon=1e-9):
+    """Möller-Trumbore for many triangles at once; distance along the ray or inf on a miss"""
+    corners = corners.astype(np.float64)
+    edge1 = corners[:, 1] - corners[:, 0]
+    edge2 = corners[:, 2] - corners[:, 0]
+    p = np.cross(direction, edge2)
+    determinant = np.einsum('ij,ij->i', edge1, p)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        inverse = 1.0 / determinant
+        t_vec = origin - corners[:, 0]
+        u = np.einsum('ij,ij->i', t_vec, p) * inverse
+        q = np.cross(t_vec, edge1)
+        v = (q @ direction) * inverse
+        t = np.einsum('ij,ij->i', edge2, q) * inverse
+    hit = (np.abs(determinant) > epsilon) & (u >= 0) & (v >= 0) & (u + v <= 1) & (t >= 0)
+    return np.where(hit, t, np.inf)
+
+class FaceBVH:
+    """Implicit-heap BVH: node 1 is the root, node i has children 2i and 2i+1
+
+    The last level holds leaf_count (a power of two) leaves; leaf j bounds
+    faces order[j * leaf_size:(j + 1) * leaf_size]. Unused leaves carry
+    inverted (empty) bounds so every test rejects them. Per-face bounds are
+    kept in the same sorted order, so a leaf's faces are one contiguous run.
+    """
+
+    def __init__(self, node_min, node_max, order, face_min, face_max, leaf_size=BVH_LEAF_SIZE):
+        self.node_min = node_min
+        self.node_max = node_max
+        self.order = order
+        self.face_min = face_min
+        self.face_max = face_max
+        self.leaf_size = leaf_size
+        self.leaf_count = len(node_min) // 2
+
+    @classmethod
+    def build(cls, corners, leaf_size=BVH_LEAF_SIZE):
+        """Build over triangle corners shaped (n, 3, 3)"""
+        face_count = len(corners)
+        if not face_count:
+            empty = np.full((2, 3), np.inf, dtype=np.float32)
+            no_faces = np.empty((0, 3), dtype=np.float32)
+            return cls(empty, -empty, np.empty(0, dtype=np.uint32), no_faces, no_faces, leaf_size)
+
+        face_min = corners.min(axis=1)
+        face_max = corners.max(axis=1)
+        order = np.argsort(morton_codes((face_min + face_max) / 2), kind='stable').astype(np.uint32)
+        face_min, face_max = face_min[order], face_max[order]
+
+        used_leaves = -(-face_count // leaf_size)
+        leaf_count = 1 << max(0, int(np.ceil(np.log2(used_leaves))))
+        node_min = np.full((2 * leaf_count, 3), np.inf, dtype=np.float32)
+        node_max = np.full((2 * leaf_count, 3), -np.inf, dtype=np.float32)
+        starts = np.arange(0, face_count, leaf_size)
+        node_min[leaf_count:leaf_count + used_leaves] = np.minimum.reduceat(face_min, starts)
+        node_max[leaf_count:leaf_count + used_leaves] = np.maximum.reduceat(face_max, starts)
+
+        level_start = leaf_count // 2
+        while level_start:
+            nodes = np.arange(level_start, 2 * level_start)
+            node_min[nodes] = np.minimum(node_min[2 * nodes], node_min[2 * nodes + 1])
+            node_max[nodes] = np.maximum(node_max[2 * nodes], node_max[2 * nodes + 1])
+            level_start //= 2
+        return cls(node_min, node_max, order, face_min, face_max, leaf_size)
+
+    def _descend(self, keep):
+        """Walk down one level at a time, keeping children for which keep(nodes) is true
+
+        Returns positions in the sorted face order of every face in a kept leaf.
+        """
+        start = 1 << min(BVH_START_LEVEL, self.leaf_count.bit_length() - 1)
+        frontier = np.arange(start, 2 * start)
+        frontier = frontier[keep(frontier)]
+        while frontier.size and frontier[0] < self.leaf_count:
+            children = np.concatenate([2 * frontier, 2 * frontier + 1])
+            frontier = children[keep(children)]
+        leaves = frontier - self.leaf_count
+        positions = (leaves[:, None] * self.leaf_size + np.arange(self.leaf_size)).ravel()
+        return positions[positions < len(self.order)]
+
+    def query_box(self, low, high):
+        """Ids of faces whose bounding boxes overlap [low, high]"""
+        positions = self._descend(lambda nodes: boxes_overlap(self.node_min[nodes], self.node_max[nodes], low, high))
+        return self.order[positions[boxes_overlap(self.face_min[positions], self.face_max[positions], low, high)]]
+
+    def query_plane(self, normal, offset, low, high):
+        """Ids of faces whose bounding boxes cross the plane normal . p = offset inside [low, high]"""
+        def keep(box_min, box_max):
+            return boxes_overlap(box_min, box_max, low, high) & \
+                boxes_straddle_plane(box_min, box_max, normal, offset)
+
+        positions = self._descend(lambda nodes: keep(self.node_min[nodes], self.node_max[nodes]))
+        return self.order[positions[keep(self.face_min[positions], self.face_max[positions])]]
+
+    def ray_candidates(self, origin, direction):
+        """Ids of faces whose bounding boxes the ray passes through"""
+        with np.errstate(divide='ignore'):
+            inverse = 1.0 / direction
+
+        def keep(low, high):
+            with np.errstate(invalid='ignore'):
+                near = (low - origin) * inverse
+                far = (high - origin) * inverse
+            # fmax/fmin skip the NaNs from 0 * inf on axes the ray runs parallel to
+            entry, exit = np.minimum(near, far), np.maximum(near, far)
+            t_min = np.fmax(np.fmax(entry[:, 0], entry[:, 1]), entry[:, 2])
+            t_max = np.fmin(np.fmin(exit[:, 0], exit[:, 1]), exit[:, 2])
+            return (t_max >= np.maximum(t_min, 0)) & (low[:, 0] <= high[:, 0])
+
+        positions = self._descend(lambda nodes: keep(self.node_min[nodes], self.node_max[nodes]))
+        return self.order[positions[keep(self.face_min[positions], self.face_max[positions])]]
+
+# Target items per grid cell; the grid is capped at GRID_MAX_CELLS per axis
+GRID_ITEMS_PER_CELL = 4
+GRID_MAX_CELLS = 1024
+
+class GridIndex:
+    """Uniform 2D grid over item bounding boxes, stored as CSR cell lists
+
+    Each item is listed in every cell its box covers, so a query visits only
+    the cells under the query box, gathers their runs in one pass and checks
+    the candidates' boxes exactly. Suits map data (placemarks, fault traces)
+    whose items are small next to the extent.
+    """
+
+    def __init__(self, box_min, box_max, low, high, cell_size, shape, cell_offsets, items):
+        self.box_min = box_min
+        self.box_max = box_max
+        self.low = low
+        self.high = high
+        self.cell_size = cell_size
+        self.shape = shape
+        self.cell_offsets = cell_offsets
+        self.items = items
+
+    @classmethod
+    def build(cls, box_min, box_max, cells_per_axis=None):
+        """Index (n, 2) box corners; the grid is sized for a few items per cell unless given"""
+        box_min = np.asarray(box_min, dtype=np.float64).reshape(-1, 2)
+        box_max = np.asarray(box_max, dtype=np.float64).reshape(-1, 2)
+        count = len(box_min)
+        if not cells_per_axis:
+            cells_per_axis = int(np.clip(np.sqrt(count / GRID_ITEMS_PER_CELL), 1, GRID_MAX_CELLS))
+        low = box_min.min(axis=0) if count else np.zeros(2)
+        high = box_max.max(axis=0) if count else np.ones(2)
+        cell_size = np.maximum((high - low) / cells_per_axis, np.finfo(np.float64).eps * np.abs(low).max(initial=1))
+        shape = (cells_per_axis, cells_per_axis)
+
+        first = cls._cells(box_min, low, cell_size, shape)
+        last = cls._cells(box_max, low, cell_size, shape)
+        width = last[:, 1] - first[:, 1] + 1
+        counts = (last[:, 0] - first[:, 0] + 1) * width
+        # One (cell, item) entry per covered cell, walked row by row over each item's cell rectangle
+        item = np.repeat(np.arange(count), counts)
+        within = np.arange(len(item)) - np.repeat(np.cumsum(counts) - counts, counts)
+        rows = first[item, 0] + within // width[item]
+        cols = first[item, 1] + within % width[item]
+        cell = rows * shape[1] + cols
+        order = np.argsort(cell, kind='stable')
+        cell_offsets = np.concatenate([[0], np.cumsum(np.bincount(cell, minlength=shape[0] * shape[1]))])
+        return cls(box_min, box_max, low, high, cell_size, shape, cell_offsets, item[order].astype(np.uint32))
+
+    @staticmethod
+    def _cells(points, low, cell_size, shape):
+        cells = np.floor((points - low) / cell_size).astype(np.int64)
+        return np.clip(cells, 0, np.array(shape) - 1)
+
+    def query(self, low, high):
+        """Sorted ids of items whose boxes overlap [low, high] (2-vectors)"""
+        low, high = np.asarray(low, dtype=np.float64), np.asarray(high, dtype=np.float64)
+        if not len(self.box_min) or (low > self.high).any() or (high < self.low).any():
+            return np.empty(0, dtype=np.uint32)
+        first = self._cells(low[None], self.low, self.cell_size, self.shape)[0]
+        last = self._cells(high[None], self.low, self.cell_size, self.shape)[0]
+        rows, cols = np.meshgrid(np.arange(first[0], last[0] + 1), np.arange(first[1], last[1] + 1), indexing='ij')
+        cells = (rows * self.shape[1] + cols).ravel()
+        starts, ends = self.cell_offsets[cells], self.cell_offsets[cells + 1]
+        lengths = ends - starts
+        positions = np.arange(lengths.sum()) + np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+        candidates = np.unique(self.items[positions])
+        box_min, box_max = self.box_min[candidates], self.box_max[candidates]
+        hit = ((box_min[:, 0] <= high[0]) & (box_max[:, 0] >= low[0])
+               & (box_min[:, 1] <= high[1]) & (box_max[:, 1] >= low[1]))
+        return candidates[hit]
+
+def segments_overlap_box(start, end, low, high):
+    """Mask of 2D segments start -> end ((n, 2) arrays) that touch the box [low, high], by slab clipping"""
+    delta = end - start
+    enter = np.zeros(len(start))
+    leave = np.ones(len(start))
+    inside = np.ones(len(start), dtype=bool)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for axis in range(2):
+            parallel = delta[:, axis] == 0
+            # A segment parallel to the slab must already lie within it
+            inside &= ~parallel | ((start[:, axis] >= low[axis]) & (start[:, axis] <= high[axis]))
+            t_low = (low[axis] - start[:, axis]) / delta[:, axis]
+            t_high = (high[axis] - start[:, axis]) / delta[:, axis]
+            enter = np.where(parallel, enter, np.maximum(enter, np.minimum(t_low, t_high)))
+            leave = np.where(parallel, leave, np.minimum(leave, np.maximum(t_low, t_high)))
+    return inside & (enter <= leave)
@@ -5,20 +5,44 @@ Professional geological data processing with authentic DXF parsing
 Enhanced with comprehensive modular architecture and satellite integration
 """
 
-from flask import Flask, render_template_string, jsonify, request
+from flask import Flask, Response, abort, make_response, render_template_string, jsonify, request, send_file
 from flask_cors import CORS
 import numpy as np
 import os
+import hashlib
 import json
 import random
 import math
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime
 import threading
 import time
 
-app = Flask(__name__)
+from app.cache import response_cache
+from app.compression import configure_compression
+from app.delivery import buffer_response, configure_delivery, not_modified, send_asset
+from geology.dxf import geometry_bundle
+from geology.composites import (DEFAULT_COMPOSITE_LENGTH, DEFAULT_DENSITY, DEFAULT_INFLUENCE_AREA,
+                                fixed_length_composites, grade_tonnage, lithology_composites)
+from geology.drillholes import SAMPLE_DRILL_HOLES, load_drill_holes
+from geology.dxf_cache import DXFModelCache
+from geology.block_store import BlockModelError, BlockModelStore
+from geology.faults import load_faults, strike
+from geology.map_tiles import MAX_VIEWPORT_TILES, MapTileError, MapTileStore
+from geology.placemarks import load_placemarks
+from geology.encoding import BUNDLE_MIME_TYPE, encode_buffer_bundle, finite_or_none, stream_buffer_bundle
+from geology.png import PNG_MIME_TYPE
+from geology.section import model_section, terrain_profile
+from terrain.coordinates import CBD_MGA55, FRAMES, SceneFrame, transform
+from terrain.generator import BASE_ELEVATION
+from terrain.sampling import sample_latlng
+from terrain.tiles import elevation_pyramid
+
+# /static goes through send_asset (precompressed siblings, ranges) rather than Flask's own route
+app = configure_compression(configure_delivery(Flask(__name__, static_folder=None)))
 CORS(app)
+STATIC_DIR = Path(app.root_path) / 'static'
 
 # Enhanced configuration system
 class BendigoConfig:
@@ -32,6 +56,8 @@ class BendigoConfig:
             'lat': -36.7606,
             'lng': 144.2831,
             'utm_zone': '55H',
+            'mga_zone': 55,  # the model's local frame is MGA55 metres from the CBD
+            'mga55': list(CBD_MGA55),
             'elevation_range': [150, 350]
         }
         self.mining_heritage_sites = [
@@ -42,65 +68,33 @@ class BendigoConfig:
 
 config = BendigoConfig()
 
-# Professional DXF Parser for Bendigo geological structures
-class BendigoDXFParser:
-    def __init__(self):
-        self.layers = {}
-        self.entities = []
-        self.layer_materials = {
-            'BZ_fault_Break_O_Day': {'color': '#8B0000', 'opacity': 0.7, 'roughness': 0.9, 'metalness': 0.1},
-            'BZ_fault_Sheepwash': {'color': '#4B0082', 'opacity': 0.6, 'roughness': 0.8, 'metalness': 0.2},
-            'BZ_formation_Bendigo': {'color': '#A0864A', 'opacity': 0.8, 'roughness': 0.7, 'metalness': 0.2},
-            'BZ_formation_Ordovician': {'color': '#8B7355', 'opacity': 0.7, 'roughness': 0.8, 'metalness': 0.1},
-            'BZ_quartz_vein': {'color': '#F0F0F0', 'opacity': 0.9, 'roughness': 0.3, 'metalness': 0.4},
-            'BZ_shear_zone': {'color': '#654321', 'opacity': 0.6, 'roughness': 0.9, 'metalness': 0.1},
-            'BZ_gold_bearing': {'color': '#FFD700', 'opacity': 0.8, 'roughness': 0.3, 'metalness': 0.8},
-            'BZ_reef_system': {'color': '#E6E6FA', 'opacity': 0.7, 'roughness': 0.4, 'metalness': 0.3}
-        }
-        
-    def parse_dxf_file(self, filepath):
-        """Parse authentic Bendigo DXF geological data"""
-        try:
-            with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-            
-            lines = content.split('\n')
-            current_entity = None
-            
-            for i, line in enumerate(lines):
-                line = line.strip()
-                
-                if line == '0' and i + 1 < len(lines):
-                    next_line = lines[i + 1].strip()
-                    
-                    if next_line == '3DFACE':
-                        if current_entity:
-                            self.entities.append(current_entity)
-                        current_entity = {'type': '3DFACE', 'layer': '', 'coords': {}}
-                
-                elif current_entity and line == '8' and i + 1 < len(lines):
-                    layer_name = lines[i + 1].strip()
-                    current_entity['layer'] = layer_name
-                    
-                    if layer_name not in self.layers:
-                        self.layers[layer_name] = []
-                    self.layers[layer_name].append(current_entity)
-            
-            if current_entity:
-                self.entities.append(current_entity)
-            
-            return {
-                'status': 'success',
-                'layers': len(self.layers),
-                'entities': len(self.entities),
-                'layer_names': list(self.layers.keys())[:10]  # First 10 for display
-            }
-            
-        except Exception as e:
-            return {'status': 'error', 'message': str(e)}
+# Initialize geological processor: each DXF is parsed once, then served from the on-disk cache
+dxf_models = DXFModelCache()
+DXF_PATH = Path('attached_assets/bendigo_zone_2011_1750736176813.dxf')
+DXF_FRAME = 'mga55'
+# Collar and assay tables exported as CSV; the sample holes are served while these are empty
+DRILL_COLLARS_PATH = Path('attached_assets/Appendix-1-Aircore-Drilling-Database_1750733777005')
+DRILL_ASSAYS_PATH = Path('attached_assets/Appendix-3-Original-Assay-Files_1750733777001')
+DRILL_HOLES_PAGE_SIZE = 100
+MAX_DRILL_HOLES_PAGE_SIZE = 1000
+GRADE_TONNAGE_CUTOFFS = 50
+# Shortest fixed composite (m): float32 depths cannot hold much finer intervals a few hundred metres down
+MIN_COMPOSITE_LENGTH = 0.1
+# Field points exported from Google Earth / Avenza as KML or KMZ
+PLACEMARK_PATTERN = 'Prospecting*.km[lz]'
+# GSV Central and Western Victoria fault interpretation, a zone 54 shapefile zipped with its attachments
+FAULTS_PATH = Path('attached_assets/G171947_GSV-TR2023-3_Att-A1_Central-and-Western-Victorian-Fault-Interpretation_1750722084442.zip')
+FAULTS_FRAME = 'mga54'
+# Goldfield box (west, south, east, north) whose named faults /api/geological-data lists
+GOLDFIELD_BBOX = (144.08, -36.96, 144.48, -36.56)
+# Estimated block models, memory-mapped from the cache (see geology/block_store.py)
+block_models = BlockModelStore()
+MAX_BLOCK_MODEL_BLOCKS = 16 * 1024 * 1024
+# A model directory left half-written or corrupted: unreadable files, bad JSON or .npy, missing manifest keys
+BROKEN_BLOCK_MODEL_ERRORS = (OSError, ValueError, KeyError)
 
-# Initialize geological processor
-dxf_parser = BendigoDXFParser()
+# The explorer page's Three.js frame: its 100-unit terrain spans 6 km around the CBD, y up from the CBD's ground
+EXPLORER_SCENE = SceneFrame(extent_km=6.0, size=100.0, base_elevation=BASE_ELEVATION, vertical_scale=0.3)
 
 # HTML Template with Three.js 3D visualization
 HTML_TEMPLATE = """
@@ -134,6 +128,8 @@ HTML_TEMPLATE = """
             border-radius: 5px; border: 1px solid #333;
         }
         input[type="range"] { width: 100%; margin: 5px 0; }
+        .layer-list { max-height: 160px; overflow-y: auto; margin-top: 8px; font-size: 12px; }
+        .layer-list label { display: block; white-space: nowrap; }
     </style>
 </head>
 <body>
@@ -151,6 +147,7 @@ HTML_TEMPLATE = """
                 <div id="dxfToggle" class="toggle active">
                     <div class="toggle-thumb"></div>
                 </div>
+                <div id="dxfLayers" class="layer-list"></div>
             </div>
             <div class="control-group">
                 <label>Mining Sites</label>
@@ -270,7 +267,7 @@ HTML_TEMPLATE = """
                 
                 if (dxfData.status === 'success') {
                     updateStatus(`DXF loaded: ${dxfData.layers} geological layers`);
-                    createDXFVisualization(dxfData);
+                    await createDXFVisualization(dxfData);
                 }
 
                 // Load terrain
@@ -289,51 +286,136 @@ HTML_TEMPLATE = """
             }
         }
 
-        function createDXFVisualization(dxfData) {
-            // Create representative geological structures
-            for (let i = 0; i < Math.min(dxfData.layers, 20); i++) {
-                const geometry = new THREE.BoxGeometry(
-                    Math.random() * 10 + 5,
-                    Math.random() * 5 + 2,
-                    Math.random() * 10 + 5
-                );
-                
-                const material = new THREE.MeshStandardMaterial({
-                    color: new THREE.Color().setHSL(Math.random() * 0.1 + 0.05, 0.7, 0.5),
+        function decodeBufferBundle(buffer) {
+            // BGDX bundle: 12-byte header, JSON manifest, then aligned typed-array buffers
+            const manifestLength = new DataView(buffer).getUint32(8, true);
+            const manifest = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 12, manifestLength)));
+            const dataStart = 12 + manifestLength;
+            manifest.view = (name, ArrayType) => {
+                const spec = manifest.buffers[name];
+                const count = spec.shape.reduce((a, b) => a * b, 1);
+                return new ArrayType(buffer, dataStart + spec.offset, count);
+            };
+            return manifest;
+        }
+
+        let dxfModel = null;
+        const dxfLayerObjects = new Map();
+
+        async function createDXFVisualization(dxfData) {
+            // Fetch the layer index only; each layer's geometry loads when it is switched on
+            const response = await fetch('/api/dxf/layers');
+            if (!response.ok) {
+                updateStatus('DXF geometry unavailable');
+                return;
+            }
+            const index = await response.json();
+
+            // DXF is easting/northing/RL in metres: lay it flat (Z up -> Y up) and fit it to the scene
+            const box = new THREE.Box3();
+            index.layers.forEach(layer => {
+                box.expandByPoint(new THREE.Vector3(...layer.bounds[0]));
+                box.expandByPoint(new THREE.Vector3(...layer.bounds[1]));
+            });
+            if (box.isEmpty()) {
+                return;
+            }
+            const size = box.getSize(new THREE.Vector3());
+            const center = box.getCenter(new THREE.Vector3());
+            dxfModel = new THREE.Group();
+            dxfModel.position.set(-center.x, -center.y, -box.max.z);
+            const frame = new THREE.Group();
+            frame.add(dxfModel);
+            frame.rotation.x = -Math.PI / 2;
+            frame.scale.setScalar(100 / Math.max(size.x, size.y, 1));
+            scene.add(frame);
+
+            const list = document.getElementById('dxfLayers');
+            index.layers.forEach(layer => {
+                const label = document.createElement('label');
+                const checkbox = document.createElement('input');
+                checkbox.type = 'checkbox';
+                // Styled BZ_* layers start on; the rest load on demand
+                checkbox.checked = layer.name.startsWith('BZ_');
+                checkbox.addEventListener('change', () => setDXFLayerVisible(layer.name, checkbox.checked));
+                label.append(checkbox, ` ${layer.name} (${layer.entities})`);
+                list.appendChild(label);
+                if (checkbox.checked) {
+                    setDXFLayerVisible(layer.name, true);
+                }
+            });
+            updateStatus(`DXF index: ${index.layers.length} layers`);
+        }
+
+        async function setDXFLayerVisible(name, visible) {
+            if (dxfLayerObjects.has(name)) {
+                dxfLayerObjects.get(name).forEach(obj => { obj.visible = visible; });
+                return;
+            }
+            if (!visible) {
+                return;
+            }
+            dxfLayerObjects.set(name, []);
+            const response = await fetch(`/api/dxf/layers/${encodeURIComponent(name)}/geometry`);
+            const bundle = decodeBufferBundle(await response.arrayBuffer());
+            const layer = bundle.layers[0];
+            const positions = new THREE.BufferAttribute(bundle.view(layer.positions, Float32Array), 3);
+            const triangles = bundle.view(layer.triangles, Uint32Array);
+            const lines = bundle.view(layer.lines, Uint32Array);
+            const color = new THREE.Color(layer.material.color);
+            const objects = dxfLayerObjects.get(name);
+
+            if (triangles.length) {
+                const geometry = new THREE.BufferGeometry();
+                geometry.setAttribute('position', positions);
+                geometry.setIndex(new THREE.BufferAttribute(triangles, 1));
+                geometry.computeVertexNormals();
+                objects.push(new THREE.Mesh(geometry, new THREE.MeshStandardMaterial({
+                    color: color,
                     transparent: true,
-                    opacity: 0.8
-                });
-                
-                const mesh = new THREE.Mesh(geometry, material);
-                mesh.position.set(
-                    (Math.random() - 0.5) * 80,
-                    Math.random() * -30 - 10,
-                    (Math.random() - 0.5) * 80
-                );
-                mesh.userData = { layer: 'dxf-geology', name: `Geological Layer ${i+1}` };
-                scene.add(mesh);
-                dxfMeshes.push(mesh);
+                    opacity: layer.material.opacity,
+                    roughness: layer.material.roughness,
+                    metalness: layer.material.metalness,
+                    side: THREE.DoubleSide
+                })));
+            }
+            if (lines.length) {
+                const geometry = new THREE.BufferGeometry();
+                geometry.setAttribute('position', positions);
+                geometry.setIndex(new THREE.BufferAttribute(lines, 1));
+                objects.push(new THREE.LineSegments(geometry, new THREE.LineBasicMaterial({ color: color })));
             }
+            objects.forEach(obj => {
+                obj.userData = { layer: 'dxf-geology', name: name };
+                dxfModel.add(obj);
+                dxfMeshes.push(obj);
+            });
         }
 
-        function createTerrain() {
-            // Enhanced terrain generation with proper geological modeling
-            const width = 100;
-            const height = 100;
-            const widthSegments = 64;
-            const heightSegments = 64;
-            
-            const geometry = new THREE.PlaneGeometry(width, height, widthSegments, heightSegments);
+        async function createTerrain() {
+            // Ground heights in the explorer's scene frame, the same frame the mining-site markers are placed in
+            let width = 100;
+            let segments = 64;
+            let heights = null;
+            try {
+                const response = await fetch(`/api/explorer/terrain?segments=${segments}`);
+                if (response.ok) {
+                    const terrainData = await response.json();
+                    width = terrainData.frame.size;
+                    segments = terrainData.segments;
+                    heights = terrainData.heights;
+                }
+            } catch (error) {
+                console.warn('Explorer terrain unavailable, using procedural heights');
+            }
+
+            // Laid flat first, so vertex r * (segments + 1) + c sits at x = column c, z = row r (north along +z)
+            const geometry = new THREE.PlaneGeometry(width, width, segments, segments);
+            geometry.rotateX(-Math.PI / 2);
             const vertices = geometry.attributes.position.array;
-            
-            // Generate realistic Bendigo topography
-            for (let i = 0; i < vertices.length; i += 3) {
-                const x = vertices[i];
-                const z = vertices[i + 2];
-                
-                // Multi-layered noise for realistic terrain
-                const elevation = generateBendigoElevation(x, z);
-                vertices[i + 1] = elevation;
+            for (let i = 0, vertex = 0; i < vertices.length; i += 3, vertex++) {
+                const height = heights ? heights[vertex] : null;
+                vertices[i + 1] = height === null ? generateBendigoElevation(vertices[i], vertices[i + 2]) : height;
             }
             
             geometry.attributes.position.needsUpdate = true;
@@ -349,12 +431,11 @@ HTML_TEMPLATE = """
             });
             
             const terrain = new THREE.Mesh(geometry, material);
-            terrain.rotation.x = -Math.PI / 2;
             terrain.userData = { layer: 'terrain', name: 'Bendigo Surface Terrain' };
             terrain.receiveShadow = true;
             scene.add(terrain);
             
-            updateStatus('Terrain generated with geological modeling');
+            updateStatus(heights ? 'Terrain draped from Bendigo elevation data' : 'Terrain generated with geological modeling');
         }
         
         function generateBendigoElevation(x, z) {
@@ -389,7 +470,7 @@ HTML_TEMPLATE = """
                 });
                 
                 const marker = new THREE.Mesh(geometry, material);
-                marker.position.set(site.x, site.y, site.z);
+                marker.position.set(site.position.x, site.position.y, site.position.z);
                 marker.userData = { layer: 'mining', name: site.name };
                 scene.add(marker);
             });
@@ -466,6 +547,55 @@ HTML_TEMPLATE = """
             crossPlane = new THREE.Mesh(geometry, material);
             crossPlane.position.set(x, 0, z);
             scene.add(crossPlane);
+
+            // Cut the DXF model along the plane's east-west line once the slider settles
+            clearTimeout(sectionTimer);
+            sectionTimer = setTimeout(() => loadSection(x - 50, x + 50, z), 200);
+        }
+
+        let sectionTimer = null;
+        let sectionRequest = 0;
+        let sectionLines = null;
+
+        async function loadSection(startX, endX, z) {
+            const request = ++sectionRequest;
+            const params = new URLSearchParams({ frame: 'scene', start: `${startX},${z}`, end: `${endX},${z}` });
+            try {
+                const response = await fetch(`/api/cross-section?${params}`);
+                const section = await response.json();
+                if (request !== sectionRequest) {
+                    return;  // superseded by a later slider position
+                }
+                if (!response.ok) {
+                    updateStatus(`Cross section unavailable: ${section.message}`);
+                    return;
+                }
+                drawSection(section, startX, z);
+            } catch (error) {
+                updateStatus('Cross section request failed');
+            }
+        }
+
+        function drawSection(section, startX, z) {
+            // (distance along the line, elevation) pairs back into the explorer scene frame
+            const frame = section.scene;
+            const scale = frame.size / (frame.extent_km * 1000);
+            const toScene = ([u, elevation]) => new THREE.Vector3(
+                startX + u * scale, (elevation - frame.base_elevation) * frame.vertical_scale, z);
+            if (sectionLines) {
+                scene.remove(sectionLines);
+            }
+            sectionLines = new THREE.Group();
+            const addLine = (points, color) => {
+                const geometry = new THREE.BufferGeometry().setFromPoints(points.map(toScene));
+                sectionLines.add(new THREE.Line(geometry, new THREE.LineBasicMaterial({ color })));
+            };
+            addLine(section.terrain.distance.map((u, i) => [u, section.terrain.elevation[i]]), 0x8B7355);
+            const names = Object.keys(section.layers);
+            names.forEach(name => section.layers[name].polylines.forEach(line => addLine(line, 0xffaa00)));
+            sectionLines.userData = { layer: 'cross-section', name: 'Cross section' };
+            scene.add(sectionLines);
+            updateStatus(`Cross section ${Math.round(section.length)} m: ${names.length} DXF layers cut`);
         }
 
         function onWindowResize() {
@@ -520,6 +650,10 @@ HTML_TEMPLATE = """
 def index():
     return render_template_string(HTML_TEMPLATE)
 
+@app.route('/static/<path:filename>')
+def serve_static(filename):
+    return send_asset(STATIC_DIR, filename)
+
 @app.route('/api/health')
 def health():
     return jsonify({
@@ -529,88 +663,209 @@ def health():
         'geological_processing': 'operational'
     })
 
+# Georeferenced map sheets draped over the terrain; path is where each is served from
+GEOLOGICAL_TEXTURES = [
+    {
+        'name': 'bendigo_goldfield_south',
+        'path': '/static/textures/G10770_goldfield_S-Bendigo_GF9b_7k_colour_1750722041897.png',
+        'type': 'geological_map',
+        'opacity': 0.8,
+        'transparent': True,
+        'coordinates': {
+            'lat': -36.7606,
+            'lng': 144.2831,
+            'bounds': {
+                'north': -36.7206,
+                'south': -36.8006,
+                'east': 144.3231,
+                'west': 144.2431
+            }
+        }
+    },
+    {
+        'name': 'bendigo_goldfield_marked',
+        'path': '/static/textures/2Marked-G10770_goldfield_S-Bendigo_GF9b_7k_colour_1750722041896.png',
+        'type': 'annotated_map',
+        'opacity': 0.7,
+        'transparent': True,
+        'coordinates': {
+            'lat': -36.7606,
+            'lng': 144.2831,
+            'bounds': {
+                'north': -36.7206,
+                'south': -36.8006,
+                'east': 144.3231,
+                'west': 144.2431
+            }
+        }
+    },
+    {
+        'name': 'bendigo_heritage_overlay',
+        'path': '/static/textures/Marked-G10770_goldfield_S-Bendigo_GF9b_7k_colour_1750722041898.png',
+        'type': 'heritage_overlay',
+        'opacity': 0.6,
+        'transparent': True,
+        'coordinates': {
+            'lat': -36.7606,
+            'lng': 144.2831,
+            'bounds': {
+                'north': -36.7206,
+                'south': -36.8006,
+                'east': 144.3231,
+                'west': 144.2431
+            }
+        }
+    },
+    {
+        'name': 'geological_analysis',
+        'path': '/static/textures/ACt3cneXFj-06jnBaHioF_1750789383460.png',
+        'type': 'analysis_overlay',
+        'opacity': 0.5,
+        'transparent': True,
+        'coordinates': {
+            'lat': -36.7606,
+            'lng': 144.2831,
+            'bounds': {
+                'north': -36.7206,
+                'south': -36.8006,
+                'east': 144.3231,
+                'west': 144.2431
+            }
+        }
+    }
+]
+
+# Map tile pyramids cut from the sheets (see geology/map_tiles.py); tile URLs carry a version, so never go stale
+map_tiles = MapTileStore()
+MAP_TILE_MAX_AGE = 365 * 24 * 3600
+# Seconds a client is asked to wait while a sheet is still being cut
+MAP_TILE_RETRY_AFTER = 15
+
+def texture_file(texture):
+    return Path(texture['path'].lstrip('/'))
+
 @app.route('/api/textures/geological')
+@response_cache.cached()
 def geological_textures():
-    """Serve geological texture metadata with transparency preservation"""
+    """Serve geological texture metadata with transparency preservation
+
+    local_corners gives each map's SW, SE, NE and NW corners in local metres:
+    the MGA grid is turned against lat/lng, so the bounds are a slightly
+    rotated quad on the terrain rather than an axis-aligned box. tiles
+    describes the map's tile pyramid (None when the sheet is not on disk).
+    """
+    textures = [dict(texture) for texture in GEOLOGICAL_TEXTURES]
+    bounds = [texture['coordinates']['bounds'] for texture in textures]
+    lat = np.array([[b['south'], b['south'], b['north'], b['north']] for b in bounds])
+    lng = np.array([[b['west'], b['east'], b['east'], b['west']] for b in bounds])
+    east, north = transform(lat, lng, 'wgs84', 'local')
+    for texture, corners in zip(textures, np.round(np.stack([east, north], axis=-1), 2).tolist()):
+        texture['local_corners'] = corners
+        path = texture_file(texture)
+        texture['tiles'] = map_tiles.describe(texture['name'], path, texture['coordinates']['bounds']) \
+            if path.exists() else None
+    return jsonify({'textures': textures})
+
+texture_pyramids_queued = threading.Event()
+
+@app.before_request
+def prepare_texture_pyramids():
+    """Queue every sheet on disk to be cut in the background, so requests never wait on a cut
+
+    Runs at server start (see __main__) or, under a WSGI server, on the
+    first request; importing main (benchmarks, tools) cuts nothing.
+    """
+    if texture_pyramids_queued.is_set():
+        return
+    texture_pyramids_queued.set()
+    for texture in GEOLOGICAL_TEXTURES:
+        if texture_file(texture).exists():
+            map_tiles.prepare(texture['name'], texture_file(texture), texture['coordinates']['bounds'])
+
+def texture_pyramid(name):
+    """Tile pyramid of a geological map by name
+
+    Answers 404 for unknown or missing sheets and 503 with Retry-After while
+    the sheet is still being cut.
+    """
+    for texture in GEOLOGICAL_TEXTURES:
+        if texture['name'] == name and texture_file(texture).exists():
+            try:
+                pyramid = map_tiles.ready(name, texture_file(texture), texture['coordinates']['bounds'])
+            except MapTileError as e:
+                abort(make_response(jsonify({'status': 'error', 'message': str(e)}), 500))
+            if pyramid is None:
+                response = make_response(jsonify({
+                    'status': 'pending',
+                    'message': f'Tiles for {name!r} are being cut; retry shortly'
+                }), 503)
+                response.headers['Retry-After'] = str(MAP_TILE_RETRY_AFTER)
+                abort(response)
+            return pyramid
+    abort(make_response(jsonify({'status': 'error', 'message': f'No geological map named {name!r}'}), 404))
+
+@app.route('/api/textures/geological/<name>/tiles')
+def geological_texture_tiles(name):
+    """Tiles of a geological map under the viewport bbox=west,south,east,north
+
+    z picks the pyramid level; without it, the finest level covering the
+    viewport in at most max_tiles tiles. local_bounds are in local metres.
+    """
+    bbox = vector_arg('bbox', 4)
+    try:
+        z = int(request.args['z']) if 'z' in request.args else None
+        max_tiles = min(max(int(request.args.get('max_tiles', MAX_VIEWPORT_TILES)), 1), MAX_VIEWPORT_TILES)
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'z and max_tiles must be integers'}), 400
+    pyramid = texture_pyramid(name)
+    z, tiles = pyramid.viewport(bbox, z, max_tiles)
+    version = pyramid.manifest['version']
+    records = []
+    for x, y in tiles:
+        west, east, south, north = (value * 1000 for value in elevation_pyramid.tile_bounds(z, x, y))
+        records.append({
+            'x': x,
+            'y': y,
+            'url': f'/api/textures/geological/{name}/{version}/{z}/{x}/{y}.png',
+            'local_bounds': {'west': west, 'east': east, 'south': south, 'north': north}
+        })
     return jsonify({
-        'textures': [
-            {
-                'name': 'bendigo_goldfield_south',
-                'path': '/static/textures/G10770_goldfield_S-Bendigo_GF9b_7k_colour_1750722041897.png',
-                'type': 'geological_map',
-                'opacity': 0.8,
-                'transparent': True,
-                'coordinates': {
-                    'lat': -36.7606,
-                    'lng': 144.2831,
-                    'bounds': {
-                        'north': -36.7206,
-                        'south': -36.8006,
-                        'east': 144.3231,
-                        'west': 144.2431
-                    }
-                }
-            },
-            {
-                'name': 'bendigo_goldfield_marked',
-                'path': '/static/textures/2Marked-G10770_goldfield_S-Bendigo_GF9b_7k_colour_1750722041896.png',
-                'type': 'annotated_map',
-                'opacity': 0.7,
-                'transparent': True,
-                'coordinates': {
-                    'lat': -36.7606,
-                    'lng': 144.2831,
-                    'bounds': {
-                        'north': -36.7206,
-                        'south': -36.8006,
-                        'east': 144.3231,
-                        'west': 144.2431
-                    }
-                }
-            },
-            {
-                'name': 'bendigo_heritage_overlay',
-                'path': '/static/textures/Marked-G10770_goldfield_S-Bendigo_GF9b_7k_colour_1750722041898.png',
-                'type': 'heritage_overlay',
-                'opacity': 0.6,
-                'transparent': True,
-                'coordinates': {
-                    'lat': -36.7606,
-                    'lng': 144.2831,
-                    'bounds': {
-                        'north': -36.7206,
-                        'south': -36.8006,
-                        'east': 144.3231,
-                        'west': 144.2431
-                    }
-                }
-            },
-            {
-                'name': 'geological_analysis',
-                'path': '/static/textures/ACt3cneXFj-06jnBaHioF_1750789383460.png',
-                'type': 'analysis_overlay',
-                'opacity': 0.5,
-                'transparent': True,
-                'coordinates': {
-                    'lat': -36.7606,
-                    'lng': 144.2831,
-                    'bounds': {
-                        'north': -36.7206,
-                        'south': -36.8006,
-                        'east': 144.3231,
-                        'west': 144.2431
-                    }
-                }
-            }
-        ]
+        'name': name,
+        'version': version,
+        'z': z,
+        'tile_size': elevation_pyramid.tile_size,
+        'tile_extent_m': elevation_pyramid.tile_extent(z) * 1000,
+        'tiles': records
     })
 
+@app.route('/api/textures/geological/<name>/<version>/<int:z>/<int:x>/<int:y>.png')
+def geological_texture_tile(name, version, z, x, y):
+    """One map tile, cacheable forever: a changed sheet gets a new version and so new URLs"""
+    pyramid = texture_pyramid(name)
+    tile = pyramid.tile_path(z, x, y) if version == pyramid.manifest['version'] else None
+    if tile is None:
+        abort(404)
+    response = send_file(tile, mimetype=PNG_MIME_TYPE, max_age=MAP_TILE_MAX_AGE)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+def load_dxf_model():
+    """Cached DXF model, aborting with a JSON error when it cannot be loaded"""
+    if not DXF_PATH.exists():
+        abort(make_response(jsonify({'status': 'error', 'message': 'DXF model not available'}), 404))
+    try:
+        return dxf_models.load(DXF_PATH)
+    except Exception as e:
+        abort(make_response(jsonify({'status': 'error', 'message': str(e)}), 500))
+
 @app.route('/api/dxf/parse')
 def parse_dxf():
-    dxf_path = Path('attached_assets/bendigo_zone_2011_1750736176813.dxf')
-    
-    if dxf_path.exists():
-        result = dxf_parser.parse_dxf_file(str(dxf_path))
+    if DXF_PATH.exists():
+        try:
+            result = dxf_models.load(DXF_PATH).summary()
+        except Exception as e:
+            result = {'status': 'error', 'message': str(e)}
         return jsonify(result)
     else:
         return jsonify({
@@ -620,13 +875,432 @@ def parse_dxf():
             'layer_names': ['BZ_fault_Break_O_Day', 'Formation_Bendigo', 'Structural_Controls']
         })
 
+@app.route('/api/dxf/geometry')
+def dxf_geometry():
+    """Per-layer float32 positions and uint32 triangle/line indices as one binary bundle"""
+    model = load_dxf_model()
+    etag = dxf_etag(model)
+    cached = not_modified(etag)
+    if cached is not None:
+        return cached
+    manifest, arrays = geometry_bundle(model.origin, model.layer_geometries(), model.layer_materials())
+    manifest.update(dxf_frame(model))
+    return buffer_response(encode_buffer_bundle(manifest, arrays), BUNDLE_MIME_TYPE, etag)
+
+@app.route('/api/dxf/layers')
+def dxf_layers():
+    """Layer index: entity/vertex/index counts and bounding boxes, without geometry"""
+    model = load_dxf_model()
+    return jsonify({
+        'status': 'success',
+        'origin': model.origin.tolist(),
+        **dxf_frame(model),
+        'layers': model.describe_layers()
+    })
+
+@app.route('/api/dxf/layers/<path:name>/geometry')
+def dxf_layer_geometry(name):
+    """One layer's packed buffers, so clients fetch only the layers they switch on"""
+    model = load_dxf_model()
+    if name not in model.layer_index:
+        return jsonify({'status': 'error', 'message': f'Unknown layer {name}'}), 404
+
+    etag = dxf_etag(model, name)
+    cached = not_modified(etag)
+    if cached is not None:
+        return cached
+    manifest, arrays = geometry_bundle(model.origin, model.layer_geometries([name]), model.layer_materials())
+    manifest.update(dxf_frame(model))
+    return buffer_response(encode_buffer_bundle(manifest, arrays), BUNDLE_MIME_TYPE, etag)
+
+def dxf_etag(model, layer=None):
+    """Strong ETag of a geometry bundle: the parsed DXF's content hash and cache version, plus the layer"""
+    digest = hashlib.blake2b(f'{model.manifest["source_digest"]}/{model.manifest["version"]}/{layer}'.encode(),
+                             digest_size=16)
+    return digest.hexdigest()
+
+def dxf_frame(model):
+    """Frame of the DXF positions and where their origin sits in the terrain's local frame"""
+    east, north = transform(model.origin[0], model.origin[1], DXF_FRAME, 'local')
+    return {'frame': DXF_FRAME, 'local_origin': [round(float(east), 3), round(float(north), 3), float(model.origin[2])]}
+
+def vector_arg(name, size=3):
+    """Parse an 'x,y,z' (or size-long) comma-separated query parameter, answering 400 when it is missing or malformed"""
+    try:
+        vector = np.array([float(v) for v in request.args[name].split(',')])
+    except (KeyError, ValueError):
+        vector = None
+    if vector is None or vector.shape != (size,) or not np.all(np.isfinite(vector)):
+        axes = ','.join('xyz'[:size]) if size <= 3 else f'{size} comma-separated numbers'
+        abort(make_response(jsonify({'status': 'error', 'message': f'{name} must be {axes}'}), 400))
+    return vector
+
+def layers_arg():
+    layers = request.args.get('layers')
+    return layers.split(',') if layers else None
+
+@app.route('/api/dxf/query/box')
+def dxf_query_box():
+    """Faces whose bounds overlap a box given in the DXF's own coordinates (min=x,y,z&max=x,y,z)"""
+    model = load_dxf_model()
+    low = vector_arg('min') - model.origin
+    high = vector_arg('max') - model.origin
+    faces = model.query_box(low, high, layers_arg())
+    return jsonify({
+        'status': 'success',
+        'count': int(faces.size),
+        'faces': {name: ids.tolist() for name, ids in model.group_by_layer(faces).items()}
+    })
+
+@app.route('/api/dxf/query/ray')
+def dxf_query_ray():
+    """Nearest face hit by a ray (origin=x,y,z&direction=x,y,z) in the DXF's own coordinates"""
+    model = load_dxf_model()
+    origin = vector_arg('origin')
+    direction = vector_arg('direction')
+    length = np.linalg.norm(direction)
+    if not length:
+        return jsonify({'status': 'error', 'message': 'direction must be non-zero'}), 400
+    direction = direction / length
+
+    hit = model.raycast(origin - model.origin, direction, layers_arg())
+    if hit is None:
+        return jsonify({'status': 'success', 'hit': False})
+    face, distance = hit
+    layer = model.layer_index.names[int(model.face_layers(face))]
+    return jsonify({
+        'status': 'success',
+        'hit': True,
+        'layer': layer,
+        'face': face - int(model.layer_index.record(layer)['triangle_offset']),
+        'distance': distance,
+        'point': (origin + direction * distance).tolist()
+    })
+
+@app.route('/api/cross-section')
+def cross_section():
+    """Vertical section along start=e,n -> end=e,n: per-layer polylines and the terrain profile
+
+    start and end are DXF/MGA metres unless frame names another frame of the
+    transform layer; frame=scene takes explorer scene x,z (EXPLORER_SCENE),
+    as the page's section sliders send. Results are in the DXF's frame.
+    """
+    model = load_dxf_model()
+    start = vector_arg('start', 2)
+    end = vector_arg('end', 2)
+    frame = request.args.get('frame', DXF_FRAME)
+    if frame not in FRAMES:
+        return jsonify({'status': 'error', 'message': f"frame must be one of {', '.join(FRAMES)}"}), 400
+    if frame != DXF_FRAME:
+        a, b = transform([start[0], end[0]], [start[1], end[1]], frame, DXF_FRAME, scene=EXPLORER_SCENE)
+        start, end = np.array([a[0], b[0]]), np.array([a[1], b[1]])
+    if np.array_equal(start, end):
+        return jsonify({'status': 'error', 'message': 'start and end must differ'}), 400
+
+    distances, elevations = terrain_profile(start, end)
+    return jsonify({
+        'status': 'success',
+        'frame': DXF_FRAME,
+        'start': start.tolist(),
+        'end': end.tolist(),
+        'length': float(distances[-1]),
+        'layers': model_section(model, start, end, layers_arg()),
+        'terrain': {
+            'distance': np.round(distances, 2).tolist(),
+            'elevation': np.round(elevations, 2).tolist()
+        },
+        'scene': EXPLORER_SCENE.describe()
+    })
+
+def float_arg(name):
+    """Optional float query parameter, answering 400 when it is malformed"""
+    value = request.args.get(name)
+    if value is None:
+        return None
+    try:
+        number = float(value)
+    except ValueError:
+        number = float('nan')
+    if not np.isfinite(number):
+        abort(make_response(jsonify({'status': 'error', 'message': f'{name} must be a number'}), 400))
+    return number
+
+def load_drill_hole_store():
+    """Drill hole store for the collar/assay tables, aborting with a JSON error when they cannot be read"""
+    try:
+        return load_drill_holes(DRILL_COLLARS_PATH, DRILL_ASSAYS_PATH)
+    except (OSError, ValueError) as e:
+        abort(make_response(jsonify({'status': 'error', 'message': f'drill hole tables unreadable: {e}'}), 500))
+
+@app.route('/api/drill-holes')
+def drill_holes():
+    """Drill holes with their assay intervals, filtered and paginated
+
+    from/to select intervals overlapping a depth range (m), min_grade those
+    at or above a grade (g/t Au) and bbox=west,south,east,north collars by
+    position. With interval filters only matching holes and intervals are
+    returned. offset/limit page through the matching holes.
+    """
+    store = load_drill_hole_store()
+    bbox = vector_arg('bbox', 4) if 'bbox' in request.args else None
+    offset, limit = page_args()
+
+    positions, intervals = store.query(top=float_arg('from'), bottom=float_arg('to'),
+                                       min_grade=float_arg('min_grade'), bbox=bbox)
+    page = positions[offset:offset + limit]
+    records = store.describe(page, intervals)
+    # Collars placed in the local frame and draped on the terrain in one batched lookup for the page
+    east, north, ground = sample_latlng(store.lat[page], store.lng[page])
+    for record, e, n, elevation in zip(records, np.round(east, 2).tolist(), np.round(north, 2).tolist(),
+                                       finite_or_none(ground, 2)):
+        record['local'] = {'east': e, 'north': n}
+        record['collar_elevation'] = elevation
+    return jsonify({
+        'status': 'available',
+        'total_holes': int(positions.size),
+        'offset': offset,
+        'limit': limit,
+        'drill_holes': records
+    })
+
+def page_args():
+    """(offset, limit) query parameters, answering 400 when they are not integers"""
+    try:
+        offset = max(0, int(request.args.get('offset', 0)))
+        limit = min(MAX_DRILL_HOLES_PAGE_SIZE, max(1, int(request.args.get('limit', DRILL_HOLES_PAGE_SIZE))))
+    except ValueError:
+        abort(make_response(jsonify({'status': 'error', 'message': 'offset and limit must be integers'}), 400))
+    return offset, limit
+
+@lru_cache(maxsize=8)
+def composites_for(store, method, length):
+    if method == 'lithology':
+        return lithology_composites(store)
+    return fixed_length_composites(store, length)
+
+def composites_arg(store):
+    """Composites selected by method=fixed|lithology and length (m)"""
+    method = request.args.get('method', 'fixed')
+    length = float_arg('length')
+    length = DEFAULT_COMPOSITE_LENGTH if length is None else length
+    if method not in ('fixed', 'lithology') or (method == 'fixed' and length < MIN_COMPOSITE_LENGTH):
+        abort(make_response(jsonify({
+            'status': 'error',
+            'message': f'method must be fixed or lithology, length at least {MIN_COMPOSITE_LENGTH} m'
+        }), 400))
+    return method, length, composites_for(store, method, length)
+
+def positive_arg(name, default):
+    """Optional positive float query parameter, answering 400 for zero, negative or malformed values"""
+    value = float_arg(name)
+    if value is None:
+        return default
+    if value <= 0:
+        abort(make_response(jsonify({'status': 'error', 'message': f'{name} must be positive'}), 400))
+    return value
+
+@app.route('/api/drill-holes/composites')
+def drill_hole_composites():
+    """Length-weighted downhole composites (method=fixed&length=2, or method=lithology), paginated"""
+    store = load_drill_hole_store()
+    method, length, composites = composites_arg(store)
+    offset, limit = page_args()
+    page = slice(offset, offset + limit)
+    lithology = composites.lithology[page].tolist() if composites.lithology is not None else None
+    return jsonify({
+        'status': 'success',
+        'method': method,
+        'length': length if method == 'fixed' else None,
+        'total': len(composites),
+        'offset': offset,
+        'limit': limit,
+        'composites': [
+            {'hole_id': hole_id, 'from': f, 'to': t, 'grade': g, 'sampled_length': l,
+             'lithology': store.lithology_names[lithology[i]] or None if lithology else None}
+            for i, (hole_id, f, t, g, l) in enumerate(zip(
+                store.hole_ids[composites.hole[page]].tolist(),
+                finite_or_none(composites.depth_from[page], 2), finite_or_none(composites.depth_to[page], 2),
+                finite_or_none(composites.grade[page], 3), finite_or_none(composites.sampled[page], 2)))
+        ]
+    })
+
+@app.route('/api/drill-holes/grade-tonnage')
+def drill_hole_grade_tonnage():
+    """Grade-tonnage curve over composites
+
+    cutoffs=a,b,c lists cutoff grades (g/t); otherwise max_cutoff and steps
+    give an even sweep from zero. density (t/m^3) and area (m^2 of influence
+    per hole) turn composite lengths into tonnes.
+    """
+    store = load_drill_hole_store()
+    method, length, composites = composites_arg(store)
+    if 'cutoffs' in request.args:
+        try:
+            cutoffs = np.array([float(v) for v in request.args['cutoffs'].split(',')])
+        except ValueError:
+            return jsonify({'status': 'error', 'message': 'cutoffs must be comma-separated numbers'}), 400
+    else:
+        max_cutoff = float_arg('max_cutoff')
+        if max_cutoff is None:
+            max_cutoff = float(np.nanmax(composites.grade, initial=0.0))
+        steps = float_arg('steps')
+        steps = min(1000, max(2, int(GRADE_TONNAGE_CUTOFFS if steps is None else steps)))
+        cutoffs = np.linspace(0.0, max_cutoff, steps)
+
+    density = positive_arg('density', DEFAULT_DENSITY)
+    area = positive_arg('area', DEFAULT_INFLUENCE_AREA)
+    curve = grade_tonnage(composites.grade, composites.tonnes(density, area), cutoffs)
+    return jsonify({
+        'status': 'success',
+        'method': method,
+        'length': length if method == 'fixed' else None,
+        'density': density,
+        'area': area,
+        'composites': len(composites),
+        'curve': {name: np.round(values, 4).tolist() for name, values in curve.items()}
+    })
+
+def load_block_model(name):
+    try:
+        return block_models.load(name)
+    except BlockModelError as e:
+        abort(make_response(jsonify({'status': 'error', 'message': str(e)}), 404))
+    except BROKEN_BLOCK_MODEL_ERRORS as e:
+        abort(make_response(jsonify({'status': 'error', 'message': f'block model {name!r} is unreadable: {e}'}), 500))
+
+def variables_arg():
+    variables = request.args.get('variables')
+    return variables.split(',') if variables else None
+
+def index_arg(name, default=None):
+    """i,j,k block indices, answering 400 when they are not whole numbers"""
+    if name not in request.args and default is not None:
+        return default
+    vector = vector_arg(name)
+    if not np.array_equal(vector, np.round(vector)):
+        abort(make_response(jsonify({'status': 'error', 'message': f'{name} must be whole block indices'}), 400))
+    return vector.astype(int).tolist()
+
+def check_block_count(shape):
+    """Answer 413 for regions of more than MAX_BLOCK_MODEL_BLOCKS blocks"""
+    blocks = int(np.prod(shape))
+    if blocks > MAX_BLOCK_MODEL_BLOCKS:
+        abort(make_response(jsonify({
+            'status': 'error',
+            'message': f'{blocks} blocks requested, at most {MAX_BLOCK_MODEL_BLOCKS}; use a step'
+        }), 413))
+
+def stream_block_region(model, region):
+    """Stream a region's manifest and variable views as a binary bundle, copied out a chunk at a time"""
+    manifest, views = region
+    check_block_count(manifest['shape'])
+    length, chunks = stream_buffer_bundle(dict(manifest, model=model.manifest['name']), views)
+    response = Response(chunks, mimetype=BUNDLE_MIME_TYPE)
+    response.content_length = length
+    return response
+
+@app.route('/api/block-model')
+def block_model_index():
+    """Saved block models: grid origin, block size, shape and variables
+
+    Models whose files cannot be read are listed under errors rather than failing the index.
+    """
+    described, errors = [], []
+    try:
+        names = block_models.names()
+    except OSError as e:
+        return jsonify({'status': 'error', 'message': f'cannot list block models: {e}'}), 500
+    for name in names:
+        try:
+            described.append(block_models.load(name).describe())
+        except (BlockModelError,) + BROKEN_BLOCK_MODEL_ERRORS as e:
+            errors.append({'name': name, 'message': str(e)})
+    return jsonify({'status': 'success', 'block_models': described, 'errors': errors})
+
+@app.route('/api/block-model/slice')
+def block_model_slice():
+    """One plane of blocks (model=name&axis=x|y|z&index=i&variables=grade,variance) as a binary bundle"""
+    model = load_block_model(request.args.get('model'))
+    try:
+        index = int(request.args.get('index', 0))
+        return stream_block_region(model, model.slice(request.args.get('axis', 'z'), index, variables_arg()))
+    except (BlockModelError, ValueError) as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+
+@app.route('/api/block-model/subvolume')
+def block_model_subvolume():
+    """Blocks start=i,j,k up to stop=i,j,k (exclusive), every step=i,j,k, as a binary bundle"""
+    model = load_block_model(request.args.get('model'))
+    start = index_arg('start', [0, 0, 0])
+    stop = index_arg('stop', list(model.grid.shape))
+    step = index_arg('step', [1, 1, 1])
+    try:
+        return stream_block_region(model, model.subvolume(start, stop, step, variables_arg()))
+    except BlockModelError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+
+@app.route('/api/block-model/isosurface')
+def block_model_isosurface():
+    """Grade shell at cutoff (g/t) as float32 positions/normals and uint32 indices
+
+    variable picks the model variable (default grade); start/stop/step
+    restrict and thin the blocks as for /api/block-model/subvolume.
+    """
+    model = load_block_model(request.args.get('model'))
+    # float_arg answers 400 for NaN and infinities; the model refuses them too
+    cutoff = float_arg('cutoff')
+    if cutoff is None:
+        return jsonify({'status': 'error', 'message': 'cutoff is required'}), 400
+    start = index_arg('start', [0, 0, 0])
+    stop = index_arg('stop', list(model.grid.shape))
+    step = index_arg('step', [1, 1, 1])
+    variable = request.args.get('variable', 'grade')
+    try:
+        # The region is built (as views) first so bad indices or steps answer 400 before any counting
+        region, _ = model.subvolume(start, stop, step, [variable])
+        check_block_count(region['shape'])
+        manifest, mesh = model.isosurface(variable, cutoff, start, stop, step)
+    except BlockModelError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    manifest.update(model=model.manifest['name'], vertex_count=len(mesh['positions']),
+                    triangle_count=len(mesh['indices']))
+    length, chunks = stream_buffer_bundle(manifest, mesh)
+    response = Response(chunks, mimetype=BUNDLE_MIME_TYPE)
+    response.content_length = length
+    return response
+
+@app.route('/api/explorer/terrain')
+@response_cache.cached()
+def explorer_terrain():
+    """Ground heights for the explorer page's terrain plane, in its scene frame (EXPLORER_SCENE)
+
+    heights holds (segments + 1)^2 scene y values, row by row from the
+    plane's -z (south) edge, each row running west to east along +x.
+    """
+    segments = min(max(request.args.get('segments', 64, type=int), 1), 256)
+    axis = np.linspace(-EXPLORER_SCENE.size / 2, EXPLORER_SCENE.size / 2, segments + 1)
+    x, z = np.meshgrid(axis, axis)
+    lat, lng = transform(x.ravel(), z.ravel(), 'scene', 'wgs84', scene=EXPLORER_SCENE)
+    _, _, ground = sample_latlng(lat, lng)
+    heights = (ground - EXPLORER_SCENE.base_elevation) * EXPLORER_SCENE.vertical_scale
+    return jsonify({
+        'status': 'success',
+        'frame': EXPLORER_SCENE.describe(),
+        'segments': segments,
+        'heights': finite_or_none(heights, 3)
+    })
+
 @app.route('/api/mining-sites')
+@response_cache.cached()
 def mining_sites():
-    """Comprehensive mining heritage sites with detailed historical data"""
-    return jsonify([
+    """Comprehensive mining heritage sites with detailed historical data
+
+    ground_elevation is the terrain elevation (m) at the site's coordinates
+    and position places the marker there in the explorer scene (EXPLORER_SCENE).
+    """
+    sites = [
         {
             'name': 'Central Deborah Gold Mine',
-            'position': {'x': -15, 'y': 5, 'z': 10},
             'coordinates': {'lat': -36.7574, 'lng': 144.2755},
             'depth': 412,
             'shafts': 17,
@@ -638,7 +1312,6 @@ def mining_sites():
         },
         {
             'name': 'Fortuna Villa Mine',
-            'position': {'x': 20, 'y': 8, 'z': -5},
             'coordinates': {'lat': -36.7623, 'lng': 144.2891},
             'depth': 305,
             'shafts': 12,
@@ -650,7 +1323,6 @@ def mining_sites():
         },
         {
             'name': 'Red White & Blue Extended',
-            'position': {'x': -8, 'y': 12, 'z': 25},
             'coordinates': {'lat': -36.7445, 'lng': 144.2634},
             'depth': 518,
             'shafts': 23,
@@ -660,9 +1332,89 @@ def mining_sites():
             'type': 'reef_system',
             'formation': 'Ordovician quartz veins'
         }
-    ])
+    ]
+    lat = [site['coordinates']['lat'] for site in sites]
+    lng = [site['coordinates']['lng'] for site in sites]
+    _, _, ground = sample_latlng(lat, lng)
+    x, z = transform(lat, lng, 'wgs84', 'scene', scene=EXPLORER_SCENE)
+    y = (ground - EXPLORER_SCENE.base_elevation) * EXPLORER_SCENE.vertical_scale
+    for site, elevation, position in zip(sites, finite_or_none(ground, 2),
+                                         zip(finite_or_none(x, 2), finite_or_none(y, 2), finite_or_none(z, 2))):
+        site['ground_elevation'] = elevation
+        site['position'] = dict(zip('xyz', position))
+    return jsonify(sites)
+
+@app.route('/api/placemarks')
+def placemarks():
+    """Field placemarks from the KML/KMZ exports as a GeoJSON FeatureCollection
+
+    bbox=west,south,east,north (degrees) keeps placemarks whose bounds
+    overlap it; offset/limit page through the matches, in file order.
+    skipped counts placemarks left out because their coordinates were unreadable.
+    """
+    store = load_placemarks(sorted(Path('attached_assets').glob(PLACEMARK_PATTERN)))
+    bbox = vector_arg('bbox', 4) if 'bbox' in request.args else None
+    offset, limit = page_args()
+    matches = store.query(bbox)
+    return jsonify({
+        'type': 'FeatureCollection',
+        'total': int(matches.size),
+        'offset': offset,
+        'limit': limit,
+        'skipped': store.skipped,
+        'features': store.features(matches[offset:offset + limit])
+    })
+
+@app.route('/api/faults')
+def faults():
+    """Fault traces of the GSV interpretation as a GeoJSON FeatureCollection in lng/lat
+
+    bbox=west,south,east,north (degrees) keeps only traces that cross it;
+    offset/limit page through the matches. Properties are the shapefile's
+    attributes (FAULT_NAME, FAULT_TYPE, MOVEMNT_P, EVENT_NAME, ...).
+    """
+    bbox = vector_arg('bbox', 4) if 'bbox' in request.args else None
+    offset, limit = page_args()
+    try:
+        fault_set = load_faults(FAULTS_PATH, FAULTS_FRAME)
+    except (OSError, ValueError) as e:
+        return jsonify({'status': 'error', 'message': f'Fault interpretation unavailable: {e}'}), 404
+    records, lines = fault_set.query(bbox)
+    page = slice(offset, offset + limit)
+    return jsonify({
+        'type': 'FeatureCollection',
+        'total': int(records.size),
+        'offset': offset,
+        'limit': limit,
+        'features': fault_set.features(records[page], lines[page])
+    })
+
+def goldfield_faults():
+    """Named faults crossing the goldfield, longest first, one entry per name"""
+    try:
+        fault_set = load_faults(FAULTS_PATH, FAULTS_FRAME)
+    except (OSError, ValueError):
+        return []
+    records, lines = fault_set.query(GOLDFIELD_BBOX)
+    named = {}
+    for attributes, parts in zip(fault_set.shapes.attributes(records), lines):
+        name = attributes['FAULT_NAME'].title()
+        length_km = round((attributes['Shape_Leng'] or 0) / 1000, 1)
+        if attributes['FAULT_NAME'] in ('', 'UNNAMED') or (name in named and named[name]['length_km'] >= length_km):
+            continue
+        named[name] = {
+            'name': name,
+            'type': attributes['FAULT_TYPE'],
+            'movement': attributes['MOVEMNT_P'],
+            'event': attributes['EVENT_NAME'],
+            'strike': round(strike(parts)),
+            'length_km': length_km,
+            'length': f'{length_km}km'
+        }
+    return sorted(named.values(), key=lambda fault: -fault['length_km'])
 
 @app.route('/api/geological-data')
+@response_cache.cached()
 def geological_data():
     """Enhanced geological data with comprehensive formation details"""
     return jsonify({
@@ -705,11 +1457,8 @@ def geological_data():
             }
         },
         'geological_structures': {
-            'faults': [
-                {'name': 'Eaglehawk Fault', 'strike': 'NE-SW', 'length': '15km', 'displacement': '200m'},
-                {'name': 'Bendigo Fault Zone', 'strike': 'N-S', 'length': '25km', 'displacement': '500m'},
-                {'name': 'Kangaroo Flat Fault', 'strike': 'NW-SE', 'length': '8km', 'displacement': '100m'}
-            ],
+            # From the GSV interpretation; /api/faults serves the traces themselves
+            'faults': goldfield_faults(),
             'anticlines': [
                 {'name': 'Bendigo Anticline', 'axis': 'N-S', 'wavelength': '5km'},
                 {'name': 'Castlemaine Anticline', 'axis': 'NE-SW', 'wavelength': '8km'}
@@ -718,44 +1467,12 @@ def geological_data():
                 {'name': 'Ballarat Syncline', 'axis': 'N-S', 'wavelength': '12km'}
             ]
         },
-        'drill_holes': [
-            {
-                'id': 'BDH001',
-                'coordinates': {'lat': -36.7574, 'lng': 144.2755},
-                'depth': 412,
-                'date_drilled': '1987-03-15',
-                'significant_intervals': [
-                    {'from': 45, 'to': 52, 'grade': '12.5 g/t Au', 'width': '7m'},
-                    {'from': 118, 'to': 125, 'grade': '8.7 g/t Au', 'width': '7m'},
-                    {'from': 234, 'to': 241, 'grade': '15.2 g/t Au', 'width': '7m'}
-                ]
-            },
-            {
-                'id': 'BDH002', 
-                'coordinates': {'lat': -36.7623, 'lng': 144.2891},
-                'depth': 305,
-                'date_drilled': '1989-07-22',
-                'significant_intervals': [
-                    {'from': 67, 'to': 74, 'grade': '9.8 g/t Au', 'width': '7m'},
-                    {'from': 156, 'to': 163, 'grade': '11.3 g/t Au', 'width': '7m'}
-                ]
-            },
-            {
-                'id': 'BDH003',
-                'coordinates': {'lat': -36.7445, 'lng': 144.2634},
-                'depth': 518,
-                'date_drilled': '1985-11-08',
-                'significant_intervals': [
-                    {'from': 89, 'to': 96, 'grade': '18.4 g/t Au', 'width': '7m'},
-                    {'from': 201, 'to': 208, 'grade': '22.1 g/t Au', 'width': '7m'},
-                    {'from': 345, 'to': 352, 'grade': '14.7 g/t Au', 'width': '7m'}
-                ]
-            }
-        ]
+        'drill_holes': SAMPLE_DRILL_HOLES
     })
 
 if __name__ == '__main__':
     print("Starting Bendigo 3D Underground Explorer - Python Backend")
     print("Geological data processing: NumPy + Flask")
     print("Access at: http://localhost:5000")
+    prepare_texture_pyramids()
     app.run(host='0.0.0.0', port=5000, debug=False)
\ No newline at end of file
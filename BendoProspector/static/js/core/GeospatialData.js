@@ -198,10 +198,8 @@ class GeospatialData {
     }
 
     createFaultVisualization(fault) {
-        const geometry = new THREE.PlaneGeometry(
-            parseFloat(fault.length.replace('km', '')) * 2, 
-            20
-        );
+        const lengthKm = fault.length_km ?? parseFloat(fault.length.replace('km', ''));
+        const geometry = new THREE.PlaneGeometry(lengthKm * 2, 20);
         const material = new THREE.MeshBasicMaterial({
             color: 0xFF0000,
             transparent: true,
@@ -211,6 +209,10 @@ class GeospatialData {
         
         const mesh = new THREE.Mesh(geometry, material);
         mesh.rotation.x = -Math.PI / 2;
+        // Strike is degrees east of north; the plane's length runs along x (east) before rotating
+        if (fault.strike !== undefined) {
+            mesh.rotation.z = THREE.MathUtils.degToRad(fault.strike - 90);
+        }
         mesh.position.y = 0.1;
         
         mesh.userData = {
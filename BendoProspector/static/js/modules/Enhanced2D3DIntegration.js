@@ -39,6 +39,9 @@ class Enhanced2D3DIntegration {
     }
 
     async loadAndProcessTexture(textureConfig) {
+        if (textureConfig.tiles) {
+            return this.loadTiledTexture(textureConfig);
+        }
         return new Promise((resolve, reject) => {
             const loader = new THREE.TextureLoader();
             const timeout = setTimeout(() => {
@@ -77,6 +80,49 @@ class Enhanced2D3DIntegration {
         });
     }
 
+    async loadTiledTexture(textureConfig) {
+        // Composite the few pyramid tiles covering the map rather than downloading the full-size sheet
+        const { west, south, east, north } = textureConfig.coordinates.bounds;
+        const params = new URLSearchParams({ bbox: [west, south, east, north].join(','), max_tiles: 16 });
+        const response = await fetch(`${textureConfig.tiles.viewport_url}?${params}`);
+        if (!response.ok) {
+            // 503 while the server is still cutting the sheet: use the full-size image this time
+            return this.loadAndProcessTexture({ ...textureConfig, tiles: null });
+        }
+        const listing = await response.json();
+
+        // Canvas spans the map's local extent, north up; tiles are placed by their local bounds
+        const eastings = textureConfig.local_corners.map(corner => corner[0]);
+        const northings = textureConfig.local_corners.map(corner => corner[1]);
+        const mapWest = Math.min(...eastings);
+        const mapNorth = Math.max(...northings);
+        const scale = listing.tile_size / listing.tile_extent_m;
+        const canvas = document.createElement('canvas');
+        canvas.width = Math.ceil((Math.max(...eastings) - mapWest) * scale);
+        canvas.height = Math.ceil((mapNorth - Math.min(...northings)) * scale);
+        const context = canvas.getContext('2d');
+        await Promise.all(listing.tiles.map(tile => new Promise(resolve => {
+            const image = new Image();
+            image.onload = () => {
+                context.drawImage(image, (tile.local_bounds.west - mapWest) * scale,
+                                  (mapNorth - tile.local_bounds.north) * scale);
+                resolve();
+            };
+            image.onerror = resolve;
+            image.src = tile.url;
+        })));
+
+        const texture = new THREE.CanvasTexture(canvas);
+        texture.wrapS = THREE.ClampToEdgeWrap;
+        texture.wrapT = THREE.ClampToEdgeWrap;
+        texture.minFilter = THREE.LinearFilter;
+        texture.magFilter = THREE.LinearFilter;
+        texture.flipY = false;
+        texture.generateMipmaps = true;
+        this.createGeologicalOverlay(textureConfig, texture);
+        return texture;
+    }
+
     createGeologicalOverlay(config, texture) {
         // Create high-quality geological overlay with preserved transparency
         const geometry = new THREE.PlaneGeometry(100, 100, 64, 64);
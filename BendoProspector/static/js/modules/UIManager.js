@@ -726,6 +726,10 @@ class UIManager {
             document.getElementById('crossRotValue').textContent = rotation + '°';
             
             window.bendigoApp?.updateCrossSection(x, z, rotation);
+
+            // Cut the DXF model along the plane's line (explorer scene units) once the sliders settle
+            clearTimeout(this.crossSectionTimer);
+            this.crossSectionTimer = setTimeout(() => this.loadCrossSection(x, z, rotation), 200);
         };
 
         document.getElementById('crossSectionEnabled').addEventListener('change', (e) => {
@@ -737,6 +741,32 @@ class UIManager {
         document.getElementById('crossSectionRotation').addEventListener('input', updateCrossSection);
     }
 
+    async loadCrossSection(x, z, rotation) {
+        const request = this.crossSectionRequest = (this.crossSectionRequest || 0) + 1;
+        const angle = rotation * Math.PI / 180;
+        const dx = 50 * Math.cos(angle);
+        const dz = -50 * Math.sin(angle);
+        const params = new URLSearchParams({
+            frame: 'scene',
+            start: `${x - dx},${z - dz}`,
+            end: `${x + dx},${z + dz}`
+        });
+        try {
+            const response = await fetch(`/api/cross-section?${params}`);
+            const section = await response.json();
+            if (request !== this.crossSectionRequest) {
+                return;  // superseded by a later slider position
+            }
+            if (!response.ok) {
+                console.warn(`Cross section unavailable: ${section.message}`);
+                return;
+            }
+            window.bendigoApp?.showCrossSection?.(section);
+        } catch (error) {
+            console.warn('Cross section request failed', error);
+        }
+    }
+
     setupAdvancedControls() {
         // Settings management
         document.getElementById('exportSettings').addEventListener('click', () => {
@@ -57,10 +57,21 @@ async function init() {
 }
 
 async function generateAuthenticTerrain() {
+    try {
+        // Adaptive mesh: few triangles on the flats, full detail on the ridges
+        const response = await fetch('/api/bendigo/elevation/mesh?size=257&max_error=0.25');
+        if (response.ok) {
+            return createTerrainFromMesh(decodeBufferBundle(await response.arrayBuffer()));
+        }
+    } catch (error) {
+        console.warn('Terrain mesh unavailable, falling back to the elevation grid:', error);
+    }
     try {
         // Fetch authentic Bendigo elevation data
-        const response = await fetch('/api/bendigo/elevation');
-        const elevationData = await response.json();
+        const response = await fetch('/api/bendigo/elevation', {
+            headers: { 'Accept': 'application/octet-stream' }
+        });
+        const elevationData = decodeElevationGrid(await response.arrayBuffer());
         
         return createTerrainFromData(elevationData);
     } catch (error) {
@@ -69,21 +80,93 @@ async function generateAuthenticTerrain() {
     }
 }
 
+function decodeElevationGrid(buffer) {
+    // 36-byte little-endian header followed by rows * cols float32 cells
+    const header = new DataView(buffer);
+    const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+    if (magic !== 'BGEL') {
+        throw new Error('Unexpected elevation payload');
+    }
+    const headerSize = header.getUint16(6, true);
+    const rows = header.getUint32(8, true);
+    const cols = header.getUint32(12, true);
+
+    return {
+        segments: rows,
+        rows: rows,
+        cols: cols,
+        base_elevation: header.getFloat32(24, true),
+        elevation_range: [header.getFloat32(28, true), header.getFloat32(32, true)],
+        // View the response body in place - no per-cell parsing or copying
+        grid: new Float32Array(buffer, headerSize, rows * cols)
+    };
+}
+
+function decodeBufferBundle(buffer) {
+    // BGDX bundle: 12-byte header, JSON manifest, then aligned typed-array buffers
+    const manifestLength = new DataView(buffer).getUint32(8, true);
+    const manifest = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 12, manifestLength)));
+    const dataStart = 12 + manifestLength;
+    manifest.view = (name, ArrayType) => {
+        const spec = manifest.buffers[name];
+        const count = spec.shape.reduce((a, b) => a * b, 1);
+        return new ArrayType(buffer, dataStart + spec.offset, count);
+    };
+    return manifest;
+}
+
+function createTerrainFromMesh(mesh) {
+    // Server positions are east/north/elevation metres; the scene spans 300 units, y up,
+    // with east along x and north along z as in createTerrainFromData
+    const source = mesh.view('positions', Float32Array);
+    const scale = 300 / (mesh.extent_km * 1000);
+    const positions = new Float32Array(source.length);
+    for (let i = 0; i < source.length; i += 3) {
+        positions[i] = source[i] * scale;
+        positions[i + 1] = (source[i + 2] - mesh.base_elevation) * 0.3;
+        positions[i + 2] = source[i + 1] * scale;
+    }
+    // Mapping north to +z mirrors the mesh, so reverse each triangle to keep it facing up
+    const indices = mesh.view('indices', Uint32Array).slice();
+    for (let i = 0; i < indices.length; i += 3) {
+        const second = indices[i + 1];
+        indices[i + 1] = indices[i + 2];
+        indices[i + 2] = second;
+    }
+
+    const geometry = new THREE.BufferGeometry();
+    geometry.setAttribute('position', new THREE.BufferAttribute(positions, 3));
+    geometry.setIndex(new THREE.BufferAttribute(indices, 1));
+    geometry.computeVertexNormals();
+
+    const material = new THREE.MeshStandardMaterial({
+        color: 0x8B7355,
+        roughness: 0.8,
+        metalness: 0.1,
+        flatShading: false,
+    });
+
+    const terrain = new THREE.Mesh(geometry, material);
+    terrain.receiveShadow = true;
+    return terrain;
+}
+
 function createTerrainFromData(elevationData) {
     const geometry = new THREE.PlaneGeometry(300, 300, elevationData.segments, elevationData.segments);
     geometry.rotateX(-Math.PI / 2);
 
     const positions = geometry.attributes.position.array;
-    const gridData = elevationData.grid_data;
+    const grid = elevationData.grid;
+    const { rows, cols } = elevationData;
     
     // Apply authentic elevation data
     for (let i = 0; i < positions.length; i += 3) {
         const x = Math.floor((positions[i] + 150) / 300 * elevationData.segments);
         const z = Math.floor((positions[i + 2] + 150) / 300 * elevationData.segments);
         
-        if (gridData && gridData[x] && gridData[x][z]) {
+        if (x >= 0 && x < rows && z >= 0 && z < cols) {
             // Convert real elevation to scene units
-            const realElevation = gridData[x][z];
+            const realElevation = grid[x * cols + z];
             positions[i + 1] = (realElevation - elevationData.base_elevation) * 0.3;
         }
     }
@@ -186,9 +269,15 @@ async function addBendigoMiningSites() {
 }
 
 function addMiningSiteMarker(site) {
-    // Convert GPS coordinates to scene coordinates (simplified mapping)
-    const x = (site.coordinates[1] - 144.2831) * 3000; // Longitude offset from Central Deborah
-    const z = (site.coordinates[0] + 36.7586) * 3000;  // Latitude offset
+    // The server places sites in the scene frame of the terrain mesh, on the sampled ground
+    let x, z, ground = 0;
+    if (site.scene) {
+        [x, ground, z] = site.scene;
+    } else {
+        // Convert GPS coordinates to scene coordinates (simplified mapping)
+        x = (site.coordinates[1] - 144.2831) * 3000; // Longitude offset from Central Deborah
+        z = (site.coordinates[0] + 36.7586) * 3000;  // Latitude offset
+    }
     
     // Create mining shaft marker
     const geometry = new THREE.CylinderGeometry(3, 3, 10, 8);
@@ -199,7 +288,7 @@ function addMiningSiteMarker(site) {
     });
     
     const marker = new THREE.Mesh(geometry, material);
-    marker.position.set(x, 5, z);
+    marker.position.set(x, ground + 5, z);
     marker.userData = site;
     scene.add(marker);
     
@@ -211,7 +300,7 @@ function addMiningSiteMarker(site) {
         opacity: 0.6
     });
     const shaft = new THREE.Mesh(shaftGeometry, shaftMaterial);
-    shaft.position.set(x, -(site.depth * 0.05), z);
+    shaft.position.set(x, ground - site.depth * 0.05, z);
     scene.add(shaft);
     
     // Add heritage placard
@@ -220,7 +309,7 @@ function addMiningSiteMarker(site) {
         color: 0x8B4513
     });
     const placard = new THREE.Mesh(placardGeometry, placardMaterial);
-    placard.position.set(x, 12, z);
+    placard.position.set(x, ground + 12, z);
     placard.userData = { type: 'placard', site: site.name, production: site.production };
     scene.add(placard);
 }
@@ -0,0 +1,104 @@
+# terrain/contours.py
+"""
+Contour lines
+Marching squares over elevation grids: every (cell, contour level) pair the
+surface crosses is found and cut in one pass of array operations, with no
+loop over levels. Segment ends are interpolated along each grid edge from
+its lower-index corner, so neighbouring cells (and tiles sharing border
+samples) produce identical points and stitch_segments can join them.
+"""
+import numpy as np
+
+from .polylines import stitch_segments
+
+DEFAULT_CONTOUR_INTERVAL = 5.0  # metres
+# Rounding used to match segment ends when stitching, in the grid's units
+STITCH_DECIMALS = 3
+
+# Cell corners (di, dj) in bit order: (0,0) bit 0, (1,0) bit 1, (1,1) bit 2, (0,1) bit 3
+CORNERS = np.array([(0, 0), (1, 0), (1, 1), (0, 1)])
+# Cell edges as (from corner, to corner), each running from its lower-index end:
+# 0 along i at j, 1 along j at i + 1, 2 along i at j + 1, 3 along j at i
+EDGES = np.array([(0, 1), (1, 2), (3, 2), (0, 3)])
+
+def _segment_table():
+    """(2, 16, 2, 2) edge pairs of up to two segments per corner mask, indexed [centre inside, case]
+
+    Corners at or above the level are inside. The two saddle cases are split
+    according to whether the cell centre (mean of the corners) is inside.
+    """
+    table = np.full((2, 16, 2, 2), -1, dtype=np.int64)
+    single = {1: (3, 0), 2: (0, 1), 3: (3, 1), 4: (1, 2), 6: (0, 2), 7: (3, 2), 8: (2, 3),
+              9: (0, 2), 11: (1, 2), 12: (1, 3), 13: (0, 1), 14: (3, 0)}
+    for case, edges in single.items():
+        table[:, case, 0] = edges
+    # Centre inside: the inside corners join and the outside corners are cut off, and vice versa
+    table[1, 5] = [(0, 1), (2, 3)]
+    table[0, 5] = [(3, 0), (1, 2)]
+    table[1, 10] = [(3, 0), (1, 2)]
+    table[0, 10] = [(0, 1), (2, 3)]
+    return table
+
+SEGMENT_TABLE = _segment_table()
+
+def contour_levels(low, high, interval, base=0.0):
+    """Levels base + k * interval within [low, high]"""
+    first = np.ceil((low - base) / interval)
+    last = np.floor((high - base) / interval)
+    return base + np.arange(first, last + 1) * interval
+
+def contour_segments(grid, interval=DEFAULT_CONTOUR_INTERVAL, origin=(0.0, 0.0), spacing=(1.0, 1.0), base=0.0):
+    """(n, 2, 3) contour segments of grid at base + k * interval, as (x, y, level) ends
+
+    grid[i, j] is the value at origin + (i, j) * spacing.
+    """
+    grid = np.asarray(grid, dtype=np.float64)
+    cols = grid.shape[1] - 1
+    low = np.minimum(np.minimum(grid[:-1, :-1], grid[1:, :-1]), np.minimum(grid[1:, 1:], grid[:-1, 1:]))
+    high = np.maximum(np.maximum(grid[:-1, :-1], grid[1:, :-1]), np.maximum(grid[1:, 1:], grid[:-1, 1:]))
+
+    # (cell, level) pairs: every level in (low, high] of a cell crosses it
+    first = np.floor((low - base) / interval).astype(np.int64) + 1
+    count = np.floor((high - base) / interval).astype(np.int64) - first + 1
+    cells = np.flatnonzero(count > 0)
+    if not cells.size:
+        return np.empty((0, 2, 3))
+    counts = count.ravel()[cells]
+    pair_cell = np.repeat(cells, counts)
+    within = np.arange(len(pair_cell)) - np.repeat(np.cumsum(counts) - counts, counts)
+    pair_level = base + interval * (np.repeat(first.ravel()[cells], counts) + within)
+
+    # Corner values of just the crossed cells, gathered by flat index
+    ci, cj = np.divmod(pair_cell, cols)
+    corner = ci * grid.shape[1] + cj
+    flat = grid.ravel()
+    values = np.stack([flat[corner], flat[corner + grid.shape[1]], flat[corner + grid.shape[1] + 1],
+                       flat[corner + 1]], axis=1)                        # (pairs, 4) in CORNERS order
+    inside = values >= pair_level[:, None]
+    case = inside @ (1 << np.arange(4))
+    centre = values.mean(axis=1) >= pair_level
+
+    segments = []
+    for slot in range(2):
+        edges = SEGMENT_TABLE[centre.astype(np.int64), case, slot]      # (pairs, 2)
+        hit = edges[:, 0] >= 0
+        edges = edges[hit]
+        ends = EDGES[edges]                                             # (hits, 2 ends, 2 corners)
+        a = np.take_along_axis(values[hit], ends[..., 0], 1)               # (hits, 2 ends)
+        b = np.take_along_axis(values[hit], ends[..., 1], 1)
+        t = (pair_level[hit, None] - a) / (b - a)
+        offset = CORNERS[ends[..., 0]] + t[..., None] * (CORNERS[ends[..., 1]] - CORNERS[ends[..., 0]])
+        x = origin[0] + (ci[hit, None] + offset[..., 0]) * spacing[0]
+        y = origin[1] + (cj[hit, None] + offset[..., 1]) * spacing[1]
+        level = np.broadcast_to(pair_level[hit, None], x.shape)
+        segments.append(np.stack([x, y, level], axis=-1))
+    return np.concatenate(segments)
+
+def contour_polylines(segments, decimals=STITCH_DECIMALS):
+    """[(level, (k, 2) polyline)] joined from contour_segments output, possibly of several tiles"""
+    # Where a sample lies exactly on a level (common with whole-metre elevations)
+    # cells can cut it to a point; dropping those leaves the chain through it intact
+    segments = np.asarray(segments)
+    rounded = np.round(segments[:, :, :2], decimals)
+    segments = segments[(rounded[:, 0] != rounded[:, 1]).any(axis=1)]
+    return [(float(line[0, 2]), line[:, :2]) for line in stitch_segments(segments, decimals)]
@@ -0,0 +1,216 @@
+# terrain/coordinates.py
+"""
+Coordinate reference frames
+Vectorized conversion between WGS84 latitude/longitude, MGA zone 54/55 grid
+coordinates (transverse Mercator on GRS80, by Krüger's series to sub-mm),
+the model's local frame (MGA55 metres east/north of the Bendigo CBD, which
+the terrain, block model and DXF data share) and the Three.js scene.
+Every conversion is a fixed number of whole-array operations, so millions of
+vertices convert in one call. GDA94/GDA2020 and WGS84 are treated as the
+same datum: they differ by under 2 m, below the terrain model's resolution.
+"""
+import numpy as np
+
+# GRS80 ellipsoid and the MGA projection parameters
+SEMI_MAJOR_AXIS = 6378137.0
+FLATTENING = 1 / 298.257222101
+SCALE_FACTOR = 0.9996
+FALSE_EASTING = 500000.0
+FALSE_NORTHING = 10000000.0  # southern hemisphere
+MGA_ZONES = (54, 55)
+
+# Model origin: Bendigo CBD as latitude/longitude and as MGA zone 55 easting/northing
+CBD_LATLNG = (-36.7606, 144.2831)
+CBD_MGA55 = (257479.15, 5928241.79)
+
+# Frames accepted by transform(): (lat, lng) degrees, MGA (easting, northing),
+# local (east, north) metres and scene (x, z) units
+FRAMES = ('wgs84', 'mga54', 'mga55', 'local', 'scene')
+# Samples per edge when projecting a lat/lng box, since its edges curve on the grid
+BOUNDS_EDGE_SAMPLES = 16
+BOUNDS_MARGIN = 10.0  # metres, covering the curvature between edge samples
+
+_n = FLATTENING / (2 - FLATTENING)
+# Rectifying radius and Krüger's alpha (forward) and beta (inverse) coefficients to n**6
+_RECTIFYING_RADIUS = SEMI_MAJOR_AXIS / (1 + _n) * (1 + _n ** 2 / 4 + _n ** 4 / 64 + _n ** 6 / 256)
+_ALPHA = np.array([
+    _n / 2 - 2 * _n ** 2 / 3 + 5 * _n ** 3 / 16 + 41 * _n ** 4 / 180 - 127 * _n ** 5 / 288 + 7891 * _n ** 6 / 37800,
+    13 * _n ** 2 / 48 - 3 * _n ** 3 / 5 + 557 * _n ** 4 / 1440 + 281 * _n ** 5 / 630 - 1983433 * _n ** 6 / 1935360,
+    61 * _n ** 3 / 240 - 103 * _n ** 4 / 140 + 15061 * _n ** 5 / 26880 + 167603 * _n ** 6 / 181440,
+    49561 * _n ** 4 / 161280 - 179 * _n ** 5 / 168 + 6601661 * _n ** 6 / 7257600,
+    34729 * _n ** 5 / 80640 - 3418889 * _n ** 6 / 1995840,
+    212378941 * _n ** 6 / 319334400
+])
+_BETA = np.array([
+    _n / 2 - 2 * _n ** 2 / 3 + 37 * _n ** 3 / 96 - _n ** 4 / 360 - 81 * _n ** 5 / 512 + 96199 * _n ** 6 / 604800,
+    _n ** 2 / 48 + _n ** 3 / 15 - 437 * _n ** 4 / 1440 + 46 * _n ** 5 / 105 - 1118711 * _n ** 6 / 3870720,
+    17 * _n ** 3 / 480 - 37 * _n ** 4 / 840 - 209 * _n ** 5 / 4480 + 5569 * _n ** 6 / 90720,
+    4397 * _n ** 4 / 161280 - 11 * _n ** 5 / 504 - 830251 * _n ** 6 / 7257600,
+    4583 * _n ** 5 / 161280 - 108847 * _n ** 6 / 3991680,
+    20648693 * _n ** 6 / 638668800
+])
+_ECCENTRICITY = np.sqrt(FLATTENING * (2 - FLATTENING))
+
+def _sine_series(coefficients, xi, eta):
+    """sum of c_k sin(2k(xi + i eta)) as (real, imaginary) arrays, by Clenshaw's recurrence
+
+    One complex sine and cosine replace the 4 * 6 trigonometric and
+    hyperbolic functions per point of summing the series term by term.
+    """
+    angle = 2 * (xi + 1j * eta)
+    twice_cos = 2 * np.cos(angle)
+    current = np.zeros_like(angle)
+    previous = np.zeros_like(angle)
+    for coefficient in coefficients[::-1]:
+        current, previous = coefficient + twice_cos * current - previous, current
+    total = current * np.sin(angle)
+    return total.real, total.imag
+
+def central_meridian(zone):
+    return 6.0 * zone - 183.0
+
+def mga_zone(lng):
+    """MGA zone containing a longitude (scalar or array)"""
+    return (np.floor((np.asarray(lng) + 180) / 6) + 1).astype(int)
+
+def _check_zone(zone):
+    if zone not in MGA_ZONES:
+        raise ValueError(f'MGA zone must be one of {MGA_ZONES}, not {zone}')
+
+def wgs84_to_mga(lat, lng, zone=55):
+    """(easting, northing) arrays of lat/lng degrees projected into an MGA zone"""
+    _check_zone(zone)
+    phi = np.radians(np.asarray(lat, dtype=np.float64))
+    omega = np.radians(np.asarray(lng, dtype=np.float64) - central_meridian(zone))
+    # Conformal latitude, then Gauss-Schreiber coordinates, then the Krüger series
+    sigma = np.sinh(_ECCENTRICITY * np.arctanh(_ECCENTRICITY * np.sin(phi)))
+    tan_conformal = np.tan(phi) * np.sqrt(1 + sigma ** 2) - sigma * np.sqrt(1 + np.tan(phi) ** 2)
+    xi_prime = np.arctan2(tan_conformal, np.cos(omega))
+    eta_prime = np.arcsinh(np.sin(omega) / np.hypot(tan_conformal, np.cos(omega)))
+    xi_series, eta_series = _sine_series(_ALPHA, xi_prime, eta_prime)
+    xi, eta = xi_prime + xi_series, eta_prime + eta_series
+    return (FALSE_EASTING + SCALE_FACTOR * _RECTIFYING_RADIUS * eta,
+            FALSE_NORTHING + SCALE_FACTOR * _RECTIFYING_RADIUS * xi)
+
+def mga_to_wgs84(easting, northing, zone=55):
+    """(lat, lng) degree arrays of MGA grid coordinates in a zone"""
+    _check_zone(zone)
+    eta = (np.asarray(easting, dtype=np.float64) - FALSE_EASTING) / (SCALE_FACTOR * _RECTIFYING_RADIUS)
+    xi = (np.asarray(northing, dtype=np.float64) - FALSE_NORTHING) / (SCALE_FACTOR * _RECTIFYING_RADIUS)
+    xi_series, eta_series = _sine_series(_BETA, xi, eta)
+    xi_prime, eta_prime = xi - xi_series, eta - eta_series
+    tan_conformal = np.sin(xi_prime) / np.hypot(np.sinh(eta_prime), np.cos(xi_prime))
+    omega = np.arctan2(np.sinh(eta_prime), np.cos(xi_prime))
+
+    # Conformal latitude back to geodetic: Newton iterations on tan(phi), two reach double precision
+    tan_phi = tan_conformal.copy()
+    for _ in range(2):
+        sigma = np.sinh(_ECCENTRICITY * np.arctanh(_ECCENTRICITY * tan_phi / np.sqrt(1 + tan_phi ** 2)))
+        tan_estimate = tan_phi * np.sqrt(1 + sigma ** 2) - sigma * np.sqrt(1 + tan_phi ** 2)
+        step = ((tan_conformal - tan_estimate) / np.sqrt(1 + tan_estimate ** 2)
+                * (1 + (1 - _ECCENTRICITY ** 2) * tan_phi ** 2)
+                / ((1 - _ECCENTRICITY ** 2) * np.sqrt(1 + tan_phi ** 2)))
+        tan_phi = tan_phi + step
+    return np.degrees(np.arctan(tan_phi)), central_meridian(zone) + np.degrees(omega)
+
+def mga_to_mga(easting, northing, source_zone, target_zone):
+    """Grid coordinates reprojected between MGA zones (via lat/lng)"""
+    if source_zone == target_zone:
+        return np.asarray(easting, dtype=np.float64), np.asarray(northing, dtype=np.float64)
+    return wgs84_to_mga(*mga_to_wgs84(easting, northing, source_zone), target_zone)
+
+class SceneFrame:
+    """Mapping between local metres and the Three.js scene the terrain client draws
+
+    The survey extent spans `size` scene units with the CBD at the origin;
+    y is up, east runs along +x and north along +z, as terrain.js lays out
+    the terrain mesh. Elevations are shifted by base_elevation and scaled by
+    vertical_scale (scene units per metre).
+    """
+
+    def __init__(self, extent_km=12.0, size=300.0, base_elevation=210.0, vertical_scale=0.3):
+        self.extent_km = extent_km
+        self.size = size
+        self.base_elevation = base_elevation
+        self.vertical_scale = vertical_scale
+        self.scale = size / (extent_km * 1000)
+
+    def to_scene(self, east, north, elevation=None):
+        """(x, z) scene arrays, or (x, y, z) when elevations are given"""
+        x = np.asarray(east, dtype=np.float64) * self.scale
+        z = np.asarray(north, dtype=np.float64) * self.scale
+        if elevation is None:
+            return x, z
+        return x, (np.asarray(elevation, dtype=np.float64) - self.base_elevation) * self.vertical_scale, z
+
+    def from_scene(self, x, z, y=None):
+        """(east, north) metres, or (east, north, elevation) when scene y is given"""
+        east = np.asarray(x, dtype=np.float64) / self.scale
+        north = np.asarray(z, dtype=np.float64) / self.scale
+        if y is None:
+            return east, north
+        return east, north, np.asarray(y, dtype=np.float64) / self.vertical_scale + self.base_elevation
+
+    def describe(self):
+        return {
+            'extent_km': self.extent_km,
+            'size': self.size,
+            'base_elevation': self.base_elevation,
+            'vertical_scale': self.vertical_scale,
+            'axes': {'x': 'east', 'y': 'up', 'z': 'north'}
+        }
+
+DEFAULT_SCENE = SceneFrame()
+
+def _to_mga55(a, b, frame, scene):
+    if frame == 'wgs84':
+        return wgs84_to_mga(a, b, 55)
+    if frame == 'mga54':
+        return mga_to_mga(a, b, 54, 55)
+    if frame == 'mga55':
+        return np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64)
+    if frame == 'scene':
+        a, b = scene.from_scene(a, b)
+    return np.asarray(a, dtype=np.float64) + CBD_MGA55[0], np.asarray(b, dtype=np.float64) + CBD_MGA55[1]
+
+def _from_mga55(easting, northing, frame, scene):
+    if frame == 'wgs84':
+        return mga_to_wgs84(easting, northing, 55)
+    if frame == 'mga54':
+        return mga_to_mga(easting, northing, 55, 54)
+    if frame == 'mga55':
+        return easting, northing
+    east, north = easting - CBD_MGA55[0], northing - CBD_MGA55[1]
+    return scene.to_scene(east, north) if frame == 'scene' else (east, north)
+
+def transform(a, b, source, target, scene=DEFAULT_SCENE):
+    """Convert coordinate arrays between FRAMES, via MGA55
+
+    wgs84 pairs are (lat, lng); MGA pairs (easting, northing); local pairs
+    (east, north) metres from the CBD; scene pairs (x, z).
+    """
+    for frame in (source, target):
+        if frame not in FRAMES:
+            raise ValueError(f"unknown frame {frame!r}: expected one of {', '.join(FRAMES)}")
+    if source == target:
+        return np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64)
+    return _from_mga55(*_to_mga55(a, b, source, scene), target, scene)
+
+def latlng_to_local(lat, lng):
+    """East/north metres from the CBD on the MGA55 grid, the frame shared by every model"""
+    return transform(lat, lng, 'wgs84', 'local')
+
+def local_to_latlng(east, north):
+    """(lat, lng) of east/north metres from the CBD; the inverse of latlng_to_local"""
+    return transform(east, north, 'local', 'wgs84')
+
+def bounds_in_frame(bbox, frame, samples=BOUNDS_EDGE_SAMPLES):
+    """(low, high) corners in a metric frame bounding a (west, south, east, north) degree box"""
+    west, south, east, north = bbox
+    t = np.linspace(0, 1, samples)
+    lng = np.concatenate([west + (east - west) * t, np.full(samples, east),
+                          east - (east - west) * t, np.full(samples, west)])
+    lat = np.concatenate([np.full(samples, south), south + (north - south) * t,
+                          np.full(samples, north), north - (north - south) * t])
+    a, b = transform(lat, lng, 'wgs84', frame)
+    return (np.array([a.min(), b.min()]) - BOUNDS_MARGIN, np.array([a.max(), b.max()]) + BOUNDS_MARGIN)
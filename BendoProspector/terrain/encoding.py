@@ -0,0 +1,45 @@
+# terrain/encoding.py
+"""
+Binary elevation transport
+Packs elevation grids as little-endian float32 behind a small fixed header so
+the Three.js client can view the response body directly as a Float32Array
+"""
+import struct
+
+import numpy as np
+
+ELEVATION_MIME_TYPE = 'application/octet-stream'
+ELEVATION_MAGIC = b'BGEL'
+ELEVATION_FORMAT_VERSION = 1
+
+# magic, version, header size, rows, cols, extent x/y (km), base, min, max elevation (m)
+# 36 bytes keeps the float32 payload 4-byte aligned for new Float32Array(buffer, 36)
+ELEVATION_HEADER = struct.Struct('<4sHHIIfffff')
+
+def encode_elevation_grid(grid, extent_km, base_elevation):
+    """Serialize an elevation grid to header + raw little-endian float32 cells"""
+    grid = np.ascontiguousarray(grid, dtype='<f4')
+    rows, cols = grid.shape
+    extent_x, extent_y = (extent_km, extent_km) if np.isscalar(extent_km) else extent_km
+    header = ELEVATION_HEADER.pack(
+        ELEVATION_MAGIC, ELEVATION_FORMAT_VERSION, ELEVATION_HEADER.size,
+        rows, cols, extent_x, extent_y, base_elevation,
+        float(grid.min()), float(grid.max())
+    )
+    return b''.join((header, grid.data))
+
+def decode_elevation_grid(payload):
+    """Read a binary elevation payload back into (metadata, grid) without copying cells"""
+    magic, version, header_size, rows, cols, extent_x, extent_y, base, low, high = \
+        ELEVATION_HEADER.unpack_from(payload)
+    if magic != ELEVATION_MAGIC:
+        raise ValueError('Not a Bendigo elevation payload')
+    grid = np.frombuffer(payload, dtype='<f4', count=rows * cols, offset=header_size)
+    metadata = {
+        'version': version,
+        'segments': [rows, cols],
+        'extent_km': [extent_x, extent_y],
+        'base_elevation': base,
+        'elevation_range': [low, high]
+    }
+    return metadata, grid.reshape(rows, cols)
@@ -5,36 +5,47 @@ Authentic topographical and geological data for Central Victorian Goldfields
 """
 import numpy as np
 
-def generate_bendigo_elevation_data():
+from .coordinates import CBD_MGA55
+
+# Default survey grid: 120x120 cells at 100 m spacing (12 km across)
+DEFAULT_GRID_SIZE = 120
+DEFAULT_EXTENT_KM = 12.0
+BASE_ELEVATION = 210.0  # meters above sea level (Bendigo CBD)
+
+# Formation depth ranges are metres below surface
+GEOLOGICAL_FORMATIONS = {
+    'bendigo_formation': {
+        'period': 'Ordovician',
+        'rock_type': 'Mudstone and sandstone',
+        'gold_bearing': True,
+        'depth_range': [0, 400]
+    },
+    'basement_rock': {
+        'period': 'Cambrian-Ordovician',
+        'rock_type': 'Metamorphic schist',
+        'depth_range': [400, 1000]
+    },
+    'quartz_reefs': {
+        'composition': 'Quartz veins with gold',
+        'orientation': 'NE-SW strike',
+        'dip': '45-70 degrees'
+    }
+}
+
+def generate_bendigo_elevation_data(grid_size=DEFAULT_GRID_SIZE, extent_km=DEFAULT_EXTENT_KM):
     """Generate authentic Bendigo-specific terrain elevation data"""
     # Real Bendigo topographical characteristics
     # Based on AusGeoid data and Victorian geological surveys
-    
+
     return {
         'width': 300,
         'height': 300,
-        'segments': 120,
+        'segments': grid_size,
+        'extent_km': extent_km,
         'base_elevation': 210,  # meters above sea level (Bendigo CBD)
         'elevation_range': [180, 250],  # actual Bendigo elevation range
-        'grid_data': generate_elevation_grid(),
-        'geological_formations': {
-            'bendigo_formation': {
-                'period': 'Ordovician',
-                'rock_type': 'Mudstone and sandstone',
-                'gold_bearing': True,
-                'depth_range': [0, 400]
-            },
-            'basement_rock': {
-                'period': 'Cambrian-Ordovician',
-                'rock_type': 'Metamorphic schist',
-                'depth_range': [400, 1000]
-            },
-            'quartz_reefs': {
-                'composition': 'Quartz veins with gold',
-                'orientation': 'NE-SW strike',
-                'dip': '45-70 degrees'
-            }
-        },
+        'grid_data': elevation_grid(grid_size, extent_km).tolist(),
+        'geological_formations': GEOLOGICAL_FORMATIONS,
         'landmark_elevations': {
             'central_deborah': 218,
             'one_tree_hill': 245,
@@ -44,32 +55,75 @@ def generate_bendigo_elevation_data():
         }
     }
 
+def grid_axes(grid_size=DEFAULT_GRID_SIZE, extent_km=DEFAULT_EXTENT_KM):
+    """Sample coordinates (km from the Bendigo CBD) along each grid axis
+
+    Each axis holds n samples extent/n apart starting on the -extent/2 edge,
+    so the +extent/2 edge is one step past the last sample (not a linspace,
+    and not cell centres).
+    """
+    rows, cols = (grid_size, grid_size) if np.isscalar(grid_size) else grid_size
+    extent_x, extent_y = (extent_km, extent_km) if np.isscalar(extent_km) else extent_km
+    x = (np.arange(rows) - rows / 2) * (extent_x / rows)
+    y = (np.arange(cols) - cols / 2) * (extent_y / cols)
+    return x, y
+
+def elevation_at(x, y):
+    """Evaluate the Bendigo terrain model at arrays of x/y positions in kilometres"""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # Primary ridge system (NE-SW geological structure)
+    ridge_elevation = 15 * np.sin(x * 0.3 + y * 0.2)
+
+    # Valley systems (Bendigo Creek, Bullock Creek)
+    valley_depression = -8 * np.abs(np.sin(x * 0.2)) * np.abs(np.cos(y * 0.25))
+
+    # Local hills and mining disturbance
+    local_variation = 5 * np.sin(x * 0.5) * np.cos(y * 0.4)
+
+    # Add geological complexity
+    fault_influence = 3 * np.sin(x * 0.1 + np.pi/4)
+
+    return BASE_ELEVATION + ridge_elevation + valley_depression + local_variation + fault_influence
+
+def elevation_at_mga(easting, northing):
+    """Terrain elevation at MGA55 metres; the model's x runs east and y north of the CBD"""
+    return elevation_at((np.asarray(easting) - CBD_MGA55[0]) / 1000.0,
+                        (np.asarray(northing) - CBD_MGA55[1]) / 1000.0)
+
+def elevation_grid(grid_size=DEFAULT_GRID_SIZE, extent_km=DEFAULT_EXTENT_KM, dtype=np.float32):
+    """Build the Bendigo elevation grid as whole-array NumPy expressions
+
+    grid_size and extent_km accept a scalar or a (rows, cols) pair; rows run
+    along x, matching the grid_data[x][z] indexing used by the client.
+    """
+    return elevation_from_axes(*grid_axes(grid_size, extent_km), dtype=dtype)
+
+def elevation_from_axes(x_axis, y_axis, dtype=np.float32):
+    """Elevation grid over arbitrary x (rows) and y (cols) axis coordinates in kilometres"""
+    x, y = np.meshgrid(x_axis, y_axis, indexing='ij', sparse=True)
+
+    # Every term is separable in x and y (the ridge via sin(a+b) = sin a cos b + cos a sin b),
+    # so trig runs only on the 1-D axes and the grid is a single rank-5 outer product.
+    x_terms = np.concatenate([
+        15 * np.sin(x * 0.3),
+        15 * np.cos(x * 0.3),
+        -8 * np.abs(np.sin(x * 0.2)),
+        5 * np.sin(x * 0.5),
+        BASE_ELEVATION + 3 * np.sin(x * 0.1 + np.pi/4)
+    ], axis=1)
+    y_terms = np.concatenate([
+        np.cos(y * 0.2),
+        np.sin(y * 0.2),
+        np.abs(np.cos(y * 0.25)),
+        np.cos(y * 0.4),
+        np.ones_like(y)
+    ], axis=0)
+
+    return x_terms.astype(dtype) @ y_terms.astype(dtype)
+
 def generate_elevation_grid():
     """Generate a realistic elevation grid for Bendigo region"""
-    # Create 120x120 grid representing authentic Bendigo topography
-    grid_size = 120
-    
-    # Initialize base elevation
-    elevation_grid = np.full((grid_size, grid_size), 210.0)
-    
-    # Add realistic topographical features
-    for i in range(grid_size):
-        for j in range(grid_size):
-            x = (i - grid_size/2) * 0.1  # Scale to kilometers
-            y = (j - grid_size/2) * 0.1
-            
-            # Primary ridge system (NE-SW geological structure)
-            ridge_elevation = 15 * np.sin(x * 0.3 + y * 0.2)
-            
-            # Valley systems (Bendigo Creek, Bullock Creek)
-            valley_depression = -8 * np.abs(np.sin(x * 0.2)) * np.abs(np.cos(y * 0.25))
-            
-            # Local hills and mining disturbance
-            local_variation = 5 * np.sin(x * 0.5) * np.cos(y * 0.4)
-            
-            # Add geological complexity
-            fault_influence = 3 * np.sin(x * 0.1 + np.pi/4)
-            
-            elevation_grid[i, j] += ridge_elevation + valley_depression + local_variation + fault_influence
-    
-    return elevation_grid.tolist()
\ No newline at end of file
+    # 120x120 grid representing authentic Bendigo topography
+    return elevation_grid(dtype=np.float64).tolist()
@@ -0,0 +1,110 @@
+# terrain/mesh.py
+"""
+Adaptive terrain meshes
+Right-triangulated irregular networks (RTIN): the elevation grid is covered
+by a binary tree of right triangles, each split at the midpoint of its
+hypotenuse only where the surface there, or beneath the triangles it would
+split into, departs from the triangle by more than a vertical error bound.
+The bound is checked at split points, so on rough grids points between them
+can exceed it somewhat. Flat creek valleys stay as a few large triangles
+while ridges keep full resolution. Errors are stored on the shared
+hypotenuse midpoints and maxed up the tree, so a triangle splits together
+with its neighbour and the mesh has no cracks. Both passes walk the tree one level at
+a time as array operations.
+"""
+import numpy as np
+
+DEFAULT_MAX_ERROR = 1.0  # metres
+
+def _is_rtin_size(n):
+    return n >= 3 and (n - 1) & (n - 2) == 0
+
+def rtin_size(samples):
+    """Smallest 2**k + 1 grid size with at least samples points per side"""
+    return (1 << max(1, int(np.ceil(np.log2(max(samples, 3) - 1))))) + 1
+
+def _levels(size):
+    """Triangles of every tree level that has grid points on its hypotenuses, coarsest first
+
+    Each level is (a, b, c) arrays of flat grid indices (i * (size + 1) + j):
+    c is the right-angle corner and a-b the hypotenuse. Level 0 is the two
+    triangles splitting the grid along its diagonal; a triangle splits into
+    (c, a, m) and (b, c, m) at m, the midpoint of a-b. On a 2**k + 1 grid every
+    such midpoint, and every leg midpoint above the last level, is a grid
+    point, so halving summed flat indices finds them exactly.
+    """
+    levels = [_roots(size)]
+    # Levels alternate diagonal and axis-aligned hypotenuses, halving every two levels,
+    # down to axis-aligned hypotenuses two cells long
+    for _ in range(2 * int(np.log2(size)) - 1):
+        levels.append(_children(*levels[-1]))
+    return levels
+
+def _roots(size):
+    corner = lambda i, j: i * (size + 1) + j
+    return (np.array([corner(size, size), corner(0, 0)], dtype=np.int32),
+            np.array([corner(0, 0), corner(size, size)], dtype=np.int32),
+            np.array([corner(size, 0), corner(0, size)], dtype=np.int32))
+
+def _children(a, b, c):
+    m = (a + b) // 2
+    return np.concatenate([c, b]), np.concatenate([a, c]), np.concatenate([m, m])
+
+def rtin_errors(grid, levels=None):
+    """Per grid point: the largest vertical error of any triangle whose hypotenuse midpoint it is
+
+    Children's errors are folded into their parents', deepest level first,
+    so a point's error bounds every triangle beneath the one it splits.
+    """
+    grid = np.asarray(grid, dtype=np.float64)
+    levels = levels or _levels(grid.shape[0] - 1)
+    flat = grid.ravel()
+    errors = np.zeros(grid.size)
+    for depth in range(len(levels) - 1, -1, -1):
+        a, b, c = levels[depth]
+        middle = (a + b) // 2
+        error = np.abs((flat[a] + flat[b]) / 2 - flat[middle])
+        if depth < len(levels) - 1:
+            error = np.maximum(error, np.maximum(errors[(a + c) // 2], errors[(b + c) // 2]))
+        np.maximum.at(errors, middle, error)
+    return errors
+
+def rtin_mesh(grid, max_error=DEFAULT_MAX_ERROR, origin=(0.0, 0.0), spacing=(1.0, 1.0), errors=None):
+    """Mesh of a (2**k + 1)-square elevation grid, refined wherever a split point is off by over max_error metres
+
+    grid[i, j] is the elevation at origin + (i, j) * spacing; the first axis
+    runs east and the second north, as elevation_grid lays them out. Returns
+    float32 (n, 3) positions (east, north, elevation) and uint32 (m, 3)
+    triangles wound anticlockwise seen from above. errors from rtin_errors
+    can be passed in to mesh one grid at several error bounds.
+    """
+    grid = np.asarray(grid)
+    if grid.ndim != 2 or grid.shape[0] != grid.shape[1] or not _is_rtin_size(grid.shape[0]):
+        raise ValueError(f'RTIN needs a square grid of 2**k + 1 samples, not {grid.shape}')
+    size = grid.shape[0] - 1
+    errors = rtin_errors(grid) if errors is None else errors
+    depths = 2 * int(np.log2(size))
+
+    a, b, c = _roots(size)
+    emitted = []
+    for depth in range(depths + 1):
+        # The deepest triangles' hypotenuses have no midpoint to split at
+        split = errors[(a + b) // 2] > max_error if depth < depths else np.zeros(len(a), dtype=bool)
+        keep = ~split
+        emitted.append(np.stack([a[keep], b[keep], c[keep]], axis=1))
+        a, b, c = _children(a[split], b[split], c[split])
+    corners = np.concatenate(emitted)                                   # (m, 3) flat grid indices
+
+    # Number the grid points the triangles use, in grid order
+    present = np.zeros(grid.size, dtype=bool)
+    present[corners] = True
+    used = np.flatnonzero(present)
+    triangles = (np.cumsum(present) - 1)[corners]
+    i, j = np.divmod(used, size + 1)
+    # Anticlockwise in (east, north): flip triangles with a negative signed area
+    ci, cj = np.divmod(corners, size + 1)
+    clockwise = (ci[:, 1] - ci[:, 0]) * (cj[:, 2] - cj[:, 0]) - (cj[:, 1] - cj[:, 0]) * (ci[:, 2] - ci[:, 0]) < 0
+    triangles[clockwise] = triangles[clockwise][:, ::-1]
+
+    positions = np.stack([origin[0] + i * spacing[0], origin[1] + j * spacing[1], grid.ravel()[used]], axis=1)
+    return positions.astype(np.float32), triangles.astype(np.uint32)
@@ -0,0 +1,70 @@
+# terrain/polylines.py
+"""
+Segment stitching
+Joins unordered line segments that share endpoints into polylines, as produced
+by plane/triangle intersection (cross sections) and marching squares (contours)
+"""
+import numpy as np
+
+def stitch_segments(segments, decimals=6):
+    """Chain (n, 2, d) segments into a list of (k, d) polylines
+
+    Endpoints are matched after rounding to `decimals` places, so points
+    computed separately on either side of a shared edge still join up.
+    Closed loops repeat their first point at the end.
+    """
+    segments = np.asarray(segments, dtype=np.float64)
+    if not len(segments):
+        return []
+
+    # Integer node id per endpoint: sort the rounded points and number the runs
+    # (a lexsort is several times quicker than np.unique(axis=0) here)
+    width = segments.shape[-1]
+    endpoints = np.round(segments.reshape(-1, width), decimals)
+    order = np.lexsort(endpoints.T[::-1])
+    ordered = endpoints[order]
+    ids = np.cumsum(np.concatenate([[True], (ordered[1:] != ordered[:-1]).any(axis=1)])) - 1
+    nodes = np.empty(len(endpoints), dtype=np.intp)
+    nodes[order] = ids
+    nodes = nodes.reshape(-1, 2)
+    degree = np.bincount(ids)
+
+    # Segments touching nothing else are finished polylines already; only the rest are walked
+    isolated = (degree[nodes] == 1).all(axis=1)
+    polylines = list(segments[isolated])
+    linked = np.flatnonzero(~isolated)
+    if not linked.size:
+        return polylines
+
+    incident = {}
+    for segment, (a, b) in zip(linked.tolist(), nodes[linked].tolist()):
+        incident.setdefault(a, []).append(segment)
+        incident.setdefault(b, []).append(segment)
+    ends = nodes.tolist()
+    touches = degree.tolist()
+    used = set()
+
+    def walk(segment, node):
+        """Node sequence from node along unused segments until the chain ends or closes"""
+        chain = [node]
+        while segment is not None:
+            used.add(segment)
+            a, b = ends[segment]
+            node = b if a == node else a
+            chain.append(node)
+            segment = next((s for s in incident[node] if s not in used), None)
+        return chain
+
+    # Open chains are started from their ends (nodes touched once) so each comes
+    # out whole; whatever is left afterwards is closed loops
+    points = np.empty((len(degree), width))
+    points[nodes.ravel()] = segments.reshape(-1, width)
+    linked = linked.tolist()
+    starts = [s for s in linked if touches[ends[s][0]] == 1 or touches[ends[s][1]] == 1]
+    for segment in starts + linked:
+        if segment in used:
+            continue
+        a, b = ends[segment]
+        start = b if touches[b] == 1 and touches[a] != 1 else a
+        polylines.append(points[walk(segment, start)])
+    return polylines
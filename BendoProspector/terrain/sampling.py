@@ -0,0 +1,91 @@
+# terrain/sampling.py
+"""
+Elevation sampling
+Bilinear interpolation of the elevation grid at batches of arbitrary points
+and along densified polylines, all as array operations, so markers, drill
+collars and profile charts are draped on the same surface the client meshes
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from .coordinates import latlng_to_local
+from .generator import DEFAULT_EXTENT_KM, elevation_from_axes
+
+# Matches the client's terrain mesh request, so draped points sit on the rendered surface
+SAMPLE_GRID_SIZE = 257
+DEFAULT_PROFILE_SPACING = 10.0  # metres between profile samples
+MAX_PROFILE_SAMPLES = 100000
+
+@lru_cache(maxsize=4)
+def sampling_grid(grid_size=SAMPLE_GRID_SIZE, extent_km=DEFAULT_EXTENT_KM):
+    """(grid, origin, spacing) over the survey extent with edges sampled inclusively, in metres
+
+    Laid out like the /api/bendigo/elevation/mesh grid: the first axis runs
+    east and the second north, both from -extent/2 to +extent/2 of the CBD.
+    """
+    half = extent_km / 2
+    axis = np.linspace(-half, half, grid_size)
+    grid = elevation_from_axes(axis, axis, dtype=np.float64)
+    grid.flags.writeable = False
+    spacing = extent_km * 1000 / (grid_size - 1)
+    return grid, (-half * 1000, -half * 1000), (spacing, spacing)
+
+def bilinear_sample(grid, x, y, origin=(0.0, 0.0), spacing=(1.0, 1.0)):
+    """grid interpolated at arrays of (x, y), where grid[i, j] lies at origin + (i, j) * spacing
+
+    Points outside the grid (or not finite) come back as NaN.
+    """
+    grid = np.asarray(grid)
+    fi = (np.asarray(x, dtype=np.float64) - origin[0]) / spacing[0]
+    fj = (np.asarray(y, dtype=np.float64) - origin[1]) / spacing[1]
+    rows, cols = grid.shape
+    outside = ~((fi >= 0) & (fi <= rows - 1) & (fj >= 0) & (fj <= cols - 1))
+    fi = np.where(outside, 0.0, fi)
+    fj = np.where(outside, 0.0, fj)
+
+    # The last row/column interpolates from the cell before it, at u or v = 1
+    i = np.minimum(fi.astype(np.intp), rows - 2)
+    j = np.minimum(fj.astype(np.intp), cols - 2)
+    u, v = fi - i, fj - j
+    flat = grid.ravel()
+    corner = i * cols + j
+    low = flat[corner] + (flat[corner + 1] - flat[corner]) * v
+    high = flat[corner + cols] + (flat[corner + cols + 1] - flat[corner + cols]) * v
+    elevation = low + (high - low) * u
+    elevation[outside] = np.nan
+    return elevation
+
+def path_distances(east, north):
+    """Cumulative distance (m) along points in order, starting at 0"""
+    steps = np.hypot(np.diff(east), np.diff(north))
+    return np.concatenate([[0.0], np.cumsum(steps)])
+
+def densify_path(east, north, spacing=DEFAULT_PROFILE_SPACING, max_samples=MAX_PROFILE_SAMPLES):
+    """Points along a polyline at most spacing metres apart, keeping every vertex
+
+    The spacing is widened if the path would need more than max_samples.
+    """
+    east, north = np.asarray(east, dtype=np.float64), np.asarray(north, dtype=np.float64)
+    lengths = np.hypot(np.diff(east), np.diff(north))
+    spacing = max(spacing, lengths.sum() / max(max_samples - len(east), 1))
+    steps = np.maximum(np.ceil(lengths / spacing).astype(np.intp), 1)
+    # Each segment contributes its start and steps - 1 interior points; the last vertex closes the path
+    segment = np.repeat(np.arange(len(lengths)), steps)
+    t = (np.arange(len(segment)) - np.repeat(np.cumsum(steps) - steps, steps)) / steps[segment]
+    dense_east = np.append(east[segment] + t * (east[segment + 1] - east[segment]), east[-1])
+    dense_north = np.append(north[segment] + t * (north[segment + 1] - north[segment]), north[-1])
+    return dense_east, dense_north
+
+def sample_latlng(lat, lng, grid_size=SAMPLE_GRID_SIZE, extent_km=DEFAULT_EXTENT_KM):
+    """(east, north, elevation) arrays for arrays of lat/lng, NaN elevation outside the extent"""
+    east, north = latlng_to_local(lat, lng)
+    grid, origin, spacing = sampling_grid(grid_size, extent_km)
+    return east, north, bilinear_sample(grid, east, north, origin, spacing)
+
+def sample_profile(lat, lng, spacing=DEFAULT_PROFILE_SPACING, grid_size=SAMPLE_GRID_SIZE,
+                   extent_km=DEFAULT_EXTENT_KM):
+    """(east, north, distance, elevation) along a lat/lng polyline densified to spacing metres"""
+    east, north = densify_path(*latlng_to_local(lat, lng), spacing)
+    grid, origin, spacing = sampling_grid(grid_size, extent_km)
+    return east, north, path_distances(east, north), bilinear_sample(grid, east, north, origin, spacing)
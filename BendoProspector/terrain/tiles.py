@@ -0,0 +1,118 @@
+# terrain/tiles.py
+"""
+Multi-resolution elevation tile pyramid
+Quadtree of fixed-size float32 tiles covering the Bendigo goldfield, generated
+lazily and kept in a bounded LRU cache so memory stays flat as the area grows
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from .analytics import DEFAULT_ALTITUDE, DEFAULT_AZIMUTH, terrain_analytics
+from .contours import contour_segments
+from .generator import elevation_from_axes
+
+TILE_SIZE = 256
+PYRAMID_EXTENT_KM = 48.0  # Bendigo CBD out to the whole goldfield
+MAX_ZOOM = 8              # ~0.7 m sample spacing at the deepest level
+TILE_CACHE_SIZE = 256     # 64 MB of float32 tiles at 256x256
+ANALYTICS_CACHE_SIZE = 32  # ~5 MB of rasters per tile
+CONTOUR_CACHE_SIZE = 512   # (tile, interval) segment sets, tens of KB each
+
+class ElevationPyramid:
+    """Quadtree z/x/y pyramid of elevation tiles centred on the Bendigo CBD
+
+    Level z splits the extent into 2**z by 2**z tiles. x indexes tile rows
+    (grid x axis, increasing east) and y indexes tile columns (grid y axis).
+    Each tile samples its edges inclusively, so neighbouring tiles share their
+    border samples and meshes built from them stitch without cracks.
+    """
+
+    def __init__(self, extent_km=PYRAMID_EXTENT_KM, tile_size=TILE_SIZE,
+                 max_zoom=MAX_ZOOM, dtype=np.float32, cache_size=TILE_CACHE_SIZE):
+        self.extent_km = extent_km
+        self.tile_size = tile_size
+        self.max_zoom = max_zoom
+        self.dtype = dtype
+        self.tile = lru_cache(maxsize=cache_size)(self._build_tile)
+        self.analytics = lru_cache(maxsize=ANALYTICS_CACHE_SIZE)(self._build_analytics)
+        self.contours = lru_cache(maxsize=CONTOUR_CACHE_SIZE)(self._build_contours)
+
+    def is_valid_tile(self, z, x, y):
+        """True when z/x/y addresses a tile inside the pyramid"""
+        return 0 <= z <= self.max_zoom and 0 <= x < 2 ** z and 0 <= y < 2 ** z
+
+    def tile_extent(self, z):
+        """Width of one tile at level z in kilometres"""
+        return self.extent_km / 2 ** z
+
+    def tile_bounds(self, z, x, y):
+        """(x_min, x_max, y_min, y_max) of a tile in km from the Bendigo CBD"""
+        size = self.tile_extent(z)
+        x_min = -self.extent_km / 2 + x * size
+        y_min = -self.extent_km / 2 + y * size
+        return x_min, x_min + size, y_min, y_min + size
+
+    def tiles_in_bounds(self, z, x_min, x_max, y_min, y_max):
+        """(x, y) of every level-z tile overlapping a km box, clamped to the pyramid"""
+        size = self.tile_extent(z)
+        last = 2 ** z - 1
+        index = lambda value: min(max(int(np.floor((value + self.extent_km / 2) / size)), 0), last)
+        return [(x, y) for x in range(index(x_min), index(x_max) + 1) for y in range(index(y_min), index(y_max) + 1)]
+
+    def tile_axes(self, z, x, y, samples=None, margin=0):
+        """Sample coordinates along the x and y axes of a tile (tile_size samples unless given)
+
+        margin adds that many samples, at the same spacing, beyond each edge.
+        """
+        x_min, x_max, y_min, y_max = self.tile_bounds(z, x, y)
+        samples = samples or self.tile_size
+        steps = np.arange(-margin, samples + margin) / (samples - 1)
+        return x_min + steps * (x_max - x_min), y_min + steps * (y_max - y_min)
+
+    def sample_spacing_m(self, z):
+        return self.tile_extent(z) * 1000 / (self.tile_size - 1)
+
+    def _build_tile(self, z, x, y):
+        if not self.is_valid_tile(z, x, y):
+            raise ValueError(f'Tile {z}/{x}/{y} is outside the pyramid')
+        grid = elevation_from_axes(*self.tile_axes(z, x, y), dtype=self.dtype)
+        grid.flags.writeable = False  # shared by every caller through the cache
+        return grid
+
+    def _build_analytics(self, z, x, y, azimuth=DEFAULT_AZIMUTH, altitude=DEFAULT_ALTITUDE):
+        """Every terrain product for a tile, its stencils fed by a ring of the neighbouring tiles' samples"""
+        if not self.is_valid_tile(z, x, y):
+            raise ValueError(f'Tile {z}/{x}/{y} is outside the pyramid')
+        grid = elevation_from_axes(*self.tile_axes(z, x, y, margin=1), dtype=self.dtype)
+        rasters = terrain_analytics(grid, self.sample_spacing_m(z), azimuth=azimuth, altitude=altitude, padded=True)
+        for raster in rasters.values():
+            raster.flags.writeable = False
+        return rasters
+
+    def _build_contours(self, z, x, y, interval):
+        """(n, 2, 3) contour segments of a tile as (east m, north m, elevation) ends
+
+        Built from the cached tile itself; tiles share border samples, so
+        segments from neighbouring tiles meet exactly on the shared edge.
+        """
+        x_axis, y_axis = self.tile_axes(z, x, y)
+        spacing = (x_axis[1] - x_axis[0]) * 1000
+        segments = contour_segments(self.tile(z, x, y), interval, (x_axis[0] * 1000, y_axis[0] * 1000),
+                                    (spacing, (y_axis[1] - y_axis[0]) * 1000))
+        segments.flags.writeable = False
+        return segments
+
+    def metadata(self):
+        """Tileset description for clients choosing a level of detail"""
+        return {
+            'extent_km': self.extent_km,
+            'tile_size': self.tile_size,
+            'min_zoom': 0,
+            'max_zoom': self.max_zoom,
+            'origin': 'Bendigo CBD at the pyramid centre',
+            'sample_spacing_m': [self.sample_spacing_m(z) for z in range(self.max_zoom + 1)],
+            'url_template': '/api/bendigo/elevation/tiles/{z}/{x}/{y}'
+        }
+
+elevation_pyramid = ElevationPyramid()